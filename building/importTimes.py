@@ -0,0 +1,130 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Measures how long it takes to import psychopy and each of its subpackages,
+using `python -X importtime` in a fresh interpreter for each import.
+
+usage:
+    python building/importTimes.py [--repeats N] [--top N] [module ...]
+
+Prints the median total (cumulative) import time of each module and,
+with --top, the slowest modules it imports. Run it before and after a change
+to check that imports haven't become slower.
+"""
+
+import os
+import sys
+import argparse
+import statistics
+import subprocess
+from pathlib import Path
+
+root = Path(__file__).parent.parent
+
+# modules measured by default
+defaultModules = [
+    'psychopy',
+    'psychopy.core',
+    'psychopy.event',
+    'psychopy.visual',
+    'psychopy.data',
+    'psychopy.sound',
+    'psychopy.hardware',
+    'psychopy.hardware.keyboard',
+]
+
+
+def parseImportTimes(output):
+    """Get the times from the output of `python -X importtime`.
+
+    Parameters
+    ----------
+    output : str
+        Text written to stderr by the interpreter.
+
+    Returns
+    -------
+    dict
+        `(self, cumulative)` time in seconds of each module imported, by
+        name (the first time it is listed, if more than once).
+    """
+    times = {}
+    for line in output.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        fields = line[len('import time:'):].split('|')
+        if len(fields) != 3:
+            continue
+        try:
+            selfTime, cumulative = int(fields[0]), int(fields[1])
+        except ValueError:  # the header line
+            continue
+        name = fields[2].strip()
+        times.setdefault(name, (selfTime / 1e6, cumulative / 1e6))
+    return times
+
+
+def measureImport(moduleName, python=sys.executable, env=None):
+    """Import a module in a new interpreter and get its import times.
+
+    Parameters
+    ----------
+    moduleName : str
+        Module to import.
+    python : str
+        Python executable to use.
+    env : dict or None
+        Environment variables of the interpreter, by default those of this
+        process with this copy of psychopy first on the path.
+
+    Returns
+    -------
+    dict
+        Times of each module imported, as returned by `parseImportTimes`.
+    """
+    if env is None:
+        env = dict(os.environ)
+        env['PYTHONPATH'] = os.pathsep.join(
+            [str(root)] + [p for p in [env.get('PYTHONPATH')] if p])
+    proc = subprocess.run(
+        [python, '-X', 'importtime', '-c', 'import ' + moduleName],
+        stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, env=env,
+        universal_newlines=True)
+    if proc.returncode != 0:
+        raise RuntimeError("Failed to import {}:\n{}".format(
+            moduleName, proc.stderr.strip().splitlines()[-1]))
+    return parseImportTimes(proc.stderr)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('modules', nargs='*', default=defaultModules)
+    parser.add_argument('--repeats', type=int, default=5,
+                        help="number of times to import each module")
+    parser.add_argument('--top', type=int, default=0,
+                        help="show the N slowest modules each one imports")
+    args = parser.parse_args(argv)
+
+    print("{:<32}{:>12}{:>12}".format('module', 'median (ms)', 'min (ms)'))
+    for moduleName in args.modules:
+        runs = []
+        try:
+            for _ in range(max(args.repeats, 1)):
+                runs.append(measureImport(moduleName))
+        except RuntimeError as err:
+            print("{:<32}{:>12}".format(moduleName, 'failed'))
+            print("    {}".format(err).replace('\n', '\n    '))
+            continue
+        totals = [times[moduleName][1] for times in runs]
+        print("{:<32}{:>12.1f}{:>12.1f}".format(
+            moduleName, statistics.median(totals) * 1e3, min(totals) * 1e3))
+        if args.top:
+            # the slowest (by their own time) in the fastest run
+            times = runs[totals.index(min(totals))]
+            slowest = sorted(times.items(), key=lambda item: -item[1][0])
+            for name, (selfTime, _) in slowest[:args.top]:
+                print("    {:<40}{:>8.1f}".format(name, selfTime * 1e3))
+
+
+if __name__ == "__main__":
+    main()
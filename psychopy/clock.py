@@ -21,6 +21,7 @@ Clock logic.
 import logging
 import time
 import sys
+import threading
 from pkg_resources import parse_version
 
 try:
@@ -262,9 +263,85 @@ class CountdownTimer(Clock):
             Clock.reset(self, t)
 
 
+# number of threads running the tasks submitted to static periods
+staticPeriodWorkers = 4
+_workerPool = None
+_workerPoolLock = threading.Lock()
+
+
+def _getWorkerPool():
+    """Get the pool of threads running tasks submitted to static periods,
+    starting it the first time it is needed."""
+    global _workerPool
+    with _workerPoolLock:
+        if _workerPool is None:
+            from concurrent.futures import ThreadPoolExecutor
+            _workerPool = ThreadPoolExecutor(
+                max_workers=staticPeriodWorkers,
+                thread_name_prefix='StaticPeriod')
+        return _workerPool
+
+
+class PeriodTask:
+    """A task submitted to a :class:`StaticPeriod`, with its timing.
+
+    Times are from :func:`getTime` and are `None` until the task has
+    started or finished.
+
+    Attributes
+    ----------
+    name : str
+        Name of the task, used in logging messages.
+    future : :class:`concurrent.futures.Future`
+        Future giving the result of the task.
+    required : bool
+        Whether :meth:`StaticPeriod.complete` waits for the task.
+    tSubmitted, tStarted, tFinished : float or None
+        When the task was submitted, started running and finished.
+
+    """
+    def __init__(self, name, required):
+        self.name = name
+        self.required = required
+        self.future = None
+        self.tSubmitted = getTime()
+        self.tStarted = None
+        self.tFinished = None
+
+    def __repr__(self):
+        return "<PeriodTask {!r} duration={}>".format(self.name, self.duration)
+
+    @property
+    def duration(self):
+        """Time taken to run the task, or `None` if it hasn't finished
+        (`float`)."""
+        if self.tStarted is None or self.tFinished is None:
+            return None
+        return self.tFinished - self.tStarted
+
+    @property
+    def done(self):
+        """`True` if the task has finished (`bool`)."""
+        return self.future.done()
+
+    def _run(self, func, args, kwargs):
+        self.tStarted = getTime()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            self.tFinished = getTime()
+
+
 class StaticPeriod:
     """A class to help insert a timing period that includes code to be run.
 
+    Work can be done during the period either in the experiment's thread,
+    between calls to :meth:`start` and :meth:`complete`, or by submitting
+    functions with :meth:`submit`, which runs them on a pool of background
+    threads shared by all static periods. :meth:`complete` waits for the
+    submitted tasks (unless they aren't required) as well as the rest of the
+    period.
+
     Parameters
     ----------
     screenHz : int or None
@@ -292,12 +369,22 @@ class StaticPeriod:
         # time should now be at exactly 0.5s later than when ISI.start()
         # was called
 
+    Load the conditions of the next block in the background while images
+    for the next trial are decoded in the experiment's thread::
+
+        ISI.start(0.5)
+        nextBlock = ISI.submit(data.importConditions, 'block2.xlsx')
+        stim.image = 'largeFile.bmp'
+        ISI.complete()  # also waits for `importConditions` to finish
+        conditions = nextBlock.result()
+
     """
     def __init__(self, screenHz=None, win=None, name='StaticPeriod'):
         self.status = NOT_STARTED
         self.countdown = CountdownTimer()
         self.name = name
         self.win = win
+        self.tasks = []  # tasks submitted since the period started
 
         if screenHz is None:
             self.frameTime = 0
@@ -318,14 +405,90 @@ class StaticPeriod:
         """
         self.status = STARTED
         self.countdown.reset(duration - self.frameTime)
+        self.tasks = []
 
         # turn off recording of frame intervals throughout static period
         if self.win:
             self._winWasRecordingIntervals = self.win.recordFrameIntervals
             self.win.recordFrameIntervals = False
 
+    def submit(self, func, *args, required=True, name=None, **kwargs):
+        """Run a function in the background during the period.
+
+        The function is run on a pool of threads shared by all static periods
+        (see `clock.staticPeriodWorkers`), so several tasks can run at once.
+        It must not use the window or stimuli that draw to it, as OpenGL can
+        only be used from the experiment's thread, but can e.g. read files,
+        decode images or sounds, or import conditions for the next trial.
+
+        Parameters
+        ----------
+        func : callable
+            Function to run.
+        *args, **kwargs
+            Arguments to call the function with.
+        required : bool
+            Whether :meth:`complete` waits for the task to finish. Tasks which
+            aren't required keep running after the period if they need to.
+        name : str or None
+            Name of the task for logging messages, the name of the function if
+            `None`.
+
+        Returns
+        -------
+        :class:`concurrent.futures.Future`
+            Future giving the result of the function (or raising its error)
+            once it has finished.
+
+        """
+        if name is None:
+            name = getattr(func, '__name__', repr(func))
+        task = PeriodTask(name, required)
+        task.future = _getWorkerPool().submit(task._run, func, args, kwargs)
+        self.tasks.append(task)
+
+        return task.future
+
+    def _waitForTasks(self):
+        """Wait for the required tasks, logging how long each one took and
+        raising the first error of a required task."""
+        from concurrent.futures import wait as waitForFutures
+
+        waitForFutures([task.future for task in self.tasks if task.required])
+        # when the time remaining (before the last frame) runs out
+        tEnd = self.countdown.getLastResetTime()
+        error = None
+        for task in self.tasks:
+            if not task.done:
+                psychopy.logging.debug(
+                    "Task %s of %s is still running at the end of the period"
+                    % (task.name, self.name))
+                continue
+            err = task.future.exception()
+            if err is not None:
+                if task.required:
+                    if error is None:
+                        error = err
+                    log = psychopy.logging.warn
+                else:
+                    # e.g. a preload, which is done again if it's needed
+                    log = psychopy.logging.debug
+                log("Task %s of %s failed: %r" % (task.name, self.name, err))
+            elif task.required and task.tFinished > tEnd:
+                psychopy.logging.warn(
+                    "Task %s of %s took %.4fs and overran the period by "
+                    "%.4fs." % (task.name, self.name, task.duration,
+                                task.tFinished - tEnd))
+            else:
+                psychopy.logging.debug(
+                    "Task %s of %s took %.4fs" % (
+                        task.name, self.name, task.duration))
+        if error is not None:
+            raise error
+
     def complete(self):
-        """Completes the period, using up whatever time is remaining with a
+        """Completes the period, waiting for the required tasks submitted with
+        :meth:`submit` and then using up whatever time is remaining with a
         call to `wait()`.
 
         Returns
@@ -335,11 +498,14 @@ class StaticPeriod:
 
         """
         self.status = FINISHED
-        timeRemaining = self.countdown.getTime()
 
         if self.win:
             self.win.recordFrameIntervals = self._winWasRecordingIntervals
 
+        if self.tasks:
+            self._waitForTasks()
+        timeRemaining = self.countdown.getTime()
+
         if timeRemaining < 0:
             msg = ('We overshot the intended duration of %s by %.4fs. The '
                    'intervening code took too long to execute.')
@@ -381,7 +547,141 @@ def _dispatchWindowEvents():
             win.winHandle.dispatch_events()  # pump events
 
 
-def wait(secs, hogCPUperiod=0.2):
+# How long `time.sleep` can overshoot on this machine, measured when this module
+# is imported (see `calibrateWait`). Sleeps during a wait end at least this
+# long before the end of the wait, and the rest of the wait is spent polling
+# the clock.
+_sleepSlack = None
+# slack measured by `calibrateWait`, which `_sleepSlack` decays back towards
+# after a sleep overshoots by more than expected
+_calibratedSlack = None
+# fraction of the extra slack kept after each wait
+_sleepSlackDecay = 0.5
+# the slack is never set shorter than this, as a sample of sleeps can miss
+# the occasional late wake up
+_minSleepSlack = 0.002
+# the slack is never set longer than this, so one long delay (e.g. the thread
+# being pre-empted) doesn't make every wait spin for that long
+_maxSleepSlack = 0.02
+# longest sleep between dispatching window events during a wait
+_maxSleepSlice = 0.01
+# longest time spent calibrating the slack on import
+_importCalibrationTime = 0.1
+# error of each wait (achieved - requested duration) since the stats were
+# reset: n, sum, sum of squares, min, max
+_waitStats = [0, 0.0, 0.0, float('inf'), float('-inf')]
+
+
+def _measureSleepSlack(nSamples, sleepDur, deadline, percentile):
+    """Set the slack from the overshoots of `nSamples` sleeps, returning the
+    overshoots."""
+    global _sleepSlack, _calibratedSlack
+    overshoots = []
+    for _ in range(max(int(nSamples), 1)):
+        t0 = getTime()
+        if overshoots and deadline is not None and t0 >= deadline:
+            break
+        time.sleep(sleepDur)
+        overshoots.append(getTime() - t0 - sleepDur)
+    overshoots.sort()
+    high = overshoots[int(round(percentile / 100.0 * (len(overshoots) - 1)))]
+    _sleepSlack = _calibratedSlack = min(
+        max(high + 0.0001, _minSleepSlack), _maxSleepSlack)
+
+    return overshoots
+
+
+def calibrateWait(nSamples=200, sleepDur=0.0005, deadline=None,
+                  percentile=99):
+    """Measure how much `time.sleep` overshoots on this machine, to set how
+    long :func:`wait` polls the clock after sleeping.
+
+    This is done automatically (for up to 0.1 s) when this module is
+    imported, but can be called again at the start of an experiment (it
+    takes about `nSamples` / 2 milliseconds), or if the load on the machine
+    has changed.
+
+    `time.sleep` uses the finest sleep available to Python, which from Python
+    3.11 is `clock_nanosleep` on Linux and a high-resolution waitable timer on
+    Windows.
+
+    Parameters
+    ----------
+    nSamples : int
+        Number of sleeps to measure.
+    sleepDur : float
+        Duration of each sleep, in seconds.
+    deadline : float or None
+        Time (from :func:`getTime`) by which to stop measuring, even if fewer
+        than `nSamples` sleeps have been measured. At least one is always
+        measured.
+    percentile : float
+        Percentile of the measured overshoots to allow for, so that one
+        unusually late sleep doesn't set the slack.
+
+    Returns
+    -------
+    float
+        Time in seconds that :func:`wait` will poll the clock for: the given
+        percentile of the overshoots (plus a margin of 0.1 ms), but at least
+        2 ms.
+
+    """
+    overshoots = _measureSleepSlack(nSamples, sleepDur, deadline, percentile)
+    psychopy.logging.debug(
+        "Calibrated wait(): time.sleep overshoots by %.3f ms on average and "
+        "%.3f ms at most" % (
+            1000 * sum(overshoots) / len(overshoots), 1000 * overshoots[-1]))
+
+    return _sleepSlack
+
+
+# calibrate before the first wait, so that no wait has to take time for it
+_measureSleepSlack(200, 0.0005, getTime() + _importCalibrationTime, 99)
+
+
+def getWaitStats():
+    """Get statistics of how precisely :func:`wait` has waited, since the
+    first wait or the last call to :func:`resetWaitStats`.
+
+    Returns
+    -------
+    dict
+        The number of waits (`'n'`) and the mean, standard deviation, minimum
+        and maximum of their errors (the time waited minus the time requested,
+        in seconds), which are `None` if there haven't been any waits. Also
+        the time spent polling the clock at the end of each wait (`'slack'`).
+
+    """
+    n, total, totalSq, minErr, maxErr = _waitStats
+    stats = {'n': n, 'mean': None, 'sd': None, 'min': None, 'max': None,
+             'slack': _sleepSlack}
+    if n:
+        mean = total / n
+        stats.update(
+            mean=mean, sd=max(totalSq / n - mean ** 2, 0.0) ** 0.5,
+            min=minErr, max=maxErr)
+
+    return stats
+
+
+def resetWaitStats():
+    """Reset the statistics returned by :func:`getWaitStats`."""
+    _waitStats[:] = [0, 0.0, 0.0, float('inf'), float('-inf')]
+
+
+def _recordWaitError(err):
+    stats = _waitStats
+    stats[0] += 1
+    stats[1] += err
+    stats[2] += err * err
+    if err < stats[3]:
+        stats[3] = err
+    if err > stats[4]:
+        stats[4] = err
+
+
+def wait(secs, hogCPUperiod=None):
     """Wait for a given time period.
 
     This function halts execution of the program for the specified duration.
@@ -392,10 +692,15 @@ def wait(secs, hogCPUperiod=0.2):
     to keep the application responsive, to avoid the OS complaining that the
     process is unresponsive.
 
-    If `secs=10` and `hogCPU=0.2` then for 9.8s Python's `time.sleep` function
-    will be used, which is not especially precise, but allows the cpu to
-    perform housekeeping. In the final `hogCPUperiod` the more precise
-    method of constantly polling the clock is used for greater precision.
+    The thread sleeps for most of the wait, which lets the CPU do other work
+    (e.g. device and recording threads). Sleeping isn't especially precise, as
+    the OS can wake the thread later than requested, so the sleeps end early
+    enough to allow for nearly all the overshoots measured on this machine
+    (see :func:`calibrateWait`) and the rest of the wait is spent constantly
+    polling the clock, which is precise. If a sleep overshoots by more than
+    expected, the polling period is made longer for later waits, and then
+    shrinks back towards the calibrated period with each wait. How precise
+    the waits have been can be checked with :func:`getWaitStats`.
 
     If you want to obtain key-presses during the wait, be sure to use
     pyglet and then call :func:`psychopy.event.getKeys()` after calling
@@ -416,34 +721,56 @@ def wait(secs, hogCPUperiod=0.2):
     ----------
     secs : float or int
         Number of seconds to wait before continuing the program.
-    hogCPUperiod : float or int
-        Number of seconds to hog the CPU. This causes the thread to enter a
-        'tight' loop when the remaining wait time is less than the specified
-        interval. This is set to 200ms (0.2s) by default. It is recommended that
-        this interval is kept short to avoid stalling the processor for too
-        long which may result in poorer timing.
+    hogCPUperiod : float, int or None
+        Number of seconds to hog the CPU at the end of the wait. This causes
+        the thread to enter a 'tight' loop when the remaining wait time is
+        less than the specified interval. If `None` (the default), the period
+        calibrated for this machine is used, which is at least 2 ms.
 
     """
-    # Calculate the relaxed period which we periodically suspend the thread,
-    # this puts less load on the CPU during long wait intervals.
-    relaxedPeriod = secs - hogCPUperiod
-
-    # wait loop, suspends the thread periodically and consumes CPU resources
+    global _sleepSlack
     t0 = getTime()
+    tEnd = t0 + secs
+    if hogCPUperiod is None:
+        slack = _sleepSlack
+    else:
+        slack = hogCPUperiod
+
+    # sleep until the slack period, suspending the thread so the CPU can do
+    # other work, in slices so window events are dispatched regularly
+    slackRaised = False
     while True:
-        elapsed = getTime() - t0
-        if elapsed > secs:  # no more time left, break the loop
+        remaining = tEnd - getTime()
+        sleepDur = remaining - slack
+        if sleepDur <= 0:
             break
-
-        if elapsed > relaxedPeriod:  # hog period
-            sleepDur = 0.00001  # 0.1ms
-        else:
-            relaxedTimeLeft = relaxedPeriod - elapsed
-            sleepDur = 0.01 if relaxedTimeLeft > 0.01 else relaxedTimeLeft
-
+        if sleepDur > _maxSleepSlice:
+            sleepDur = _maxSleepSlice
+        tSleep = getTime()
         time.sleep(sleepDur)
+        overshoot = getTime() - tSleep - sleepDur
+        if hogCPUperiod is None and overshoot > slack:
+            # woken later than expected, so allow longer for later sleeps
+            slack = _sleepSlack = min(overshoot + 0.0001, _maxSleepSlack)
+            slackRaised = True
         _dispatchWindowEvents()
 
+    # poll the clock for the rest of the wait, which is more precise
+    if hogCPUperiod is None:
+        while getTime() < tEnd:
+            pass
+        if not slackRaised:
+            # let a long slack, following a late wake up, shrink again
+            _sleepSlack = _calibratedSlack + _sleepSlackDecay * (
+                _sleepSlack - _calibratedSlack)
+    else:
+        # spin for as long as requested, still dispatching window events
+        while getTime() < tEnd:
+            time.sleep(0.00001)  # 0.1ms
+            _dispatchWindowEvents()
+
+    _recordWaitError(getTime() - tEnd)
+
 
 def getAbsTime():
     """Get the absolute time.
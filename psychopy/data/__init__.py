@@ -1,42 +1,95 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
 
-import sys
-
-from pkg_resources import parse_version
-
-from .base import DataHandler
-from .experiment import ExperimentHandler
-from .trial import TrialHandler, TrialHandler2, TrialHandlerExt, TrialType
-from .staircase import (StairHandler, QuestHandler, PsiHandler,
-                        MultiStairHandler)
-
-if sys.version_info.major == 3 and sys.version_info.minor >= 6:
-    from .staircase import QuestPlusHandler
-
-from .utils import (checkValidFilePath, isValidVariableName, importTrialTypes,
-                    sliceFromString, indicesFromString, importConditions,
-                    createFactorialTrialList, bootStraps, functionFromStaircase,
-                    getDateStr)
-
-from .fit import (FitFunction, FitCumNormal, FitLogistic, FitNakaRushton,
-                  FitWeibull)
-
-try:
-    # import openpyxl
-    import openpyxl
-    if parse_version(openpyxl.__version__) >= parse_version('2.4.0'):
-        # openpyxl moved get_column_letter to utils.cell
-        from openpyxl.utils.cell import get_column_letter
-    else:
-        from openpyxl.cell import get_column_letter
-    from openpyxl.reader.excel import load_workbook
-    haveOpenpyxl = True
-except ImportError:
-    haveOpenpyxl = False
-
-try:
-    import xlrd
-    haveXlrd = True
-except ImportError:
-    haveXlrd = False
+import importlib
+import importlib.util
+
+# The handlers and functions are only imported when they are first used, using
+# a module-level `__getattr__` (PEP 562), so that importing `psychopy.data`
+# doesn't import pandas, scipy etc. until they are needed. Names are mapped to
+# 'module:attribute', or just 'module' for modules.
+_lazyImports = {
+    'DataHandler': 'psychopy.data.base:DataHandler',
+    'ExperimentHandler': 'psychopy.data.experiment:ExperimentHandler',
+    'StreamingDataWriter': 'psychopy.data.streaming:StreamingDataWriter',
+    'readStreamedData': 'psychopy.data.streaming:readStreamedData',
+    'ColumnarData': 'psychopy.data.columnar:ColumnarData',
+    'TrialHandler': 'psychopy.data.trial:TrialHandler',
+    'TrialHandler2': 'psychopy.data.trial:TrialHandler2',
+    'TrialHandlerExt': 'psychopy.data.trial:TrialHandlerExt',
+    'TrialType': 'psychopy.data.trial:TrialType',
+    'StairHandler': 'psychopy.data.staircase:StairHandler',
+    'QuestHandler': 'psychopy.data.staircase:QuestHandler',
+    'PsiHandler': 'psychopy.data.staircase:PsiHandler',
+    'MultiStairHandler': 'psychopy.data.staircase:MultiStairHandler',
+    'QuestPlusHandler': 'psychopy.data.staircase:QuestPlusHandler',
+    'checkValidFilePath': 'psychopy.data.utils:checkValidFilePath',
+    'isValidVariableName': 'psychopy.data.utils:isValidVariableName',
+    'importTrialTypes': 'psychopy.data.utils:importTrialTypes',
+    'sliceFromString': 'psychopy.data.utils:sliceFromString',
+    'indicesFromString': 'psychopy.data.utils:indicesFromString',
+    'importConditions': 'psychopy.data.utils:importConditions',
+    'clearConditionsCache': 'psychopy.data.utils:clearConditionsCache',
+    'createFactorialTrialList': 'psychopy.data.utils:createFactorialTrialList',
+    'makeConstrainedSequence': 'psychopy.data.utils:makeConstrainedSequence',
+    'bootStraps': 'psychopy.data.utils:bootStraps',
+    'functionFromStaircase': 'psychopy.data.utils:functionFromStaircase',
+    'getDateStr': 'psychopy.data.utils:getDateStr',
+    'FitFunction': 'psychopy.data.fit:FitFunction',
+    'FitCumNormal': 'psychopy.data.fit:FitCumNormal',
+    'FitLogistic': 'psychopy.data.fit:FitLogistic',
+    'FitNakaRushton': 'psychopy.data.fit:FitNakaRushton',
+    'FitWeibull': 'psychopy.data.fit:FitWeibull',
+}
+__all__ = list(_lazyImports)
+
+# needed for backwards-compatibility, but not imported by `import *`
+_lazyImports.update({
+    'parse_version': 'pkg_resources:parse_version',
+    'get_column_letter': 'openpyxl.utils.cell:get_column_letter',
+    'load_workbook': 'openpyxl.reader.excel:load_workbook',
+})
+
+
+def _haveModule(name):
+    """Check whether a module can be imported, without importing it."""
+    try:
+        return importlib.util.find_spec(name) is not None
+    except (ImportError, ValueError):
+        return False
+
+
+# whether the optional packages for reading and writing Excel files are
+# installed, checked when first used
+_optionalPackages = {
+    'haveOpenpyxl': 'openpyxl',
+    'haveXlrd': 'xlrd',
+}
+
+
+def __getattr__(name):
+    """Import a handler (or other object, or submodule) the first time it is
+    used."""
+    if name in _optionalPackages:
+        value = globals()[name] = _haveModule(_optionalPackages[name])
+        return value
+    try:
+        target = _lazyImports[name]
+    except KeyError:
+        # submodules which haven't been imported yet, e.g. `data.utils`
+        target = __name__ + '.' + name
+        if name.startswith('_') or importlib.util.find_spec(target) is None:
+            raise AttributeError(
+                "module {!r} has no attribute {!r}".format(__name__, name)
+            ) from None
+    moduleName, _, attrName = target.partition(':')
+    obj = importlib.import_module(moduleName)
+    if attrName:
+        obj = getattr(obj, attrName)
+    globals()[name] = obj  # so later lookups don't come here
+    return obj
+
+
+def __dir__():
+    return sorted(
+        set(globals()) | set(_lazyImports) | set(_optionalPackages))
@@ -0,0 +1,229 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# Part of the PsychoPy library
+# Copyright (C) 2002-2018 Jonathan Peirce (C) 2019-2022 Open Science Tools Ltd.
+# Distributed under the terms of the GNU General Public License (GPL).
+
+"""Storing entries of data as columns of typed arrays, which take much less
+memory than a dict per entry and convert to a `pandas.DataFrame` without
+copying.
+"""
+
+__all__ = ['ColumnarData']
+
+import numpy as np
+import pandas as pd
+
+# dtype of the values of each kind of column
+_dtypes = {'b': bool, 'i': np.int64, 'f': np.float64, 'O': object}
+_int64Info = np.iinfo(np.int64)
+# kinds of the most common types, to avoid isinstance checks
+_typeKinds = {bool: 'b', np.bool_: 'b', int: 'i', np.int64: 'i', float: 'f',
+              np.float64: 'f', str: 'O'}
+
+
+def _kindOf(value):
+    """Get the kind of column needed to store a value."""
+    if isinstance(value, (bool, np.bool_)):
+        return 'b'
+    if isinstance(value, (int, np.integer)):
+        if _int64Info.min <= value <= _int64Info.max:
+            return 'i'
+        return 'O'
+    if isinstance(value, (float, np.floating)):
+        return 'f'
+    return 'O'
+
+
+def _emptyValues(kind, size):
+    """Array of missing values for a kind of column."""
+    if kind == 'f':
+        return np.full(size, np.nan)
+    elif kind == 'O':
+        return np.full(size, None, dtype=object)
+    return np.zeros(size, dtype=_dtypes[kind])
+
+
+class _Column:
+    """Growable array of values of one kind, with a mask of which entries
+    have a value."""
+    __slots__ = ('kind', 'values', 'present')
+
+    def __init__(self, size, kind='f'):
+        self.kind = kind
+        self.values = _emptyValues(kind, size)
+        self.present = np.zeros(size, dtype=bool)
+
+    def resize(self, size):
+        n = len(self.values)
+        values = _emptyValues(self.kind, size)
+        values[:n] = self.values
+        self.values = values
+        present = np.zeros(size, dtype=bool)
+        present[:n] = self.present
+        self.present = present
+
+    def setKind(self, kind):
+        """Convert the column to store values of another kind."""
+        values = _emptyValues(kind, len(self.values))
+        present = self.present
+        if present.any():
+            if kind == 'O':
+                # as python objects rather than numpy scalars
+                values[present] = self.values[present].tolist()
+            else:
+                values[present] = self.values[present]
+        self.values = values
+        self.kind = kind
+
+    def set(self, i, value, kind):
+        if kind != self.kind:
+            if not self.present.any():
+                self.setKind(kind)
+            elif {kind, self.kind} == {'i', 'f'}:
+                if self.kind == 'i':
+                    self.setKind('f')
+            else:
+                self.setKind('O')
+        self.present[i] = True
+        self.values[i] = value
+
+    def toArray(self, n):
+        """Get the first `n` values as an array (or pandas extension array
+        for integers and booleans with missing values) without copying."""
+        values = self.values[:n]
+        if self.kind in 'bi' and not self.present[:n].all():
+            mask = ~self.present[:n]
+            if self.kind == 'i':
+                return pd.arrays.IntegerArray(values, mask)
+            return pd.arrays.BooleanArray(values, mask)
+        return values
+
+
+class ColumnarData:
+    """Entries of data stored as a column of values for each name.
+
+    Each column is a numpy array whose type depends on its values: `bool`,
+    `int64` or `float64` if all its values are of that type (ints and floats
+    together make a column of floats) and `object` otherwise. The arrays
+    grow as entries are added, doubling in size when they are full, so
+    adding an entry takes roughly constant time however many there are.
+
+    Entries with no value for a column (or a value of `None`) are missing,
+    which is `NaN` in columns of floats.
+
+    Parameters
+    ----------
+    capacity : int
+        Number of entries to make space for initially.
+
+    Examples
+    --------
+    Add entries and get them as a data frame::
+
+        data = ColumnarData()
+        data.append({'rt': 0.45, 'key': 'left'})
+        data.append({'rt': 0.52, 'key': 'right', 'correct': True})
+        df = data.toDataFrame()
+
+    """
+    def __init__(self, capacity=256):
+        self._capacity = max(int(capacity), 1)
+        self._nEntries = 0
+        self._columns = {}  # name -> _Column, in the order they were added
+
+    def __len__(self):
+        return self._nEntries
+
+    def __contains__(self, name):
+        return name in self._columns
+
+    @property
+    def names(self):
+        """Names of the columns, in the order they were added (`list`)."""
+        return list(self._columns)
+
+    def append(self, entry):
+        """Add an entry.
+
+        Parameters
+        ----------
+        entry : dict
+            Values of the entry, by column name.
+        """
+        i = self._nEntries
+        if i == self._capacity:
+            self._capacity *= 2
+            for column in self._columns.values():
+                column.resize(self._capacity)
+        columns = self._columns
+        for name, value in entry.items():
+            if value is None:
+                continue
+            kind = _typeKinds.get(type(value))
+            if kind is None or kind == 'i' and type(value) is int and \
+                    not _int64Info.min <= value <= _int64Info.max:
+                kind = _kindOf(value)
+            column = columns.get(name)
+            if column is None:
+                column = columns[name] = _Column(self._capacity, kind)
+            if kind == column.kind:
+                column.present[i] = True
+                column.values[i] = value
+            else:
+                column.set(i, value, kind)
+        self._nEntries = i + 1
+
+    def getColumn(self, name):
+        """Get the values of a column, without copying.
+
+        Parameters
+        ----------
+        name : str
+            Name of the column.
+
+        Returns
+        -------
+        ArrayLike
+            A numpy array, or a pandas `IntegerArray` or `BooleanArray` if
+            the column holds integers or booleans and some are missing.
+        """
+        return self._columns[name].toArray(self._nEntries)
+
+    def toEntries(self):
+        """Get the entries as a list of dicts, as they were added (apart from
+        any `None` values, and values converted to the type of their column).
+        """
+        entries = [{} for _ in range(self._nEntries)]
+        n = self._nEntries
+        for name, column in self._columns.items():
+            values = column.values[:n].tolist()
+            for i in np.flatnonzero(column.present[:n]).tolist():
+                entries[i][name] = values[i]
+        return entries
+
+    def toDataFrame(self, names=None):
+        """Get the entries as a `pandas.DataFrame`.
+
+        The data frame uses the arrays of the columns, so no data are copied,
+        but the frame shouldn't be changed in place.
+
+        Parameters
+        ----------
+        names : list or None
+            Order of the columns. Columns which aren't named are put at the
+            end and names of columns which don't exist are ignored.
+
+        Returns
+        -------
+        pandas.DataFrame
+            One row per entry and one column per name.
+        """
+        order = [name for name in dict.fromkeys(names or [])
+                 if name in self._columns]
+        named = set(order)
+        order.extend(name for name in self._columns if name not in named)
+        return pd.DataFrame(
+            {name: self.getColumn(name) for name in order},
+            columns=order, copy=False)
@@ -1,19 +1,25 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
 
+import os
 import sys
 import copy
 import pickle
 import atexit
 
-import psychopy.visual.window
+import pandas as pd
+
 from psychopy import constants
 from psychopy import logging
 from psychopy.tools.filetools import (openOutputFile, genDelimiter,
-                                      genFilenameFromDelimiter)
+                                      genFilenameFromDelimiter, pathToString)
+from psychopy.tools.fileerrortools import handleFileCollision
 from psychopy.localization import _translate
 from .utils import checkValidFilePath
 from .base import _ComparisonMixin
+from .streaming import (StreamingDataWriter, _formatWideTextHeader,
+                        _formatWideTextRow)
+from .columnar import ColumnarData
 
 
 class ExperimentHandler(_ComparisonMixin):
@@ -38,7 +44,10 @@ class ExperimentHandler(_ComparisonMixin):
                  saveWideText=True,
                  dataFileName='',
                  autoLog=True,
-                 appendFiles=False):
+                 appendFiles=False,
+                 streamData=False,
+                 maxEntriesInMemory=None,
+                 columnar=False):
         """
         :parameters:
 
@@ -73,6 +82,27 @@ class ExperimentHandler(_ComparisonMixin):
             saveWideText : True (default) or False
 
             autoLog : True (default) or False
+
+            streamData : True or False (default)
+                Write each entry to the wide text file ('.csv') as soon as
+                it is completed by nextEntry(), rather than all at the end,
+                along with a column-wise sidecar file ('.jsonl', see
+                :class:`~psychopy.data.StreamingDataWriter`). Needs a
+                dataFileName and saveWideText to be True.
+
+            maxEntriesInMemory : int or None (default)
+                When streaming data, the number of the most recent entries
+                to keep in `entries` (and so in the pickle file). `None`
+                keeps all of them.
+
+            columnar : True or False (default)
+                Store completed entries in `columns`, a
+                :class:`~psychopy.data.ColumnarData` with a typed array for
+                each column, rather than as a dict per entry in `entries`.
+                This takes much less memory for long experiments and makes
+                `toDataFrame()` almost instant. Values are converted to the
+                type of their column (e.g. an int in a column of floats is
+                stored as a float) and `None` values are treated as missing.
         """
         self.loops = []
         self.loopsUnfinished = []
@@ -89,10 +119,17 @@ class ExperimentHandler(_ComparisonMixin):
         self.dataFileName = dataFileName
         self.thisEntry = {}
         self.entries = []  # chronological list of entries
+        # entries stored as columns instead, if requested
+        self.columns = ColumnarData() if columnar else None
         self._paramNamesSoFar = []
+        self._paramNameSet = set()
         self.dataNames = []  # names of all the data (eg. resp.keys)
+        self._dataNameSet = set()  # for quick lookups of dataNames
         self.autoLog = autoLog
         self.appendFiles = appendFiles
+        self.streamData = streamData
+        self.maxEntriesInMemory = maxEntriesInMemory
+        self._streamWriter = None
         self.status = constants.NOT_STARTED
 
         if dataFileName in ['', None]:
@@ -107,6 +144,16 @@ class ExperimentHandler(_ComparisonMixin):
     def __del__(self):
         self.close()
 
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        # attributes which handlers pickled by older versions don't have
+        self.__dict__.setdefault('streamData', False)
+        self.__dict__.setdefault('maxEntriesInMemory', None)
+        self.__dict__.setdefault('_streamWriter', None)
+        self.__dict__.setdefault('columns', None)
+        self.__dict__.setdefault('_paramNameSet', set(self._paramNamesSoFar))
+        self.__dict__.setdefault('_dataNameSet', set(self.dataNames))
+
     @property
     def currentLoop(self):
         """
@@ -145,13 +192,15 @@ class ExperimentHandler(_ComparisonMixin):
         that the current set of loops contain, ready to build a wide-format
         data file.
         """
-        names = copy.deepcopy(self._paramNamesSoFar)
+        names = list(self._paramNamesSoFar)
+        nameSet = set(names)
         # get names (or identifiers) for all contained loops
         for thisLoop in self.loops:
             theseNames, vals = self._getLoopInfo(thisLoop)
             for name in theseNames:
-                if name not in names:
+                if name not in nameSet:
                     names.append(name)
+                    nameSet.add(name)
         return names
 
     def _getExtraInfo(self):
@@ -187,8 +236,9 @@ class ExperimentHandler(_ComparisonMixin):
             if hasattr(trial, 'items'):
                 # is a TrialList object or a simple dict
                 for attr, val in list(trial.items()):
-                    if attr not in self._paramNamesSoFar:
+                    if attr not in self._paramNameSet:
                         self._paramNamesSoFar.append(attr)
+                        self._paramNameSet.add(attr)
                     names.append(attr)
                     vals.append(val)
         # single StairHandler
@@ -221,8 +271,9 @@ class ExperimentHandler(_ComparisonMixin):
             # end of trial - move to next line in data output
             exp.nextEntry()
         """
-        if name not in self.dataNames:
+        if name not in self._dataNameSet:
             self.dataNames.append(name)
+            self._dataNameSet.add(name)
         # could just copy() every value, but not always needed, so check:
         try:
             hash(value)
@@ -247,8 +298,9 @@ class ExperimentHandler(_ComparisonMixin):
             such as 'myStim.stopped'
         """
         # make sure the name is used when writing the datafile
-        if name not in self.dataNames:
+        if name not in self._dataNameSet:
             self.dataNames.append(name)
+            self._dataNameSet.add(name)
         #
         win.timeOnFlip(self.thisEntry, name)
 
@@ -334,8 +386,34 @@ class ExperimentHandler(_ComparisonMixin):
         # add the extraInfo dict to the data
         if type(self.extraInfo) == dict:
             this.update(self.extraInfo)
-        self.entries.append(this)
+        if self.columns is not None:
+            self.columns.append(this)
+        else:
+            self.entries.append(this)
         self.thisEntry = {}
+        if self.streamData and self.saveWideText and \
+                self.dataFileName not in ['', None]:
+            self._streamEntry(this)
+            # only keep recent entries, as the rest are saved already
+            if self.maxEntriesInMemory is not None and \
+                    len(self.entries) > self.maxEntriesInMemory:
+                del self.entries[:len(self.entries) - self.maxEntriesInMemory]
+
+    def _getWideTextNames(self):
+        """Names of the columns of the wide text file, in order."""
+        names = self._getAllParamNames()
+        names.extend(self.dataNames)
+        names.extend(self._getExtraInfo()[0])
+        return names
+
+    def _streamEntry(self, entry):
+        """Write an entry to the streamed data file, opening it if needed.
+        """
+        if self._streamWriter is None:
+            self._streamWriter = StreamingDataWriter(
+                self.dataFileName + '.csv', delim=',',
+                append=self.appendFiles)
+        self._streamWriter.writeEntry(entry, names=self._getWideTextNames)
 
     def getAllEntries(self):
         """Fetches a copy of all the entries including a final (orphan) entry
@@ -344,8 +422,11 @@ class ExperimentHandler(_ComparisonMixin):
 
         :return: copy (not pointer) to entries
         """
+        if self.columns is not None:
+            entries = self.columns.toEntries()
+        else:
+            entries = copy.copy(self.entries)
         # check for orphan final data (not committed as a complete entry)
-        entries = copy.copy(self.entries)
         if self.thisEntry:  # thisEntry is not empty
             entries.append(self.thisEntry)
         return entries
@@ -422,10 +503,7 @@ class ExperimentHandler(_ComparisonMixin):
                            fileCollisionMethod=fileCollisionMethod,
                            encoding=encoding)
 
-        names = self._getAllParamNames()
-        names.extend(self.dataNames)
-        # names from the extraInfo dictionary
-        names.extend(self._getExtraInfo()[0])
+        names = self._getWideTextNames()
         if len(names) < 1:
             logging.error("No data was found, so data file may not look as expected.")
         # sort names if requested
@@ -433,27 +511,114 @@ class ExperimentHandler(_ComparisonMixin):
             names.sort()
         # write a header line
         if not matrixOnly:
-            for heading in names:
-                f.write(u'%s%s' % (heading, delim))
-            f.write('\n')
+            f.write(_formatWideTextHeader(names, delim))
 
         # write the data for each entry
         for entry in self.getAllEntries():
-            for name in names:
-                if name in entry:
-                    ename = str(entry[name])
-                    if ',' in ename or '\n' in ename:
-                        fmt = u'"%s"%s'
-                    else:
-                        fmt = u'%s%s'
-                    f.write(fmt % (entry[name], delim))
-                else:
-                    f.write(delim)
-            f.write('\n')
+            f.write(_formatWideTextRow(entry, names, delim))
         if f != sys.stdout:
             f.close()
         logging.info('saved data to %r' % f.name)
 
+    def toDataFrame(self):
+        """Get all the entries (including a final orphan entry if there is
+        one) as a `pandas.DataFrame`, with the columns in the same order as
+        the wide text file.
+
+        If the handler was created with `columnar=True` the data frame uses
+        the arrays in `columns` without copying them (unless there is an
+        orphan entry), so it shouldn't be changed in place.
+
+        :return: `pandas.DataFrame` with one row per entry
+        """
+        names = self._getWideTextNames()
+        if self.columns is not None:
+            df = self.columns.toDataFrame(names)
+            if not self.thisEntry:
+                return df
+            df = pd.concat([df, pd.DataFrame([self.thisEntry])],
+                           ignore_index=True)
+        else:
+            df = pd.DataFrame(self.getAllEntries())
+        order = [name for name in dict.fromkeys(names) if name in df.columns]
+        named = set(order)
+        order.extend(name for name in df.columns if name not in named)
+        return df[order]
+
+    def _saveDataFrame(self, fileName, ext, fileCollisionMethod, **kwargs):
+        """Save the entries with `DataFrame.to_parquet` or `to_feather`.
+        """
+        fileName = pathToString(fileName)
+        if not fileName.endswith(ext):
+            fileName += ext
+        if os.path.exists(fileName):
+            fileName = handleFileCollision(
+                fileName, fileCollisionMethod=fileCollisionMethod)
+        df = self.toDataFrame()
+        # columns of mixed objects (e.g. lists and strings) can't be stored
+        # by Arrow, so store them as they would be in a text file
+        for name in df.columns:
+            if df[name].dtype == object:
+                values = df[name]
+                if not all(isinstance(v, str) or v is None for v in values):
+                    df[name] = [None if v is None else str(v) for v in values]
+        if ext == '.parquet':
+            df.to_parquet(fileName, **kwargs)
+        else:
+            df.to_feather(fileName, **kwargs)
+        logging.info('saved data to %r' % fileName)
+        return fileName
+
+    def saveAsParquet(self, fileName, fileCollisionMethod='rename',
+                      **kwargs):
+        """Saves all the entries as an Apache Parquet file, a compressed
+        column-wise format which keeps the type of each column and is much
+        faster to read than text (e.g. with `pandas.read_parquet`).
+
+        Needs `pyarrow` (or `fastparquet`) to be installed.
+
+        :Parameters:
+
+            fileName:
+                '.parquet' will be appended if it doesn't end with it.
+
+            fileCollisionMethod:
+                Collision method passed to
+                :func:`~psychopy.tools.fileerrortools.handleFileCollision`
+
+            kwargs:
+                passed to `pandas.DataFrame.to_parquet` (e.g.
+                `compression='zstd'`)
+
+        :return: the name of the file saved
+        """
+        return self._saveDataFrame(
+            fileName, '.parquet', fileCollisionMethod, **kwargs)
+
+    def saveAsFeather(self, fileName, fileCollisionMethod='rename',
+                      **kwargs):
+        """Saves all the entries as a Feather (Arrow IPC) file, which can
+        be read very quickly by pandas, R and other Arrow-based tools.
+
+        Needs `pyarrow` to be installed.
+
+        :Parameters:
+
+            fileName:
+                '.feather' will be appended if it doesn't end with it.
+
+            fileCollisionMethod:
+                Collision method passed to
+                :func:`~psychopy.tools.fileerrortools.handleFileCollision`
+
+            kwargs:
+                passed to `pandas.DataFrame.to_feather`
+
+        :return: the name of the file saved
+        """
+        return self._saveDataFrame(
+            fileName, '.feather', fileCollisionMethod, **kwargs)
+
     def saveAsPickle(self, fileName, fileCollisionMethod='rename'):
         """Basically just saves a copy of self (with data) to a pickle file.
 
@@ -482,7 +647,12 @@ class ExperimentHandler(_ComparisonMixin):
         self.saveWideText = False
 
         origEntries = self.entries
-        self.entries = self.getAllEntries()
+        if self.columns is None:
+            # columns are pickled as they are
+            self.entries = self.getAllEntries()
+        # open files can't be pickled
+        streamWriter = getattr(self, '_streamWriter', None)
+        self._streamWriter = None
 
         # otherwise use default location
         if not fileName.endswith('.psydat'):
@@ -496,6 +666,7 @@ class ExperimentHandler(_ComparisonMixin):
             logging.info('saved data to %s' % f.name)
 
         self.entries = origEntries  # revert list of completed entries post-save
+        self._streamWriter = streamWriter
         self.savePickle = savePickle
         self.saveWideText = saveWideText
         
@@ -506,7 +677,12 @@ class ExperimentHandler(_ComparisonMixin):
                 logging.debug(msg)
             if self.savePickle:
                 self.saveAsPickle(self.dataFileName)
-            if self.saveWideText:
+            if getattr(self, '_streamWriter', None) is not None:
+                # entries are saved already, apart from an orphan entry
+                if self.saveWideText and self.thisEntry:
+                    self._streamWriter.writeEntry(
+                        self.thisEntry, names=self._getWideTextNames)
+            elif self.saveWideText:
                 self.saveAsWideText(self.dataFileName + '.csv')
         self.abort()
         self.autoLog = False
@@ -522,3 +698,6 @@ class ExperimentHandler(_ComparisonMixin):
         """
         self.savePickle = False
         self.saveWideText = False
+        # entries streamed so far are kept, but no more are written
+        if getattr(self, '_streamWriter', None) is not None:
+            self._streamWriter.close()
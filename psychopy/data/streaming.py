@@ -0,0 +1,321 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# Part of the PsychoPy library
+# Copyright (C) 2002-2018 Jonathan Peirce (C) 2019-2022 Open Science Tools Ltd.
+# Distributed under the terms of the GNU General Public License (GPL).
+
+"""Writing data to disk one entry at a time, so that long sessions keep
+little data in memory and lose nothing if they crash.
+"""
+
+__all__ = ['StreamingDataWriter', 'readStreamedData']
+
+import os
+import codecs
+import json
+import shutil
+
+import numpy as np
+
+from psychopy import logging
+from psychopy.tools.filetools import openOutputFile, pathToString
+
+
+def _formatWideTextRow(entry, names, delim):
+    """Format a row of a wide text file, in the same way as
+    `ExperimentHandler.saveAsWideText`.
+    """
+    cells = []
+    for name in names:
+        if name in entry:
+            value = str(entry[name])
+            if ',' in value or '\n' in value:
+                value = '"%s"' % value
+            cells.append(value)
+        else:
+            cells.append('')
+    return ''.join(cell + delim for cell in cells) + '\n'
+
+
+def _formatWideTextHeader(names, delim):
+    return ''.join(name + delim for name in names) + '\n'
+
+
+def _toJSONValue(value):
+    """Get a value which can be stored in JSON, as is if possible, else as a
+    string."""
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    if isinstance(value, np.generic):
+        return value.item()
+    return str(value)
+
+
+class StreamingDataWriter:
+    """Append entries (rows of named values) to a wide text file as they are
+    completed, along with a column-wise sidecar file.
+
+    Each entry is written and flushed as soon as it is added, so the file is
+    complete up to the last entry even if the experiment crashes, and entries
+    don't need to be kept in memory to be saved at the end.
+
+    Columns are written in the order they first appear. A column which
+    appears after the header was written is added to the end of the rows
+    from then on, and the header is rewritten with all the columns when the
+    writer is closed (rows written before then are left with fewer cells).
+
+    The sidecar ('<fileName>.jsonl') stores the entries as JSON lines, each
+    holding a chunk of `chunkSize` entries as a list of values per column.
+    Each chunk has its own columns, so new columns need no rewriting and the
+    file can be read after a crash with `readStreamedData`.
+
+    Parameters
+    ----------
+    fileName : str
+        Name of the wide text file. A file which already exists is renamed
+        or overwritten according to `fileCollisionMethod`, unless `append`
+        is `True`.
+    delim : str
+        Delimiter between the cells of the text file.
+    encoding : str
+        Encoding of the text file.
+    append : bool
+        Add the entries to the end of an existing file (after a new header).
+    fileCollisionMethod : str
+        Collision method passed to
+        :func:`~psychopy.tools.fileerrortools.handleFileCollision`.
+    sidecar : bool
+        Also write the column-wise sidecar file.
+    chunkSize : int
+        Number of entries in each chunk of the sidecar. Entries are only
+        written to the sidecar once a chunk is full (or the writer is
+        closed), so larger chunks are faster but may lose more entries
+        from the sidecar in a crash (the text file still has them).
+    fsync : bool
+        Ask the operating system to write each entry to the disk, rather than
+        just flushing it from Python, so entries survive a power cut too. This
+        can take milliseconds per entry.
+
+    Examples
+    --------
+    Write entries as they are completed::
+
+        writer = StreamingDataWriter('data/participant1.csv')
+        for trial in trials:
+            ...
+            writer.writeEntry({'trial': trial, 'rt': rt, 'key': key})
+        writer.close()
+
+    """
+    def __init__(self, fileName, delim=',', encoding='utf-8-sig',
+                 append=False, fileCollisionMethod='rename', sidecar=True,
+                 chunkSize=1, fsync=False):
+        self.fileName = pathToString(fileName)
+        self.delim = delim
+        self.encoding = encoding
+        self.append = append
+        self.fileCollisionMethod = fileCollisionMethod
+        self.sidecar = sidecar
+        self.chunkSize = max(int(chunkSize), 1)
+        self.fsync = fsync
+
+        self.names = []  # names of the columns, in order
+        self._nameSet = set()
+        self._headerNames = None  # number of names in the written header
+        self._headerStart = self._headerEnd = 0  # byte offsets of the header
+        self._file = None
+        self._sidecarFile = None
+        self._chunk = []
+        self._nEntries = 0
+        self._closed = False
+
+    @property
+    def isOpen(self):
+        """`True` if the files have been opened and not yet closed
+        (`bool`)."""
+        return self._file is not None
+
+    @property
+    def nEntries(self):
+        """Number of entries written (`int`)."""
+        return self._nEntries
+
+    @property
+    def sidecarFileName(self):
+        """Name of the column-wise sidecar file (`str`)."""
+        return os.path.splitext(self.fileName)[0] + '.jsonl'
+
+    def _open(self):
+        """Open the files, when the first entry is written."""
+        if self.append and os.path.isfile(self.fileName):
+            self._headerStart = os.path.getsize(self.fileName)
+        self._file = openOutputFile(
+            self.fileName, append=self.append,
+            fileCollisionMethod=self.fileCollisionMethod,
+            encoding=self.encoding)
+        # get the name actually used, in case it was renamed
+        self.fileName = self._file.name
+        if self.sidecar:
+            self._sidecarFile = open(
+                self.sidecarFileName, 'a' if self.append else 'w',
+                encoding='utf-8')
+
+    def _addNames(self, entry, names=None):
+        """Add columns for any new names in an entry, in the order given by
+        `names` if possible."""
+        newNames = [name for name in entry if name not in self._nameSet]
+        if not newNames:
+            return
+        if names is not None:
+            if callable(names):
+                names = names()
+            order = {name: i for i, name in enumerate(names)}
+            newNames.sort(key=lambda name: order.get(name, len(order)))
+        self.names.extend(newNames)
+        self._nameSet.update(newNames)
+
+    def writeEntry(self, entry, names=None):
+        """Write an entry to the files.
+
+        Parameters
+        ----------
+        entry : dict
+            Values of the entry, by column name.
+        names : list, callable or None
+            Preferred order of the columns, used to order any columns which
+            are new in this entry. Can be a function returning the names, so
+            they are only worked out when there are new columns.
+        """
+        if self._closed:
+            raise RuntimeError(
+                "Can't write to `{}` as it has been closed."
+                .format(self.fileName))
+        if self._file is None:
+            self._open()
+        self._addNames(entry, names)
+        if self._headerNames is None:
+            self._file.write(_formatWideTextHeader(self.names, self.delim))
+            self._file.flush()
+            self._headerNames = len(self.names)
+            self._headerEnd = os.path.getsize(self.fileName)
+
+        self._file.write(_formatWideTextRow(entry, self.names, self.delim))
+        self._flush(self._file)
+        self._nEntries += 1
+
+        if self._sidecarFile is not None:
+            self._chunk.append(entry)
+            if len(self._chunk) >= self.chunkSize:
+                self._writeChunk()
+
+    def _writeChunk(self):
+        """Write the waiting entries to the sidecar as a chunk of columns."""
+        if not self._chunk:
+            return
+        names = []
+        seen = set()
+        for entry in self._chunk:
+            for name in entry:
+                if name not in seen:
+                    names.append(name)
+                    seen.add(name)
+        columns = {
+            name: [_toJSONValue(entry.get(name)) for entry in self._chunk]
+            for name in names}
+        chunk = {'nRows': len(self._chunk), 'columns': columns}
+        self._sidecarFile.write(json.dumps(chunk) + '\n')
+        self._flush(self._sidecarFile)
+        self._chunk = []
+
+    def _flush(self, f):
+        f.flush()
+        if self.fsync:
+            os.fsync(f.fileno())
+
+    def close(self):
+        """Write any waiting entries, close the files and rewrite the header
+        of the text file if columns were added after it was written."""
+        if self._closed:
+            return
+        self._closed = True
+        if self._file is None:
+            return
+        if self._sidecarFile is not None:
+            self._writeChunk()
+            self._sidecarFile.close()
+            self._sidecarFile = None
+        self._file.close()
+        self._file = None
+        if len(self.names) > self._headerNames:
+            self._rewriteHeader()
+        logging.info('saved data to %r' % self.fileName)
+
+    def _rewriteHeader(self):
+        """Replace the header of the text file with one naming all the
+        columns, copying the rows after it."""
+        header = _formatWideTextHeader(self.names, self.delim)
+        encoder = codecs.getincrementalencoder(self.encoding)()
+        if self._headerStart > 0:
+            # appending, so no BOM (as when the text file appends)
+            encoder.setstate(0)
+        tmpName = self.fileName + '.tmp'
+        with open(self.fileName, 'rb') as src, open(tmpName, 'wb') as dst:
+            dst.write(src.read(self._headerStart))
+            dst.write(encoder.encode(header, final=True))
+            src.seek(self._headerEnd)
+            shutil.copyfileobj(src, dst)
+        os.replace(tmpName, self.fileName)
+        self._headerNames = len(self.names)
+
+    def __del__(self):
+        try:
+            self.close()
+        except Exception:
+            pass
+
+
+def readStreamedData(fileName):
+    """Read the column-wise sidecar file written by a
+    :class:`StreamingDataWriter`.
+
+    An incomplete chunk at the end of the file (e.g. from a crash while it
+    was being written) is ignored.
+
+    Parameters
+    ----------
+    fileName : str
+        Name of the sidecar ('.jsonl') file, or of the text file it was
+        written with.
+
+    Returns
+    -------
+    dict
+        List of values for each column, in the order the columns first
+        appeared. Entries without a value for a column have `None`.
+    """
+    fileName = pathToString(fileName)
+    if not fileName.endswith('.jsonl'):
+        fileName = os.path.splitext(fileName)[0] + '.jsonl'
+    columns = {}
+    nRows = 0
+    with open(fileName, 'r', encoding='utf-8') as f:
+        for line in f:
+            try:
+                chunk = json.loads(line)
+            except ValueError:
+                logging.warning(
+                    "Ignoring incomplete chunk at the end of {}".format(
+                        fileName))
+                break
+            n = chunk['nRows']
+            for name, values in chunk['columns'].items():
+                if name not in columns:
+                    columns[name] = [None] * nRows
+                columns[name].extend(values)
+            nRows += n
+            # pad columns which weren't in this chunk
+            for values in columns.values():
+                if len(values) < nRows:
+                    values.extend([None] * (nRows - len(values)))
+    return columns
@@ -10,7 +10,7 @@ import pandas as pd
 from psychopy import logging
 from psychopy.tools.filetools import (openOutputFile, genDelimiter,
                                       genFilenameFromDelimiter)
-from .utils import importConditions
+from .utils import importConditions, makeConstrainedSequence
 from .base import _BaseTrialHandler, DataHandler
 
 
@@ -55,7 +55,8 @@ class TrialHandler(_BaseTrialHandler):
                  seed=None,
                  originPath=None,
                  name='',
-                 autoLog=True):
+                 autoLog=True,
+                 constraints=None):
         """
 
         :Parameters:
@@ -66,14 +67,16 @@ class TrialHandler(_BaseTrialHandler):
 
             nReps: number of repeats for all conditions
 
-            method: *'random',* 'sequential', or 'fullRandom'
+            method: *'random',* 'sequential', 'fullRandom' or 'constrained'
                 'sequential' obviously presents the conditions in the order
                 they appear in the list. 'random' will result in a shuffle
                 of the conditions on each repeat, but all conditions
                 occur once before the second repeat etc. 'fullRandom'
                 fully randomises the trials across repeats as well,
                 which means you could potentially run all trials of
-                one condition before any trial of another.
+                one condition before any trial of another. 'constrained'
+                randomises the trials across repeats, like 'fullRandom',
+                but only in orders which satisfy the `constraints`.
 
             dataTypes: (optional) list of names for data storage.
                 e.g. ['corr','rt','resp']. If not provided then these
@@ -95,6 +98,14 @@ class TrialHandler(_BaseTrialHandler):
                 will still store a copy of the script where it was
                 created. If `OriginPath==-1` then nothing will be stored.
 
+            constraints: (optional) a dict of the constraints on the order of
+                trials with `method='constrained'`, e.g.
+                `{'key': 'congruent', 'maxRunLength': 3}` for no more than
+                3 trials in a row with the same value of 'congruent'. The
+                options are the arguments of
+                :func:`~psychopy.data.makeConstrainedSequence`: 'key',
+                'maxRunLength', 'minGap' and 'balanceTransitions'.
+
         :Attributes (after creation):
 
             .data - a dictionary (or more strictly, a `DataHandler` sub-
@@ -156,6 +167,7 @@ class TrialHandler(_BaseTrialHandler):
         self.finished = False
         self.extraInfo = extraInfo
         self.seed = seed
+        self.constraints = constraints or {}
         # create dataHandler
         self.data = DataHandler(trials=self)
         if dataTypes != None:
@@ -164,7 +176,8 @@ class TrialHandler(_BaseTrialHandler):
         self.data['ran'].mask = False  # this is a bool; all entries are valid
         self.data.addDataType('order')
         # generate stimulus sequence
-        if self.method in ['random', 'sequential', 'fullRandom']:
+        if self.method in ['random', 'sequential', 'fullRandom',
+                           'constrained']:
             self.sequenceIndices = self._createSequence()
         else:
             self.sequenceIndices = []
@@ -264,6 +277,12 @@ class TrialHandler(_BaseTrialHandler):
             randomFlat = rng.permutation(sequential.flat)
             sequenceIndices = np.reshape(
                 randomFlat, (len(indices), self.nReps))
+        elif self.method == 'constrained':
+            # one sequence across all reps, read by .next() a rep at a time
+            sequence = makeConstrainedSequence(
+                self.trialList, self.nReps, seed=rng, **self.constraints)
+            sequenceIndices = np.reshape(
+                sequence, (self.nReps, len(indices))).T
         if self.autoLog:
             msg = 'Created sequence: %s, trialTypes=%d, nReps=%i, seed=%s'
             vals = (self.method, len(indices), self.nReps, str(self.seed))
@@ -278,28 +297,15 @@ class TrialHandler(_BaseTrialHandler):
         Useful for shuffling and then using as a reference.
         """
         # make sure its an array of objects (can be strings etc)
-        inputArray = np.asarray(inputArray, 'O')
-        # get some simple variables for later
-        dims = inputArray.shape
-        dimsProd = np.product(dims)
-        dimsN = len(dims)
-        dimsList = list(range(dimsN))
-        listOfLists = []
-        # this creates space for an array of any objects
-        arrayOfTuples = np.ones(dimsProd, 'O')
-
-        # for each dimension create list of its indices (using modulo)
-        for thisDim in dimsList:
-            prevDimsProd = np.product(dims[:thisDim])
-            # NB this means modulus in python
-            thisDimVals = np.arange(dimsProd) / prevDimsProd % dims[thisDim]
-            listOfLists.append(thisDimVals)
-
-        # convert to array
-        indexArr = np.asarray(listOfLists)
-        for n in range(dimsProd):
-            arrayOfTuples[n] = tuple((indexArr[:, n]))
-        return (np.reshape(arrayOfTuples, dims)).tolist()
+        dims = np.asarray(inputArray, 'O').shape
+        # the indices of every entry, in order, as tuples of ints
+        indexTuples = list(zip(*[
+            dimIndices.ravel().tolist() for dimIndices in np.indices(dims)]))
+        # then nest them in lists, to the same shape as the input
+        for dimSize in reversed(dims[1:]):
+            indexTuples = [indexTuples[n:n + dimSize]
+                           for n in range(0, len(indexTuples), dimSize)]
+        return indexTuples
 
     def __next__(self):
         """Advances to next trial and returns it.
@@ -338,7 +344,8 @@ class TrialHandler(_BaseTrialHandler):
             self._terminate()
 
         # fetch the trial info
-        if self.method in ('random', 'sequential', 'fullRandom'):
+        if self.method in ('random', 'sequential', 'fullRandom',
+                           'constrained'):
             self.thisIndex = self.sequenceIndices[
                 self.thisTrialN][self.thisRepN]
             self.thisTrial = self.trialList[self.thisIndex]
@@ -763,7 +770,8 @@ class TrialHandler2(_BaseTrialHandler):
                  seed=None,
                  originPath=None,
                  name='',
-                 autoLog=True):
+                 autoLog=True,
+                 constraints=None):
         """
 
         :Parameters:
@@ -773,14 +781,16 @@ class TrialHandler2(_BaseTrialHandler):
 
             nReps: number of repeats for all conditions
 
-            method: *'random',* 'sequential', or 'fullRandom'
+            method: *'random',* 'sequential', 'fullRandom' or 'constrained'
                 'sequential' obviously presents the conditions in the order
                 they appear in the list. 'random' will result in a shuffle
                 of the conditions on each repeat, but all conditions occur
                 once before the second repeat etc. 'fullRandom' fully
                 randomises the trials across repeats as well, which means
                 you could potentially run all trials of one condition
-                before any trial of another.
+                before any trial of another. 'constrained' randomises the
+                trials across repeats, like 'fullRandom', but only in
+                orders which satisfy the `constraints`.
 
             dataTypes: (optional) list of names for data storage.
                 e.g. ['corr','rt','resp']. If not provided then these
@@ -802,6 +812,14 @@ class TrialHandler2(_BaseTrialHandler):
                 copy of the script where it was
                 created. If `OriginPath==-1` then nothing will be stored.
 
+            constraints: (optional) a dict of the constraints on the order of
+                trials with `method='constrained'`, e.g.
+                `{'key': 'congruent', 'maxRunLength': 3}` for no more than
+                3 trials in a row with the same value of 'congruent'. The
+                options are the arguments of
+                :func:`~psychopy.data.makeConstrainedSequence`: 'key',
+                'maxRunLength', 'minGap' and 'balanceTransitions'.
+
         :Attributes (after creation):
 
             .data - a dictionary of numpy arrays, one for each data type
@@ -868,6 +886,7 @@ class TrialHandler2(_BaseTrialHandler):
         self.finished = False
         self.extraInfo = extraInfo
         self.seed = seed
+        self.constraints = constraints or {}
         self._rng = np.random.default_rng(seed=seed)
         self._trialAborted = False
 
@@ -980,6 +999,12 @@ class TrialHandler2(_BaseTrialHandler):
                 sequence *= self.nReps
                 # NB permutation *returns* a shuffled array
                 self.remainingIndices = list(self._rng.permutation(sequence))
+            elif (self.method == 'constrained' and
+                        self.thisN < (self.nReps * len(self.trialList))):
+                # like fullRandom, but in an order satisfying the constraints
+                self.remainingIndices = makeConstrainedSequence(
+                    self.trialList, self.nReps, seed=self._rng,
+                    **self.constraints).tolist()
             elif (self.method in ('sequential', 'random') and
                           self.thisRepN < self.nReps):
                 # start a new repetition
@@ -1003,7 +1028,7 @@ class TrialHandler2(_BaseTrialHandler):
             thisTrial = self.trialList[self.thisIndex] or {}
             self.thisTrial = copy.copy(thisTrial)
         # for fullRandom check how many times this has come up before
-        if self.method == 'fullRandom':
+        if self.method in ('fullRandom', 'constrained'):
             self.thisRepN = self.prevIndices.count(self.thisIndex)
 
         # update data structure with new info
@@ -9,6 +9,7 @@ import os
 import re
 import ast
 import pickle
+import hashlib
 import time, datetime
 import numpy as np
 import pandas as pd
@@ -127,6 +128,135 @@ def _getExcelCellName(col, row):
     return "%s%i" % (get_column_letter(col + 1), row + 1)
 
 
+def _conditionValue(val):
+    """Convert a value from a conditions file for use in a trial. Escaped
+    newlines are replaced, text which looks like a list is evaluated and
+    missing values (NaN) are replaced with None.
+    """
+    if isinstance(val, bytes):
+        val = str(val.decode('utf-8-sig'))
+    if isinstance(val, str):
+        val = val.replace('\\n', '\n')
+        if val.startswith('[') and val.endswith(']'):
+            val = eval(val)
+    elif val is not None and np.isnan(val):
+        val = None
+    return val
+
+
+def _conditionsColumnToList(column):
+    """Convert a column of a conditions file (a pandas Series) to a list of
+    values for each trial, as converted by `_conditionValue`.
+    """
+    values = column.to_numpy()
+    if values.dtype.kind == 'f':
+        # only missing values need converting
+        valueList = list(values)
+        for ii in np.flatnonzero(np.isnan(values)):
+            valueList[ii] = None
+        return valueList
+    elif values.dtype.kind in 'iub':
+        return list(values)
+    return [_conditionValue(val) for val in values]
+
+
+# version of the format of cached conditions files, to increase when it (or
+# how files are parsed) changes
+_conditionsCacheVersion = 1
+# most files kept in the conditions cache, the least recently used are deleted
+# when there are more
+_maxConditionsCacheFiles = 256
+
+
+def _getConditionsCachePath(fileName):
+    """Get the path of the file that the conditions imported from a file are
+    cached in.
+    """
+    from psychopy import prefs
+    key = hashlib.sha256(
+        os.path.abspath(fileName).encode('utf-8', 'surrogateescape'))
+    return os.path.join(prefs.paths['userPrefsDir'], 'cache', 'conditions',
+                        key.hexdigest()[:32] + '.pkl')
+
+
+def _getConditionsFileStamp(fileName):
+    """Get what identifies the current version of a conditions file."""
+    from psychopy import __version__
+    stat = os.stat(fileName)
+    return (_conditionsCacheVersion, __version__, os.path.abspath(fileName),
+            stat.st_mtime_ns, stat.st_size)
+
+
+def _loadCachedConditions(fileName):
+    """Get the `(trialList, fieldNames)` cached when a conditions file was
+    last imported, or None if it hasn't been cached or has changed since.
+    """
+    cachePath = _getConditionsCachePath(fileName)
+    try:
+        with open(cachePath, 'rb') as f:
+            stamp, trialList, fieldNames = pickle.load(f)
+    except Exception:  # not cached, or unreadable
+        return None
+    if stamp != _getConditionsFileStamp(fileName):
+        return None
+    try:
+        os.utime(cachePath)  # mark as recently used
+    except OSError:
+        pass
+    return trialList, fieldNames
+
+
+def _saveCachedConditions(fileName, trialList, fieldNames):
+    """Cache the conditions imported from a file, for the next import."""
+    cachePath = _getConditionsCachePath(fileName)
+    try:
+        os.makedirs(os.path.dirname(cachePath), exist_ok=True)
+        # write then rename, so other sessions never read a partial file
+        with open(cachePath + '.tmp', 'wb') as f:
+            pickle.dump((_getConditionsFileStamp(fileName), trialList,
+                         fieldNames), f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(cachePath + '.tmp', cachePath)
+    except Exception as err:  # e.g. no write access, or values can't pickle
+        logging.debug(u"Could not cache conditions from {} ({})".format(
+            fileName, err))
+        return
+    _pruneConditionsCache(os.path.dirname(cachePath))
+
+
+def _pruneConditionsCache(cacheDir, maxFiles=None):
+    """Delete the least recently used cached conditions, leaving `maxFiles`
+    (`_maxConditionsCacheFiles` by default)."""
+    if maxFiles is None:
+        maxFiles = _maxConditionsCacheFiles
+    try:
+        paths = [os.path.join(cacheDir, name) for name in os.listdir(cacheDir)
+                 if name.endswith('.pkl')]
+        if len(paths) <= maxFiles:
+            return
+        paths.sort(key=os.path.getmtime)
+    except OSError:
+        return
+    for path in paths[:len(paths) - maxFiles]:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+def clearConditionsCache():
+    """Delete the conditions cached by `importConditions`, so that files
+    are parsed again the next time they are imported.
+    """
+    cacheDir = os.path.dirname(_getConditionsCachePath('.'))
+    if not os.path.isdir(cacheDir):
+        return
+    for name in os.listdir(cacheDir):
+        try:
+            os.remove(os.path.join(cacheDir, name))
+        except OSError:
+            pass
+
+
 def importTrialTypes(fileName, returnFieldNames=False):
     """importTrialTypes is DEPRECATED (as of v1.70.00)
     Please use `importConditions` for identical functionality.
@@ -213,7 +343,8 @@ def listFromString(val, excludeEmpties=False):
     return asList
 
 
-def importConditions(fileName, returnFieldNames=False, selection=""):
+def importConditions(fileName, returnFieldNames=False, selection="",
+                     useCache=True):
     """Imports a list of conditions from an .xlsx, .csv, or .pkl file
 
     The output is suitable as an input to :class:`TrialHandler`
@@ -248,6 +379,11 @@ def importConditions(fileName, returnFieldNames=False, selection=""):
     - slice(-10, 2, None)  # the same as above
     - random(5) * 8  # five random vals 0-7
 
+    Unless `useCache` is False, the conditions parsed from a .xlsx, .csv etc.
+    file are cached (in the user preferences folder) and the cache is used
+    instead of parsing the file again the next time it is imported, until
+    the file is changed. Use `clearConditionsCache()` to delete the cache.
+
     """
 
     def _attemptImport(fileName, sep=',', dec='.'):
@@ -262,14 +398,29 @@ def importConditions(fileName, returnFieldNames=False, selection=""):
         if fileName.endswith(('.csv', '.tsv')):
             trialsArr = pd.read_csv(fileName, encoding='utf-8-sig',
                                     sep=sep, decimal=dec)
+            # convert text cells with eu style decimals to floats
             for col in trialsArr.columns:
-                for row, cell in enumerate(trialsArr[col]):
-                    if isinstance(cell, str):
-                        tryVal = cell.replace(",", ".")
-                        try:
-                            trialsArr[col][row] = float(tryVal)
-                        except ValueError:
-                            pass
+                column = trialsArr[col]
+                if column.dtype != object:
+                    continue
+                isStr = column.map(type).eq(str)
+                if not isStr.any():
+                    continue
+                texts = column[isStr].str.replace(",", ".", regex=False)
+                asFloat = pd.to_numeric(texts, errors='coerce').astype(float)
+                converted = asFloat.notna()
+                # to_numeric doesn't accept all that float() does (e.g.
+                # "1_000" or "NaN "), so try those cells one at a time
+                for idx in asFloat.index[~converted]:
+                    try:
+                        asFloat[idx] = float(texts[idx])
+                    except ValueError:
+                        continue
+                    converted[idx] = True
+                if converted.any():
+                    column = column.copy()
+                    column[converted.index[converted]] = asFloat[converted]
+                    trialsArr[col] = column
             logging.debug(u"Read csv file with pandas: {}".format(fileName))
         elif fileName.endswith(('.xlsx', '.xlsm')):
             trialsArr = pd.read_excel(fileName, engine='openpyxl')
@@ -320,43 +471,24 @@ def importConditions(fileName, returnFieldNames=False, selection=""):
         """Convert a pandas dataframe to a list of dicts.
         This helper function is used by csv or excel imports via pandas
         """
-        # convert the resulting dataframe to a numpy recarray
-        trialsArr = dataframe.to_records(index=False)
-        # Check for new line characters in strings, and replace escaped characters
-        for record in trialsArr:
-            for idx, element in enumerate(record):
-                if isinstance(element, str):
-                    record[idx] = element.replace('\\n', '\n')
-        if trialsArr.shape == ():
-            # convert 0-D to 1-D with one element:
-            trialsArr = trialsArr[np.newaxis]
-        fieldNames = list(trialsArr.dtype.names)
+        fieldNames = [str(name) for name in dataframe.columns]
         _assertValidVarNames(fieldNames, fileName)
 
-        # convert the record array into a list of dicts
-        trialList = []
-        for trialN, trialType in enumerate(trialsArr):
-            thisTrial = OrderedDict()
-            for fieldN, fieldName in enumerate(fieldNames):
-                val = trialsArr[trialN][fieldN]
-
-                if isinstance(val, str):
-                    if val.startswith('[') and val.endswith(']'):
-                        # val = eval('%s' %unicode(val.decode('utf8')))
-                        val = eval(val)
-                elif type(val) == np.string_:
-                    val = str(val.decode('utf-8-sig'))
-                    # if it looks like a list, convert it:
-                    if val.startswith('[') and val.endswith(']'):
-                        # val = eval('%s' %unicode(val.decode('utf8')))
-                        val = eval(val)
-                elif np.isnan(val):
-                    val = None
-                thisTrial[fieldName] = val
-            trialList.append(thisTrial)
+        # convert a column at a time, then combine them into a dict per trial
+        columns = [_conditionsColumnToList(dataframe.iloc[:, colN])
+                   for colN in range(len(fieldNames))]
+        trialList = [OrderedDict(zip(fieldNames, trialValues))
+                     for trialValues in zip(*columns)]
         return trialList, fieldNames
 
-    if (fileName.endswith(('.csv', '.tsv'))
+    # .pkl files are as fast to load as the cache would be
+    useCache = useCache and not fileName.endswith('.pkl')
+    cached = _loadCachedConditions(fileName) if useCache else None
+    if cached is not None:
+        trialList, fieldNames = cached
+        logging.debug(u"Read cached conditions for {}".format(fileName))
+
+    elif (fileName.endswith(('.csv', '.tsv'))
             or (fileName.endswith(('.xlsx', '.xls', '.xlsm')) and haveXlrd)):
         if fileName.endswith(('.csv', '.tsv', '.dlm')):  # delimited text file
             for sep, dec in [ (',', '.'), (';', ','),  # most common in US, EU
@@ -377,66 +509,48 @@ def importConditions(fileName, returnFieldNames=False, selection=""):
                 _translate("openpyxl or xlrd is required for loading excel files, but neither was found.")
             )
 
-        # data_only was added in 1.8
-        if parse_version(openpyxl.__version__) < parse_version('1.8'):
-            wb = load_workbook(filename=fileName)
-        else:
-            wb = load_workbook(filename=fileName, data_only=True)
-        ws = wb.worksheets[0]
-
-        logging.debug(u"Read excel file with openpyxl: {}".format(fileName))
+        wb = load_workbook(filename=fileName, data_only=True, read_only=True)
         try:
-            # in new openpyxl (2.3.4+) get_highest_xx is deprecated
-            nCols = ws.max_column
-            nRows = ws.max_row
-        except Exception:
-            # version openpyxl 1.5.8 (in Standalone 1.80) needs this
-            nCols = ws.get_highest_column()
-            nRows = ws.get_highest_row()
+            rows = list(wb.worksheets[0].iter_rows(values_only=True))
+        finally:
+            wb.close()
+        logging.debug(u"Read excel file with openpyxl: {}".format(fileName))
 
         # get parameter names from the first row header
+        header = rows[0] if rows else ()
         fieldNames = []
         rangeCols = []
-        for colN in range(nCols):
-            if parse_version(openpyxl.__version__) < parse_version('2.0'):
-                fieldName = ws.cell(_getExcelCellName(col=colN, row=0)).value
-            else:
-                # From 2.0, cells are referenced with 1-indexing: A1 == cell(row=1, column=1)
-                fieldName = ws.cell(row=1, column=colN + 1).value
+        for colN, fieldName in enumerate(header):
             if fieldName:
                 # If column is named, add its name to fieldNames
                 fieldNames.append(fieldName)
                 rangeCols.append(colN)
         _assertValidVarNames(fieldNames, fileName)
 
-        # loop trialTypes
-        trialList = []
-        for rowN in range(1, nRows):  # skip header first row
-            thisTrial = {}
-            for rangeColsIndex, colN in enumerate(rangeCols):
-                if parse_version(openpyxl.__version__) < parse_version('2.0'):
-                    val = ws.cell(_getExcelCellName(col=colN, row=0)).value
-                else:
-                    # From 2.0, cells are referenced with 1-indexing: A1 == cell(row=1, column=1)
-                    val = ws.cell(row=rowN + 1, column=colN + 1).value
-                # if it looks like a list or tuple, convert it
-                if (isinstance(val, str) and
-                        (val.startswith('[') and val.endswith(']') or
-                                 val.startswith('(') and val.endswith(')'))):
-                    val = eval(val)
+        def _excelValue(val):
+            # if it looks like a list or tuple, convert it
+            if (isinstance(val, str) and
+                    (val.startswith('[') and val.endswith(']') or
+                     val.startswith('(') and val.endswith(')'))):
+                val = eval(val)
+            if isinstance(val, str):
                 # if it has any line breaks correct them
-                if isinstance(val, str):
-                    val = val.replace('\\n', '\n')
-                # Convert from eu style decimals: replace , with . and try to make it a float
-                if isinstance(val, str):
-                    tryVal = val.replace(",", ".")
-                    try:
-                        val = float(tryVal)
-                    except ValueError:
-                        pass
-                fieldName = fieldNames[rangeColsIndex]
-                thisTrial[fieldName] = val
-            trialList.append(thisTrial)
+                val = val.replace('\\n', '\n')
+                # Convert from eu style decimals: replace , with . and try to
+                # make it a float
+                try:
+                    val = float(val.replace(",", "."))
+                except ValueError:
+                    pass
+            return val
+
+        # convert a column at a time, then combine them into a dict per trial
+        nCols = max(rangeCols, default=-1) + 1
+        rows = [row + (None,) * (nCols - len(row)) for row in rows[1:]]
+        columns = [[_excelValue(row[colN]) for row in rows]
+                   for colN in rangeCols]
+        trialList = [dict(zip(fieldNames, trialValues))
+                     for trialValues in zip(*columns)]
 
     elif fileName.endswith('.pkl'):
         f = open(fileName, 'rb')
@@ -471,6 +585,9 @@ def importConditions(fileName, returnFieldNames=False, selection=""):
             translated=_translate('Your conditions file should be an xlsx, csv, dlm, tsv or pkl file')
         )
 
+    if useCache and cached is None:
+        _saveCachedConditions(fileName, trialList, fieldNames)
+
     # if we have a selection then try to parse it
     if isinstance(selection, str) and len(selection) > 0:
         selection = indicesFromString(selection)
@@ -557,6 +674,208 @@ def createFactorialTrialList(factors):
     return trialList
 
 
+def makeConstrainedSequence(trialList, nReps=1, key=None, maxRunLength=None,
+                            minGap=0, balanceTransitions=False, seed=None,
+                            maxBacktracks=100000):
+    """Create a random order of trials (each condition in the trialList
+    repeated nReps times) which satisfies constraints on how trials of the
+    same kind follow one another.
+
+    This is the sequence used by :class:`TrialHandler` and
+    :class:`TrialHandler2` with `method='constrained'` (where the arguments
+    after `nReps` are given as the handler's `constraints`).
+
+    Usage::
+
+        order = makeConstrainedSequence(trialList, nReps=10,
+                                        key='congruent', maxRunLength=3)
+        for condN in order:
+            thisTrial = trialList[condN]
+
+    :Parameters:
+
+        trialList : a list of dicts specifying conditions (or anything else
+            with one entry per condition, if `key` is None or callable)
+
+        nReps : number of repeats of each condition
+
+        key : what makes trials of the same kind, for the constraints. None
+            (each condition is its own kind), the name of a parameter of
+            the conditions (e.g. 'congruent') or a function which is given
+            a condition and returns its kind
+
+        maxRunLength : maximum number of trials of the same kind in a row,
+            or None for no maximum
+
+        minGap : minimum number of trials of other kinds between any two
+            trials of the same kind (so if > 0 there are no runs at all)
+
+        balanceTransitions : if True, trials are ordered so that each kind
+            of trial is followed by each kind (including itself, if allowed)
+            as equally often as the other constraints allow
+
+        seed : an integer (or a numpy random Generator) to get the same
+            sequence each time
+
+        maxBacktracks : number of times the search can backtrack before
+            giving up, with a ValueError
+
+    :Returns:
+
+        a numpy array of the indices of conditions in the trialList, in the
+        order they should be run
+
+    The sequence is built one trial at a time, choosing from the kinds of
+    trial still available (each in proportion to how many are left) and
+    pruning choices that would leave the rest of the sequence impossible to
+    complete, backtracking if it does reach a dead end. Without any
+    constraints this gives a completely random order, like 'fullRandom'.
+    With constraints, it is much faster than shuffling until the order is
+    acceptable, but not every acceptable order is exactly equally likely.
+    Trials of the same kind are shuffled among the positions of that kind.
+    """
+    rng = np.random.default_rng(seed)
+    if key is None:
+        kinds = list(range(len(trialList)))
+    elif callable(key):
+        kinds = [key(thisTrial) for thisTrial in trialList]
+    else:
+        kinds = [thisTrial[key] for thisTrial in trialList]
+    kindIndices = {}
+    kindOfCond = np.array(
+        [kindIndices.setdefault(kind, len(kindIndices)) for kind in kinds],
+        dtype=int)
+    counts = np.bincount(kindOfCond, minlength=len(kindIndices)) * int(nReps)
+
+    kindSequence = _constrainedKindSequence(
+        counts, maxRunLength=maxRunLength, minGap=minGap,
+        balanceTransitions=balanceTransitions, rng=rng,
+        maxBacktracks=maxBacktracks)
+
+    # shuffle the conditions (and their repeats) of each kind into its places
+    sequence = np.empty(len(kindSequence), dtype=int)
+    for kindN in range(len(counts)):
+        conditions = np.repeat(np.flatnonzero(kindOfCond == kindN), nReps)
+        sequence[kindSequence == kindN] = rng.permutation(conditions)
+    return sequence
+
+
+def _constrainedKindSequence(counts, maxRunLength=None, minGap=0,
+                             balanceTransitions=False, rng=None,
+                             maxBacktracks=100000):
+    """Order `counts[n]` trials of each kind n, satisfying the constraints
+    given to `makeConstrainedSequence`, by depth-first search with pruning.
+    """
+    rng = np.random.default_rng(rng)
+    counts = np.asarray(counts, dtype=int)
+    nKinds = len(counts)
+    nTotal = int(counts.sum())
+    maxRun = int(maxRunLength) if maxRunLength else nTotal
+    if maxRun < 1:
+        raise ValueError("maxRunLength must be at least 1")
+    minGap = int(minGap or 0)
+    if minGap > 0:
+        maxRun = 1
+
+    sequence = np.full(nTotal, -1, dtype=int)
+    runLengths = np.zeros(nTotal, dtype=int)  # of the run ending at each trial
+    remaining = counts.copy()
+    lastPos = np.full(nKinds, -nTotal - minGap - 1, dtype=int)
+    prevLastPos = np.zeros(nTotal, dtype=int)  # to undo choices
+    transitions = np.zeros((nKinds, nKinds), dtype=int)
+    candidates = [None] * nTotal  # choices not tried yet at each position
+
+    def isCompletable(nPlaced):
+        # necessary conditions for the remaining trials to fit the constraints
+        nLeft = nTotal - nPlaced
+        if nLeft == 0:
+            return True
+        last = sequence[nPlaced - 1] if nPlaced else -1
+        if maxRun < nTotal:
+            # each kind needs enough other trials to split it into runs
+            limits = maxRun * (nLeft - remaining + 1)
+            if last >= 0:
+                limits[last] -= runLengths[nPlaced - 1]
+            if np.any(remaining > limits):
+                return False
+        if minGap:
+            # each kind needs room for its trials, spaced out
+            first = np.maximum(lastPos + minGap + 1, nPlaced)
+            needed = first + (remaining - 1) * (minGap + 1)
+            if np.any(needed[remaining > 0] > nTotal - 1):
+                return False
+        return True
+
+    def getCandidates(pos):
+        # kinds which can go at this position, most preferred last
+        ok = remaining > 0
+        if minGap:
+            ok &= lastPos < pos - minGap
+        if pos and runLengths[pos - 1] >= maxRun:
+            ok[sequence[pos - 1]] = False
+        kinds = np.flatnonzero(ok)
+        # random order weighted by the number left of each kind
+        weights = rng.random(len(kinds)) ** (1.0 / remaining[kinds])
+        if balanceTransitions and pos:
+            order = np.lexsort(
+                (weights, -transitions[sequence[pos - 1], kinds]))
+        else:
+            order = np.argsort(weights)
+        return kinds[order].tolist()
+
+    def place(pos, kind):
+        sequence[pos] = kind
+        remaining[kind] -= 1
+        prevLastPos[pos] = lastPos[kind]
+        lastPos[kind] = pos
+        if pos and sequence[pos - 1] == kind:
+            runLengths[pos] = runLengths[pos - 1] + 1
+        else:
+            runLengths[pos] = 1
+        if pos:
+            transitions[sequence[pos - 1], kind] += 1
+
+    def remove(pos):
+        kind = sequence[pos]
+        remaining[kind] += 1
+        lastPos[kind] = prevLastPos[pos]
+        if pos:
+            transitions[sequence[pos - 1], kind] -= 1
+        sequence[pos] = -1
+
+    if not isCompletable(0):
+        raise ValueError(
+            "No sequence of {} trials can satisfy the constraints "
+            "(maxRunLength={}, minGap={})".format(
+                nTotal, maxRunLength, minGap))
+
+    pos = 0
+    nBacktracks = 0
+    if nTotal:
+        candidates[0] = getCandidates(0)
+    while pos < nTotal:
+        if not candidates[pos]:
+            # dead end, so go back and try something else
+            nBacktracks += 1
+            if pos == 0 or nBacktracks > maxBacktracks:
+                raise ValueError(
+                    "Could not find a sequence of {} trials satisfying the "
+                    "constraints after {} backtracks".format(
+                        nTotal, nBacktracks - 1))
+            pos -= 1
+            remove(pos)
+            continue
+        place(pos, candidates[pos].pop())
+        if not isCompletable(pos + 1):
+            remove(pos)
+            continue
+        pos += 1
+        if pos < nTotal:
+            candidates[pos] = getCandidates(pos)
+
+    return sequence
+
+
 def bootStraps(dat, n=1):
     """Create a list of n bootstrapped resamples of the data
 
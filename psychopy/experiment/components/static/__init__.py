@@ -175,9 +175,30 @@ class StaticComponent(BaseComponent):
             raise Exception(msg % self.params)
         vals = (self.params['name'], durationSecsStr)
         buff.writeIndented("%s.start(%s)\n" % vals)
+        self.writeBackgroundLoads(buff)
 
         return needsUnindent
 
+    def writeBackgroundLoads(self, buff):
+        """Decode the image files of the updates in the background while the
+        period runs, so they are ready when the updates are done.
+        """
+        for update in self.updatesList:
+            compName = update['compName']
+            fieldName = update['fieldName']
+            if hasattr(compName, 'params'):
+                prms = compName.params
+            else:
+                prms = self.exp.getComponentFromName(str(compName)).params
+            if fieldName != 'image' or prms[fieldName].valType != 'file':
+                continue
+            # not required, so a missing file is only reported by the update
+            code = ("%s.submit(visual.imagecache.preloadImage, %s, 'RGBA', "
+                    "required=False, name='%s.%s')\n")
+            vals = (self.params['name'], prms[fieldName], prms['name'],
+                    fieldName)
+            buff.writeIndented(code % vals)
+
     def writeStopTestCode(self, buff):
         """Test whether we need to stop
         """
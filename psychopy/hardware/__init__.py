@@ -3,9 +3,10 @@
 
 import sys
 import glob
+import importlib
+import importlib.util
 from itertools import chain
 from psychopy import logging
-from . import eyetracker
 
 try:
     from collections.abc import Iterable
@@ -24,6 +25,17 @@ __all__ = [
 ]
 
 
+def __getattr__(name):
+    """Import a submodule (e.g. `hardware.eyetracker`) the first time it is
+    used (PEP 562), so that importing `psychopy.hardware` doesn't import the
+    drivers for every device."""
+    fullName = __name__ + '.' + name
+    if name.startswith('_') or importlib.util.find_spec(fullName) is None:
+        raise AttributeError(
+            "module {!r} has no attribute {!r}".format(__name__, name))
+    return importlib.import_module(fullName)
+
+
 def getSerialPorts():
     """Finds the names of all (virtual) serial ports present on the system
 
@@ -63,6 +63,7 @@ from __future__ import absolute_import, division, print_function
 from collections import deque
 import sys
 import copy
+import numpy as np
 import psychopy.core
 import psychopy.clock
 from psychopy import logging
@@ -353,6 +354,33 @@ class Keyboard:
                 keys.append(thisKey)
         return keys
 
+    def getKeysArray(self, keyList=None, waitRelease=True, clear=True):
+        """Same as `~psychopy.hardware.keyboard.Keyboard.getKeys`, but
+        returns the key presses as a numpy record array rather than a list of
+        :class:`KeyPress` objects, which is much faster when there are many
+        presses to fetch (e.g. all the keystrokes of a typing task).
+
+        Returns
+        -------
+        A numpy record array with a record for each key press and fields
+        `name`, `code` (the keycode, or -1 if the backend doesn't give one),
+        `tDown`, `rt` and `duration` (NaN for keys which haven't been
+        released). Each field can be used as an array, e.g.::
+
+            presses = kb.getKeysArray(waitRelease=True)
+            intervals = numpy.diff(presses.tDown)
+            meanDuration = presses.duration.mean()
+
+        """
+        if Keyboard._backend == 'ptb':
+            # use the buffered presses directly, rather than copies
+            keys = []
+            for buffer in self._buffers.values():
+                keys.extend(buffer.getKeys(keyList, waitRelease, clear))
+            return _keysToRecArray(keys, tOffset=self._ptbOffset,
+                                   tReset=self.clock.getLastResetTime())
+        return _keysToRecArray(self.getKeys(keyList, waitRelease, clear))
+
     def waitKeys(self, maxWait=float('inf'), keyList=None, waitRelease=True,
                  clear=True):
         """Same as `~psychopy.hardware.keyboard.Keyboard.getKeys`, 
@@ -401,8 +429,7 @@ class Keyboard:
             for buffer in self._buffers.values():
                 buffer.flush()  # flush the device events to the soft buffer
                 buffer._evts.clear()
-                buffer._keys.clear()
-                buffer._keysStillDown.clear()
+                buffer._clearKeys()
         elif Keyboard._backend == 'iohub':
             Keyboard._iohubKeyboard.clearEvents()
         else:
@@ -510,8 +537,7 @@ class _KeyBuffer(object):
         # create the PTB keyboard object and corresponding queue
         allInds, names, keyboards = hid.get_keyboard_indices()
 
-        self._keys = deque()
-        self._keysStillDown = deque()
+        self._clearKeys()
 
         if kb_id == -1:
             self.dev = hid.Keyboard()  # a PTB keyboard object
@@ -524,6 +550,17 @@ class _KeyBuffer(object):
         """
         self._processEvts()
 
+    def _clearKeys(self):
+        """Forget all key presses, returned or not."""
+        self._nPresses = 0  # presses so far, numbering each press in order
+        # presses not yet returned by getKeys, by number, and also by name so
+        # presses of the keys in a keyList can be found without a search
+        self._keys = {}
+        self._keysByName = {}
+        # presses which haven't been released yet, by keycode, so a release
+        # is paired with the earliest press of its key without a search
+        self._keysStillDown = {}
+
     def _flushEvts(self):
         while self.dev.flush(flush_type=_ptb_flush_type):
             evt, remaining = self.dev.queue_get_event()
@@ -549,29 +586,45 @@ class _KeyBuffer(object):
         self._processEvts()
         # if no conditions then no need to loop through
         if not keyList and not waitRelease:
-            keyPresses = list(self._keysStillDown)
-            for k in list(self._keys):
-                if not any(x.name == k.name and x.tDown == k.tDown  for x in keyPresses):
-                    keyPresses.append(k)
+            keyPresses = dict(self._keys)
+            for stillDown in self._keysStillDown.values():
+                keyPresses.update(stillDown)
             if clear:
-                self._keys = deque()
-                self._keysStillDown = deque()
-            keyPresses.sort(key=lambda x: x.tDown, reverse=False)
+                self._clearKeys()
+            keyPresses = sorted(keyPresses.values(), key=lambda x: x.tDown)
             return keyPresses
 
-        # otherwise loop through and check each key
-        keyPresses = deque()
-        for keyPress in self._keys:
-            if waitRelease and not keyPress.duration:
-                continue
-            if keyList and keyPress.name not in keyList:
-                continue
-            keyPresses.append(keyPress)
+        # otherwise only check the presses of keys in the list
+        if keyList:
+            if isinstance(keyList, str):
+                keyList = [keyList]
+            candidates = []
+            for name in set(keyList):
+                candidates.extend(self._keysByName.get(name, {}).items())
+            candidates.sort(key=lambda item: item[0])
+        else:
+            candidates = self._keys.items()
+        if waitRelease:
+            candidates = [(n, key) for n, key in candidates if key.duration]
+        else:
+            candidates = list(candidates)
+        keyPresses = deque(key for n, key in candidates)
 
         # clear keys in a second step (not during iteration)
-        if clear:
-            for key in keyPresses:
-                self._keys.remove(key)
+        if clear and not keyList:
+            # only unreleased keys are left, rebuild rather than delete
+            self._keys = {n: key for n, key in self._keys.items()
+                          if not key.duration}
+            self._keysByName = {}
+            for n, key in self._keys.items():
+                self._keysByName.setdefault(key.name, {})[n] = key
+        elif clear:
+            for n, key in candidates:
+                del self._keys[n]
+                sameName = self._keysByName[key.name]
+                del sameName[n]
+                if not sameName:
+                    del self._keysByName[key.name]
 
         return keyPresses
 
@@ -588,22 +641,51 @@ class _KeyBuffer(object):
         """Take a list of events and convert to a list of keyPresses with
         tDown and duration"""
         self._flushEvts()
-        evts = deque(self._evts)
-        self._clearEvents()
+        evts, self._evts = self._evts, deque()
         for evt in evts:
+            code = evt['keycode']
             if evt['down']:
-                newKey = KeyPress(code=evt['keycode'], tDown=evt['time'])
-                self._keys.append(newKey)
-                self._keysStillDown.append(newKey)
+                n = self._nPresses
+                self._nPresses += 1
+                newKey = KeyPress(code=code, tDown=evt['time'])
+                self._keys[n] = newKey
+                self._keysByName.setdefault(newKey.name, {})[n] = newKey
+                self._keysStillDown.setdefault(code, {})[n] = newKey
             else:
-                for key in self._keysStillDown:
-                    if key.code == evt['keycode']:
-                        key.duration = evt['time'] - key.tDown
-                        self._keysStillDown.remove(key)
-                        break  # this key is done
-                    else:
-                        # we found a key that was first pressed before reading
-                        pass
+                # release the earliest press of this key still down (if
+                # none, the key was first pressed before reading)
+                stillDown = self._keysStillDown.get(code)
+                if stillDown:
+                    n = next(iter(stillDown))
+                    key = stillDown.pop(n)
+                    key.duration = evt['time'] - key.tDown
+                    if not stillDown:
+                        del self._keysStillDown[code]
+
+
+def _keysToRecArray(keys, tOffset=0.0, tReset=None):
+    """Convert a list of KeyPress objects to a numpy record array.
+
+    Times are given relative to `tOffset`, and reaction times relative to
+    `tReset` if it is given (otherwise the `rt` of each key is used).
+    """
+    n = len(keys)
+    names = np.array([str(key.name) for key in keys], dtype=str)
+    codes = np.fromiter(
+        (key.code if isinstance(key.code, (int, np.integer)) else -1
+         for key in keys), dtype=np.int32, count=n)
+    tDown = np.fromiter((key.tDown for key in keys), dtype=np.float64, count=n)
+    if tReset is not None:
+        rt = tDown - tReset
+    else:
+        rt = np.fromiter((np.nan if key.rt is None else key.rt for key in keys),
+                         dtype=np.float64, count=n)
+    durations = np.fromiter(
+        (np.nan if key.duration is None else key.duration for key in keys),
+        dtype=np.float64, count=n)
+    return np.rec.fromarrays(
+        [names, codes, tDown - tOffset, rt, durations],
+        names=['name', 'code', 'tDown', 'rt', 'duration'])
 
 
 _keyBuffers = _KeyBuffers()
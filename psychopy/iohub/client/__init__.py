@@ -10,8 +10,10 @@ import time
 import subprocess
 import json
 import signal
+from operator import itemgetter
 from weakref import proxy
 
+import numpy
 import psutil
 
 try:
@@ -95,7 +97,9 @@ class DeviceRPC():
             asType = kwargs['as_type']
 
         conversionMethod = self._returnarg
-        if asType == 'dict':
+        if asType in ('numpy', 'pandas'):
+            conversionMethod = None
+        elif asType == 'dict':
             conversionMethod = ioHubConnection.eventListToDict
         elif asType == 'object':
             conversionMethod = ioHubConnection.eventListToObject
@@ -103,6 +107,8 @@ class DeviceRPC():
             conversionMethod = ioHubConnection.eventListToNamedTuple
 
         if self.device_class != 'Experiment':
+            if conversionMethod is None:
+                return ioHubConnection.eventListToArrays(r, asType)
             return [conversionMethod(el) for el in r]
 
         EVT_TYPE_IX = DeviceEvent.EVENT_TYPE_ID_INDEX
@@ -115,6 +121,8 @@ class DeviceRPC():
                 ltext = l[self._log_text_index]
                 llevel = l[self._log_level_index]
                 psycho_logging.log(ltext, llevel, ltime)
+        if conversionMethod is None:
+            return ioHubConnection.eventListToArrays(r, asType)
         return [conversionMethod(el) for el in r]
 
 
@@ -291,6 +299,9 @@ class ioHubConnection():
         self._shutdown_attempted = False
         self._cv_order = None
         self._message_cache = []
+        # event type id -> SharedEventBuffer, if the event_transport setting
+        # is 'shared_memory'.
+        self._sharedEventBuffers = None
         self.iohub_status = self._startServer(ioHubConfig, ioHubConfigAbsPath)
         if self.iohub_status != 'OK':
             raise RuntimeError('Error starting ioHub server: {}'.format(self.iohub_status))
@@ -344,6 +355,10 @@ class ioHubConnection():
         providing a valid device name as the device_label argument will
         result in only events from that device being returned.
 
+        If the iohub config setting event_transport is 'shared_memory',
+        events from all devices are read from shared memory written by the
+        ioHub Process, rather than being requested over UDP.
+
         Events can be received in one of several object types by providing the
         optional as_type property to the method. Valid values for as_type are
         the following str values:
@@ -353,6 +368,12 @@ class ioHubConnection():
             * 'dict': Each event converted to a dict object.
             * 'object': Each event is converted to a DeviceEvent subclass
                         based on the event's type.
+            * 'numpy': A dict is returned, with a numpy structured array
+                       (using the event class NUMPY_DTYPE) for each event
+                       type received, keyed by the event type name
+                       (e.g. 'MOUSE_MOVE'). String fields are utf-8 bytes.
+            * 'pandas': As for 'numpy', but each event type is returned as
+                        a pandas DataFrame.
 
         Args:
             device_label (str): Name of device to retrieve events for.
@@ -365,17 +386,41 @@ class ioHubConnection():
             tuple: List of event objects; object type controlled by 'as_type'.
         """
         r = None
+        if (as_type in ('numpy', 'pandas') and device_label is None
+                and self._sharedEventBuffers is not None):
+            # events are already in numpy format, so skip creating lists
+            arrays = self.eventListToArrays(
+                self.allEvents + self._getUnsharedEvents())
+            self.allEvents = []
+            for eid, a in self._getSharedEventArrays().items():
+                ename = EventConstants.getName(eid)
+                if ename in arrays:
+                    a = numpy.concatenate((arrays[ename], a))
+                arrays[ename] = a
+            if as_type == 'pandas':
+                return self.arraysToDataFrames(arrays)
+            return arrays
+
         if device_label is None:
-            events = self._sendToHubServer(('GET_EVENTS',))[1]
+            if self._sharedEventBuffers is not None:
+                events = self._getSharedEvents()
+            else:
+                events = self._sendToHubServer(('GET_EVENTS',))[1]
             if events is None:
                 r = self.allEvents
             else:
                 self.allEvents.extend(events)
                 r = self.allEvents
             self.allEvents = []
+        elif as_type in ('numpy', 'pandas'):
+            return self.devices.getDevice(device_label).getEvents(
+                asType=as_type)
         else:
             r = self.devices.getDevice(device_label).getEvents()
 
+        if as_type in ('numpy', 'pandas'):
+            return self.eventListToArrays(r or [], as_type)
+
         if r:
             if as_type == 'list':
                 return r
@@ -420,6 +465,7 @@ class ioHubConnection():
         if device_label.lower() == 'all':
             self.allEvents = []
             self._sendToHubServer(('RPC', 'clearEventBuffer', [True, ]))
+            self._clearSharedEvents()
             try:
                 self.getDevice('keyboard')._clearLocalEvents()
             except:
@@ -427,6 +473,7 @@ class ioHubConnection():
         elif device_label in [None, '', False]:
             self.allEvents = []
             self._sendToHubServer(('RPC', 'clearEventBuffer', [False, ]))
+            self._clearSharedEvents()
             try:
                 self.getDevice('keyboard')._clearLocalEvents()
             except:
@@ -809,7 +856,10 @@ class ioHubConnection():
         drpc = ('EXP_DEVICE', 'ADD_DEVICE', device_class, device_config)
         r = self._sendToHubServer(drpc)
         device_class_name, dev_name, _ = r[2]
-        return self._addDeviceView(dev_name, device_class_name)
+        dev_view = self._addDeviceView(dev_name, device_class_name)
+        if self._sharedEventBuffers is not None:
+            self._attachSharedEventBuffers()
+        return dev_view
 
     def flushDataStoreFile(self):
         """Manually tell the iohub datastore to flush any events it has buffered in
@@ -1023,6 +1073,10 @@ class ioHubConnection():
         # >>>> Creating client side iohub device wrappers...
         self._createDeviceList(ioHubConfig['monitor_devices'])
 
+        if ioHubConfig.get('event_transport', 'udp') == 'shared_memory':
+            self._sharedEventBuffers = {}
+            self._attachSharedEventBuffers()
+
         return 'OK'
 
     def _waitForServerInit(self):
@@ -1108,6 +1162,67 @@ class ioHubConnection():
             printExceptionDetailsToStdErr()
         return None
 
+    def _attachSharedEventBuffers(self):
+        """Open any shared memory event buffers created by the iohub server
+        that this process is not using yet."""
+        from ..net import SharedEventBuffer
+        sbuffers = self._sendToHubServer(('RPC', 'getSharedEventBuffers'))[2]
+        for eid, name, length in sbuffers or []:
+            if eid not in self._sharedEventBuffers:
+                evt_cls = EventConstants.getClass(eid)
+                self._sharedEventBuffers[eid] = SharedEventBuffer(
+                    name, evt_cls.NUMPY_DTYPE, length)
+
+    def _getUnsharedEvents(self):
+        """Get any events the iohub server could not put in a shared memory
+        buffer, which it keeps for a GET_EVENTS request, and attach any
+        shared buffers it has created since the last check."""
+        if not self._sharedEventBuffers:
+            # nothing shared yet, so check for buffers and use udp
+            self._attachSharedEventBuffers()
+            pending_count = 1
+        else:
+            sbuffer = next(iter(self._sharedEventBuffers.values()))
+            buffer_count, pending_count = sbuffer.getStatus()
+            if buffer_count > len(self._sharedEventBuffers):
+                self._attachSharedEventBuffers()
+        if pending_count:
+            return self._sendToHubServer(('GET_EVENTS',))[1] or []
+        return []
+
+    def _getSharedEventArrays(self):
+        """Read new events from each shared memory event buffer, returning
+        a dict of event type id : numpy structured array."""
+        arrays = {}
+        for eid, sbuffer in self._sharedEventBuffers.items():
+            a = sbuffer.read()
+            if len(a):
+                arrays[eid] = a
+        return arrays
+
+    def _getSharedEvents(self):
+        """Read new events from the shared memory event buffers as a time
+        sorted list of event value lists (as returned by a udp
+        GET_EVENTS request)."""
+        events = self._getUnsharedEvents()
+        for a in self._getSharedEventArrays().values():
+            events.extend(self._convertList(e) for e in a.tolist())
+        if not events:
+            return None
+        events.sort(key=itemgetter(DeviceEvent.EVENT_HUB_TIME_INDEX))
+        return events
+
+    def _clearSharedEvents(self):
+        if self._sharedEventBuffers:
+            for sbuffer in self._sharedEventBuffers.values():
+                sbuffer.clear()
+
+    def _closeSharedEventBuffers(self):
+        if self._sharedEventBuffers:
+            for sbuffer in self._sharedEventBuffers.values():
+                sbuffer.close()
+        self._sharedEventBuffers = None
+
     def _convertDict(self, d):
         r = {}
         for k, v in d.items():
@@ -1271,6 +1386,50 @@ class ioHubConnection():
         etype = evt_data[DeviceEvent.EVENT_TYPE_ID_INDEX]
         return EventConstants.getClass(etype).createEventAsNamedTuple(evt_data)
 
+    @staticmethod
+    def eventListToArrays(evt_list, as_type='numpy'):
+        """Convert a list of ioHub events in list value format into a dict
+        of event type name : numpy structured array (using the event class
+        NUMPY_DTYPE), keeping the order of the events. If as_type is
+        'pandas', each array is converted to a pandas DataFrame."""
+        by_type = {}
+        for evt in evt_list:
+            etype = evt[DeviceEvent.EVENT_TYPE_ID_INDEX]
+            by_type.setdefault(etype, []).append(evt)
+
+        arrays = {}
+        for etype, events in by_type.items():
+            dtype = EventConstants.getClass(etype).NUMPY_DTYPE
+            str_fields = [i for i, n in enumerate(dtype.names)
+                          if dtype.fields[n][0].kind == 'S']
+            if str_fields:
+                events = [list(evt) for evt in events]
+                for evt in events:
+                    for i in str_fields:
+                        if isinstance(evt[i], str):
+                            evt[i] = evt[i].encode('utf-8')
+            arrays[EventConstants.getName(etype)] = numpy.array(
+                [tuple(evt) for evt in events], dtype=dtype)
+
+        if as_type == 'pandas':
+            return ioHubConnection.arraysToDataFrames(arrays)
+        return arrays
+
+    @staticmethod
+    def arraysToDataFrames(arrays):
+        """Convert a dict of numpy event arrays (as returned by
+        eventListToArrays) into a dict of pandas DataFrames, decoding any
+        byte string columns."""
+        import pandas as pd
+        frames = {}
+        for ename, a in arrays.items():
+            df = pd.DataFrame(a)
+            for n in a.dtype.names:
+                if a.dtype.fields[n][0].kind == 'S':
+                    df[n] = df[n].str.decode('utf-8')
+            frames[ename] = df
+        return frames
+
     # client utility methods.
     def _getDeviceList(self):
         r = self._sendToHubServer(('EXP_DEVICE', 'GET_DEVICE_LIST'))
@@ -1288,6 +1447,7 @@ class ioHubConnection():
                 pass
 
             self._shutdown_attempted = True
+            self._closeSharedEventBuffers()
             TimeoutError = psutil.TimeoutExpired
             try:
                 if self.udp_client:  # if it isn't already garbage-collected
@@ -11,6 +11,7 @@ from pkg_resources import parse_version
 from ..server import DeviceEvent
 from ..constants import EventConstants
 from ..errors import ioHubError, printExceptionDetailsToStdErr, print2err
+from ..devices import Computer
 
 import tables
 from tables import parameters, StringCol, UInt32Col, UInt16Col, NoSuchNodeError
@@ -61,6 +62,13 @@ class DataStoreFile():
         self.flushCounter = self.settings.get('flush_interval', 32)
         self._eventCounter = 0
 
+        # Events are collected in a preallocated buffer per table and
+        # appended in chunks, either when a buffer is full or when its
+        # oldest event is older than event_buffer_interval seconds.
+        self.eventBufferLength = self.settings.get('event_buffer_length', 256)
+        self.eventBufferInterval = self.settings.get('event_buffer_interval', 0.25)
+        self._eventBuffers = dict()
+
         self.TABLES = dict()
         self._eventGroupMappings = dict()
         self.emrtFile = open_file(self.filePath, mode=fmode)
@@ -138,7 +146,11 @@ class DataStoreFile():
             return datevts_node._f_get_child(evt_group_label)
 
     def updateDataStoreStructure(self, device_instance, event_class_dict):
-        dfilter = tables.Filters(complevel=0, complib='zlib', shuffle=False, fletcher32=False)
+        complevel = self.settings.get('compression_level', 0)
+        dfilter = tables.Filters(complevel=complevel,
+                                 complib=self.settings.get('compression_lib', 'zlib'),
+                                 shuffle=complevel > 0, fletcher32=False)
+        chunkshape = self.settings.get('table_chunkshape')
 
         for event_cls_name, event_cls in event_class_dict.items():
             if event_cls.IOHUB_DATA_TABLE:
@@ -152,7 +164,8 @@ class DataStoreFile():
                                                                      tc_name,
                                                                      event_cls.NUMPY_DTYPE,
                                                                      title='%s Data' % dc_name,
-                                                                     filters=dfilter.copy())
+                                                                     filters=dfilter.copy(),
+                                                                     chunkshape=chunkshape)
                         self.flush()
                     except tables.NodeError:
                         self.TABLES[table_label] = self.groupNodeForEvent(event_cls)._f_get_child(tc_name)
@@ -314,13 +327,12 @@ class DataStoreFile():
                 return False
             etype = event[DeviceEvent.EVENT_TYPE_ID_INDEX]
             eventClass = EventConstants.getClass(etype)
-            etable = self.TABLES[eventClass.IOHUB_DATA_TABLE]
             event[DeviceEvent.EVENT_EXPERIMENT_ID_INDEX] = self.active_experiment_id
             event[DeviceEvent.EVENT_SESSION_ID_INDEX] = self.active_session_id
 
-            np_array = np.array([tuple(event), ], dtype=eventClass.NUMPY_DTYPE)
-            etable.append(np_array)
-            self.bufferedFlush()
+            ebuffer = self._getEventBuffer(eventClass)
+            if ebuffer.add(event):
+                self._writeEventBuffer(ebuffer)
         except Exception:
             print2err("Error saving event: ", event)
             printExceptionDetailsToStdErr()
@@ -334,22 +346,57 @@ class DataStoreFile():
 
             etype = event[DeviceEvent.EVENT_TYPE_ID_INDEX]
             eventClass = EventConstants.getClass(etype)
-            etable = self.TABLES[eventClass.IOHUB_DATA_TABLE]
 
-            np_events = []
+            ebuffer = self._getEventBuffer(eventClass)
             for event in events:
                 event[DeviceEvent.EVENT_EXPERIMENT_ID_INDEX] = self.active_experiment_id
                 event[DeviceEvent.EVENT_SESSION_ID_INDEX] = self.active_session_id
-                np_events.append(tuple(event))
-
-            np_array = np.array(np_events, dtype=eventClass.NUMPY_DTYPE)
-            etable.append(np_array)
-            self.bufferedFlush(len(np_events))
+                if ebuffer.add(event):
+                    self._writeEventBuffer(ebuffer)
         except ioHubError as e:
             print2err(e)
         except Exception:
             printExceptionDetailsToStdErr()
 
+    def _getEventBuffer(self, eventClass):
+        table_label = eventClass.IOHUB_DATA_TABLE
+        ebuffer = self._eventBuffers.get(table_label)
+        if ebuffer is None:
+            ebuffer = EventTableBuffer(self.TABLES[table_label],
+                                       eventClass.NUMPY_DTYPE,
+                                       self.eventBufferLength)
+            self._eventBuffers[table_label] = ebuffer
+        return ebuffer
+
+    def _writeEventBuffer(self, ebuffer):
+        count = ebuffer.write()
+        if count:
+            self.bufferedFlush(count)
+
+    def writeEventBuffers(self, maxAge=None):
+        """
+        Append the events held in the table buffers to their tables.
+        If maxAge is given, only buffers whose oldest event was added more
+        than maxAge seconds ago are written.
+        """
+        if maxAge is not None:
+            oldest = Computer.getTime() - maxAge
+        for ebuffer in self._eventBuffers.values():
+            if ebuffer.count and (maxAge is None or ebuffer.firstAddTime <= oldest):
+                try:
+                    self._writeEventBuffer(ebuffer)
+                except Exception:
+                    print2err("Error saving buffered events to: ", ebuffer.table._v_pathname)
+                    printExceptionDetailsToStdErr()
+
+    def checkEventBuffers(self):
+        """
+        Called regularly by the ioHub Server to write any table buffer that
+        has held events for longer than the event_buffer_interval setting.
+        """
+        if self._eventBuffers:
+            self.writeEventBuffers(self.eventBufferInterval)
+
     def bufferedFlush(self, eventCount=1):
         """
         If flushCounter threshold is >=0 then do some checks. If it is < 0,
@@ -370,6 +417,8 @@ class DataStoreFile():
     def flush(self):
         try:
             if self.emrtFile:
+                if self._eventBuffers:
+                    self.writeEventBuffers()
                 self.emrtFile.flush()
         except tables.ClosedFileError:
             pass
@@ -388,6 +437,42 @@ class DataStoreFile():
             pass
 
 
+class EventTableBuffer():
+    """
+    Preallocated structured array holding events waiting to be appended to
+    a DataStore event table. Events are appended in one call per chunk
+    rather than one call per event.
+    """
+    def __init__(self, table, dtype, length):
+        self.table = table
+        self.data = np.zeros(max(1, int(length)), dtype=dtype)
+        self.count = 0
+        self.firstAddTime = None
+
+    def add(self, event):
+        """
+        Add an event to the buffer. Returns True if the buffer is full (and so
+        should be written).
+        """
+        if self.count == 0:
+            self.firstAddTime = Computer.getTime()
+        self.data[self.count] = tuple(event)
+        self.count += 1
+        return self.count >= len(self.data)
+
+    def write(self):
+        """
+        Append the buffered events to the table, returning the number of events
+        written.
+        """
+        count = self.count
+        if count:
+            self.table.append(self.data[:count])
+            self.count = 0
+            self.firstAddTime = None
+        return count
+
+
 ## -------------------- Utility Functions ------------------------ ##
 
 
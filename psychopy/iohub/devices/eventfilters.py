@@ -4,6 +4,7 @@
 # Distributed under the terms of the GNU General Public License (GPL).
 
 import numpy as np
+from bisect import bisect_left, insort
 from collections import deque
 
 from ..util import NumPyRingBuffer
@@ -138,18 +139,34 @@ class MovingWindowFilter():
     value is added to the MovingWindow using MovingWindow.add.
     None is returned until the MovingWindow is full.
 
-    The base class implements a moving window averaging filter, no weights.
-    To change the filter used, extend this class and replace the filteredValue
-    method.
+    Several fields of the same event can be filtered in one pass by giving
+    a list of field names as 'event_field_names' instead of
+    'event_field_name'. The window values of all fields are then kept in one
+    two dimensional NumPyRingBuffer and the filtered value is an array with
+    one element per field. When adding values directly (not events), pass a
+    sequence with one value per field and give 'field_count'.
+
+    The base class implements a moving window averaging filter, no weights,
+    using a running sum of the window values. Non finite values (e.g. NaN for
+    missing samples) are counted, and the sum is recalculated when one leaves
+    the window. To change the filter used,
+    extend this class and replace the filteredValue method. Filters that can
+    be updated incrementally can also replace the _updateWindow method, which
+    is called with each value added to, and removed from, the window.
 
     """
 
+    # Number of values added between recalculations of the running sum,
+    # which stops floating point error from accumulating.
+    resync_interval = 2 ** 16
+
     def __init__(self, **kwargs):
         self._inplace = kwargs.get('inplace')
         knot_pos = kwargs.get('knot_pos')
         length = kwargs.get('length')
         event_type = kwargs.get('event_type')
         event_field_name = kwargs.get('event_field_name')
+        event_field_names = kwargs.get('event_field_names')
         if isinstance(knot_pos, str):
             if knot_pos == 'center' and length % 2 == 0:
                 raise ValueError(
@@ -169,14 +186,73 @@ class MovingWindowFilter():
                     'MovingWindow knot_pos must be between 0 and length-1.')
             self._active_index = knot_pos
 
+        self._length = length
         self._event_field_index = None
+        self._event_field_indexes = None
         self._events = None
-        if event_type and event_field_name:
+        if event_type and event_field_names:
+            field_names = EventConstants.getClass(
+                event_type).CLASS_ATTRIBUTE_NAMES
+            self._event_field_indexes = [field_names.index(f)
+                                         for f in event_field_names]
+            self._events = deque(maxlen=length)
+        elif event_type and event_field_name:
             self._event_field_index = EventConstants.getClass(
                 event_type).CLASS_ATTRIBUTE_NAMES.index(event_field_name)
             self._events = deque(maxlen=length)
 
-        self._filtering_buffer = NumPyRingBuffer(length)
+        if event_field_names:
+            self._field_count = len(event_field_names)
+        else:
+            self._field_count = kwargs.get('field_count')
+        if self._field_count:
+            self._filtering_buffer = NumPyRingBuffer(
+                length, dtype=(np.float64, self._field_count))
+        else:
+            self._filtering_buffer = NumPyRingBuffer(length, dtype=np.float64)
+        self._resetWindowState()
+
+    def _resetWindowState(self):
+        self._window_sum = 0.0
+        self._added_count = 0
+        self._nonfinite_count = np.zeros(self._field_count or 1, dtype=int)
+
+    def _updateWindow(self, value, removed):
+        """Update the incremental filter state for a value added to the
+        window. removed is the value that dropped out of the window, or None
+        if the window was not full yet."""
+        removed_nonfinite = False
+        if removed is not None and self._nonfinite_count.any():
+            removed_nonfinite = ~np.isfinite(removed)
+            self._nonfinite_count -= removed_nonfinite
+        self._nonfinite_count += ~np.isfinite(value)
+        if np.any(removed_nonfinite):
+            # the running sum is NaN or inf, so start it again
+            self._window_sum = self._filtering_buffer.getElements().sum(axis=0)
+            self._added_count = 0
+            return
+        if removed is None:
+            self._window_sum = self._window_sum + value
+        else:
+            self._window_sum = self._window_sum + (value - removed)
+        self._added_count += 1
+        if self._added_count >= self.resync_interval:
+            self._window_sum = self._filtering_buffer.getElements().sum(axis=0)
+            self._added_count = 0
+
+    def _appendValue(self, value):
+        fbuffer = self._filtering_buffer
+        if self._field_count:
+            value = np.asarray(value, dtype=np.float64)
+        else:
+            value = float(value)
+        removed = None
+        if fbuffer.isFull():
+            removed = fbuffer[0]
+            if self._field_count:
+                removed = removed.copy()
+        fbuffer.append(value)
+        self._updateWindow(value, removed)
 
     def filteredValue(self):
         """Returns a filtered value based on the data in the window.
@@ -187,7 +263,7 @@ class MovingWindowFilter():
         types can be created.
 
         """
-        return self._filtering_buffer.mean()
+        return self._window_sum / self._length
 
     def add(self, event):
         """Add the given iohub event ( in list form ) to the moving window. The
@@ -199,17 +275,26 @@ class MovingWindowFilter():
         filtered.
 
         """
-        if isinstance(event, (list, tuple)):
-            self._filtering_buffer.append(event[self._event_field_index])
+        if isinstance(event, (list, tuple)) and self._events is not None:
+            if self._event_field_indexes:
+                self._appendValue([event[i]
+                                   for i in self._event_field_indexes])
+            else:
+                self._appendValue(event[self._event_field_index])
             self._events.append(event)
             if self.isFull():
+                filtered_value = self.filteredValue()
+                filtered_event = self._events[self._active_index]
                 if self._inplace:
-                    self._events[
-                        self._active_index][
-                        self._event_field_index] = self.filteredValue()
-                return self._events[self._active_index], self.filteredValue()
+                    if self._event_field_indexes:
+                        for i, v in zip(self._event_field_indexes,
+                                        filtered_value):
+                            filtered_event[i] = v
+                    else:
+                        filtered_event[self._event_field_index] = filtered_value
+                return filtered_event, filtered_value
         else:
-            self._filtering_buffer.append(event)
+            self._appendValue(event)
             if self.isFull():
                 return None, self.filteredValue()
 
@@ -218,6 +303,7 @@ class MovingWindowFilter():
 
     def clear(self):
         self._filtering_buffer.clear()
+        self._resetWindowState()
         if self._events:
             self._events.clear()
 # ------
@@ -235,6 +321,9 @@ class PassThroughFilter(MovingWindowFilter):
         kwargs['knot_pos'] = 0
         MovingWindowFilter.__init__(self, **kwargs)
 
+    def _updateWindow(self, value, removed):
+        pass
+
     def filteredValue(self):
         return self._filtering_buffer[0]
 
@@ -246,13 +335,47 @@ class MedianFilter(MovingWindowFilter):
 
     Length must be odd.
 
+    A sorted copy of the window values is updated as each value is added,
+    so the median is found without sorting the whole window each time.
+    NaN is returned while the window contains a NaN value.
+
     """
 
     def __init__(self, **kwargs):
         MovingWindowFilter.__init__(self, **kwargs)
 
+    def _resetWindowState(self):
+        self._sorted_values = [[] for _ in range(self._field_count or 1)]
+        self._nan_counts = [0] * len(self._sorted_values)
+
+    def _updateWindow(self, value, removed):
+        if not self._field_count:
+            value = [value]
+            if removed is not None:
+                removed = [removed]
+        for f, sorted_values in enumerate(self._sorted_values):
+            # NaNs can't be ordered, so they are counted instead of sorted
+            if removed is not None:
+                if removed[f] != removed[f]:
+                    self._nan_counts[f] -= 1
+                else:
+                    del sorted_values[bisect_left(sorted_values, removed[f])]
+            if value[f] != value[f]:
+                self._nan_counts[f] += 1
+            else:
+                insort(sorted_values, value[f])
+
     def filteredValue(self):
-        return np.median(self._filtering_buffer.getElements())
+        mid = self._length // 2
+        if self._length % 2:
+            medians = [s[mid] if not n else np.nan
+                       for s, n in zip(self._sorted_values, self._nan_counts)]
+        else:
+            medians = [(s[mid - 1] + s[mid]) / 2.0 if not n else np.nan
+                       for s, n in zip(self._sorted_values, self._nan_counts)]
+        if self._field_count:
+            return np.asarray(medians)
+        return medians[0]
 
 # ------
 
@@ -272,14 +395,17 @@ class WeightedAverageFilter(MovingWindowFilter):
         length = len(weights)
         kwargs['length'] = length
         MovingWindowFilter.__init__(self, **kwargs)
-        weights = np.asanyarray(weights)
+        weights = np.asanyarray(weights, dtype=np.float64)
         self._weights = weights / np.sum(weights)
+        # FIR coefficients in window order; the same result as
+        # np.convolve(window, weights, 'valid').
+        self._fir = np.ascontiguousarray(self._weights[::-1])
+
+    def _updateWindow(self, value, removed):
+        pass
 
     def filteredValue(self):
-        return np.convolve(
-            self._filtering_buffer.getElements(),
-            self._weights,
-            'valid')
+        return np.dot(self._fir, self._filtering_buffer.getElements())
 
 
 # ------
@@ -296,6 +422,8 @@ class StampFilter(MovingWindowFilter):
 
     If levels = 2, then the filter would use data returned from a sub filter
     instance of the Stampe filter., Etc.
+
+    StampFilter only supports filtering a single event field.
     """
 
     def __init__(self, **kwargs):
@@ -311,6 +439,9 @@ class StampFilter(MovingWindowFilter):
             kwargs['level'] = level
             self.sub_filter = StampFilter(**kwargs)
 
+    def _updateWindow(self, value, removed):
+        pass
+
     def filteredValue(self):
         if self.sub_filter:
             return self.sub_filter.filteredValue()
@@ -327,7 +458,6 @@ class StampFilter(MovingWindowFilter):
                 self._filtering_buffer.append(sub_result[1])
                 self._events.append(event)
         return MovingWindowFilter.add(self, event)
-
 # ------
 
 #################### TEST ###############################
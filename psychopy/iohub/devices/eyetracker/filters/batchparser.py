@@ -0,0 +1,420 @@
+# Part of the psychopy.iohub library.
+# Copyright (C) 2012-2016 iSolver Software Solutions
+# Distributed under the terms of the GNU General Public License (GPL).
+
+"""
+ioHub Eye Tracker Offline (Batch) Sample Event Parser
+
+Batch counterpart of the online EyeTrackerEventParser found in parser.py.
+Instead of processing samples one at a time as they arrive from the eye
+tracker, EyeTrackerBatchEventParser takes a whole eye sample table (for
+example read from an ioHub HDF5 file using ExperimentDataAccessUtility) as a
+numpy structured array and creates fixation, saccade and blink events for it
+using vectorised numpy operations.
+
+The parsing steps follow the online parser:
+
+* Binocular samples are converted to monocular samples. When both eyes are
+  valid the eye positions are averaged, otherwise the valid eye is used.
+  Samples with no valid eye data are tagged as missing data.
+* Gaze positions are converted to visual angles and the angle and pupil size
+  of missing data samples are linearly interpolated.
+* Unfiltered velocities are calculated from the angle data, after which
+  the position and velocity filters are applied. Filters are given using the
+  same dicts as the online parser, i.e. {'name': 'MedianFilter',
+  'length': 3, 'knot_pos': 'center'}. Samples at the start and end of the
+  data that do not have a full filter window are left unfiltered.
+* x and y velocity thresholds are calculated for each sample from the
+  previous adaptive_vel_thresh_history seconds of positive velocities using
+  the same iterative mean + 3 * std algorithm as the online parser. Samples
+  that occur before enough velocity history is available use the first
+  threshold calculated. Thresholds are saved in the raw_x and raw_y sample
+  fields, as done by the online parser.
+* Each sample is categorised as missing data (blink), saccade or fixation,
+  and events are created for each run of samples with the same category.
+  Like the online parser, the first and last runs of the data are not
+  complete so they do not create events.
+
+Example:
+
+    from psychopy.iohub.datastore.util import ExperimentDataAccessUtility
+    from psychopy.iohub.devices.eyetracker.filters.batchparser import \\
+        EyeTrackerBatchEventParser
+
+    dataFile = ExperimentDataAccessUtility('.', 'events.hdf5')
+    parser = EyeTrackerBatchEventParser(
+        sampling_rate=500,
+        display_device={'mm_size': {'width': 500, 'height': 280},
+                        'pixel_res': (1920, 1080),
+                        'eye_distance': 550},
+        position_filter={'name': 'MedianFilter', 'length': 3,
+                         'knot_pos': 'center'})
+    events = parser.parseDataFile(dataFile)
+    fixations = events[EventConstants.FIXATION_END]
+    print(fixations['duration'].mean())
+"""
+from collections import OrderedDict
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from ....constants import EventConstants
+from ....util.visualangle import VisualAngleCalc
+from ..eye_events import (MonocularEyeSampleEvent, FixationStartEvent,
+                          FixationEndEvent, SaccadeStartEvent,
+                          SaccadeEndEvent, BlinkStartEvent, BlinkEndEvent)
+
+LEFT_EYE = 1
+
+# Sample categories
+FIX = 0
+SAC = 1
+MIS = 2
+
+# Maximum number of velocity values processed at once when calculating
+# the adaptive velocity thresholds.
+_THRESHOLD_CHUNK_SIZE = 2 ** 22
+
+_BASE_FIELDS = ('experiment_id', 'session_id', 'device_id', 'event_id',
+                'device_time', 'logged_time', 'time', 'eye', 'status')
+
+
+class EyeTrackerBatchEventParser():
+    """Offline, vectorised version of the online EyeTrackerEventParser.
+
+    :param sampling_rate: (int) sampling rate of the eye tracker in Hz.
+    :param display_device: (dict) with 'mm_size' ({'width': w, 'height': h}),
+        'pixel_res' and 'eye_distance' keys, as given to the online parser.
+    :param position_filter: (dict) optional filter for the angle data.
+    :param velocity_filter: (dict) optional filter for the velocity data.
+    :param adaptive_vel_thresh_history: (float) seconds of velocity history
+        used to calculate the adaptive velocity thresholds.
+    :param threshold_update_interval: (int) number of positive velocity
+        samples between velocity threshold updates. 1 (the default)
+        updates the thresholds for every sample like the online parser;
+        larger values are faster for long recordings.
+    """
+    def __init__(self, sampling_rate, display_device, position_filter=None,
+                 velocity_filter=None, adaptive_vel_thresh_history=3.0,
+                 threshold_update_interval=1):
+        self.sampling_rate = sampling_rate
+        self.position_filter = dict(position_filter or {})
+        self.velocity_filter = dict(velocity_filter or {})
+        self.vel_thresh_history_dur = adaptive_vel_thresh_history
+        self.vel_thresh_length = max(
+            int(adaptive_vel_thresh_history * sampling_rate), 1)
+        self.threshold_update_interval = max(int(threshold_update_interval), 1)
+
+        mm_size = display_device.get('mm_size')
+        if mm_size:
+            mm_size = mm_size['width'], mm_size['height'],
+        self.visual_angle_calc = VisualAngleCalc(
+            mm_size, display_device.get('pixel_res'),
+            display_device.get('eye_distance'))
+        self.pix2deg = self.visual_angle_calc.pix2deg
+
+    def parseDataFile(self, dataFile, sample_type=None):
+        """Parse the eye samples saved in an ioHub DataStore file.
+
+        :param dataFile: an open ExperimentDataAccessUtility instance.
+        :param sample_type: event type id of the samples to parse. If None,
+            the first eye sample type available in the file is used.
+        :return: OrderedDict of event type id -> numpy structured array.
+        """
+        if sample_type is None:
+            sample_types = dataFile.getAvailableEyeSampleTypes(int)
+            if not sample_types:
+                raise ValueError('No eye samples found in the DataStore file.')
+            sample_type = sample_types[0]
+        table = dataFile.getEventTable(sample_type)
+        if table is None:
+            raise ValueError('No %s table found in the DataStore file.' %
+                             EventConstants.getName(sample_type))
+        return self.parse(table.read())
+
+    def parse(self, samples):
+        """Parse a numpy structured array of monocular or binocular eye
+        samples. Samples from different sessions are parsed separately.
+
+        :return: OrderedDict with FIXATION_START, FIXATION_END,
+            SACCADE_START, SACCADE_END, BLINK_START and BLINK_END event type
+            id keys, each mapped to a numpy structured array of events.
+        """
+        samples = np.asarray(samples)
+        session_keys = (samples['experiment_id'].astype(np.uint32) << 8) | \
+            samples['session_id']
+        results = [self._parseSession(samples[session_keys == key])
+                   for key in np.unique(session_keys)]
+        events = OrderedDict()
+        for etype, eclass in _EVENT_CLASSES.items():
+            arrays = [r[etype] for r in results]
+            if arrays:
+                events[etype] = np.concatenate(arrays)
+            else:
+                events[etype] = np.zeros(0, dtype=eclass.NUMPY_DTYPE)
+        return events
+
+    def _parseSession(self, samples):
+        mono, valid = self._convertToMono(samples)
+
+        # Invalid samples before the first and after the last valid sample
+        # can not be interpolated, so they are not parsed.
+        valid_ix = np.flatnonzero(valid)
+        if len(valid_ix) == 0:
+            return self._createEvents(mono[:0], np.zeros(0, np.uint8))
+        mono = mono[valid_ix[0]:valid_ix[-1] + 1]
+        valid = valid[valid_ix[0]:valid_ix[-1] + 1]
+        valid_ix = valid_ix - valid_ix[0]
+
+        angle_x, angle_y = self.pix2deg(mono['gaze_x'][valid].astype(np.float64),
+                                        mono['gaze_y'][valid].astype(np.float64))
+        sample_ix = np.arange(len(mono))
+        angle_x = np.interp(sample_ix, valid_ix, angle_x)
+        angle_y = np.interp(sample_ix, valid_ix, angle_y)
+        mono['pupil_measure1'] = np.interp(
+            sample_ix, valid_ix, mono['pupil_measure1'][valid])
+
+        # Velocity is calculated from the unfiltered angles.
+        velocity_x = np.zeros(len(mono))
+        velocity_y = np.zeros(len(mono))
+        if len(mono) > 1:
+            dt = np.diff(mono['time'])
+            with np.errstate(divide='ignore', invalid='ignore'):
+                velocity_x[1:] = np.abs(np.diff(angle_x)) / dt
+                velocity_y[1:] = np.abs(np.diff(angle_y)) / dt
+        velocity_xy = np.hypot(velocity_x, velocity_y)
+
+        mono['angle_x'] = _applyFilter(angle_x, self.position_filter)
+        mono['angle_y'] = _applyFilter(angle_y, self.position_filter)
+        velocity_x = _applyFilter(velocity_x, self.velocity_filter)
+        velocity_y = _applyFilter(velocity_y, self.velocity_filter)
+        mono['velocity_x'] = velocity_x
+        mono['velocity_y'] = velocity_y
+        mono['velocity_xy'] = _applyFilter(velocity_xy, self.velocity_filter)
+
+        threshold_x = self._velocityThreshold(velocity_x)
+        threshold_y = self._velocityThreshold(velocity_y)
+        mono['raw_x'] = threshold_x
+        mono['raw_y'] = threshold_y
+
+        category = np.full(len(mono), FIX, dtype=np.uint8)
+        category[(velocity_x >= threshold_x) |
+                 (velocity_y >= threshold_y)] = SAC
+        category[~valid] = MIS
+        return self._createEvents(mono, category)
+
+    def _convertToMono(self, samples):
+        """Return the samples as a monocular sample array and a boolean
+        array which is True for samples with valid eye data."""
+        names = samples.dtype.names
+        mono = np.zeros(len(samples), dtype=MonocularEyeSampleEvent.NUMPY_DTYPE)
+        status = samples['status']
+        binocular = 'left_gaze_x' in names
+        for field in mono.dtype.names:
+            if field in names:
+                mono[field] = samples[field]
+            elif not binocular:
+                continue
+            elif field == 'eye':
+                mono[field] = LEFT_EYE
+            elif field.endswith('_type'):
+                mono[field] = samples['left_%s' % field]
+            else:
+                left = samples['left_%s' % field].astype(np.float64)
+                right = samples['right_%s' % field].astype(np.float64)
+                mono[field] = np.where(status == 0, (left + right) / 2.0,
+                                       np.where(status == 20, right, left))
+        mono['type'] = EventConstants.MONOCULAR_EYE_SAMPLE
+        if binocular:
+            return mono, status != 22
+        return mono, status == 0
+
+    def _velocityThreshold(self, velocity):
+        """Adaptive velocity threshold for each sample, calculated from the
+        last vel_thresh_length positive velocities."""
+        threshold = np.full(len(velocity), np.nan)
+        positive_ix = np.flatnonzero(velocity > 0.0)
+        blen = self.vel_thresh_length
+        if len(positive_ix) < blen:
+            return threshold
+
+        windows = sliding_window_view(velocity[positive_ix], blen)
+        rows = np.arange(0, len(windows), self.threshold_update_interval)
+        chunk = max(_THRESHOLD_CHUNK_SIZE // blen, 1)
+        for c in range(0, len(rows), chunk):
+            crows = rows[c:c + chunk]
+            threshold[positive_ix[crows + blen - 1]] = _iterativeThreshold(
+                windows[crows])
+
+        # Each threshold is used until the next one is calculated; samples
+        # before the first threshold use the first one.
+        known = ~np.isnan(threshold)
+        last_known = np.maximum.accumulate(
+            np.where(known, np.arange(len(threshold)), 0))
+        first = np.argmax(known)
+        last_known[:first] = first
+        return threshold[last_known]
+
+    def _createEvents(self, mono, category):
+        events = OrderedDict()
+        n = len(mono)
+        changes = np.flatnonzero(category[1:] != category[:-1]) + 1
+        run_starts = np.concatenate(([0], changes)).astype(np.intp)[:n]
+        run_ends = np.concatenate((changes - 1, [n - 1])).astype(np.intp)[:n]
+        run_category = category[run_starts]
+
+        # The first and last runs do not have a start / end in the data.
+        interior = np.zeros(len(run_starts), dtype=bool)
+        interior[1:-1] = True
+
+        run_stats = _RunStats(mono, run_starts, run_ends)
+        for cat, start_class, end_class in ((FIX, FixationStartEvent, FixationEndEvent),
+                                            (SAC, SaccadeStartEvent, SaccadeEndEvent),
+                                            (MIS, BlinkStartEvent, BlinkEndEvent)):
+            runs = np.flatnonzero(interior & (run_category == cat))
+            starts = run_starts[runs]
+            ends = run_ends[runs]
+            start_events = np.zeros(len(runs), dtype=start_class.NUMPY_DTYPE)
+            for field in start_events.dtype.names:
+                if field in mono.dtype.names:
+                    start_events[field] = mono[field][starts]
+            start_events['type'] = start_class.EVENT_TYPE_ID
+            start_events['filter_id'] = 0
+
+            end_events = np.zeros(len(runs), dtype=end_class.NUMPY_DTYPE)
+            for field in _BASE_FIELDS:
+                end_events[field] = mono[field][ends]
+            end_events['type'] = end_class.EVENT_TYPE_ID
+            end_events['duration'] = mono['time'][ends] - mono['time'][starts]
+            for field in end_events.dtype.names:
+                prefix, _, sample_field = field.partition('_')
+                if sample_field not in mono.dtype.names:
+                    continue
+                if prefix == 'start':
+                    end_events[field] = mono[sample_field][starts]
+                elif prefix == 'end':
+                    end_events[field] = mono[sample_field][ends]
+                elif prefix == 'average':
+                    end_events[field] = run_stats.mean(sample_field, runs)
+            for field in ('velocity_x', 'velocity_y', 'velocity_xy'):
+                if 'peak_%s' % field in end_events.dtype.names:
+                    end_events['peak_%s' % field] = run_stats.max(field, runs)
+            if cat == SAC:
+                dx = mono['gaze_x'][ends] - mono['gaze_x'][starts]
+                dy = mono['gaze_y'][ends] - mono['gaze_y'][starts]
+                end_events['amplitude_x'] = dx
+                end_events['amplitude_y'] = dy
+                end_events['angle'] = np.rad2deg(np.arctan2(dy, dx))
+
+            events[start_class.EVENT_TYPE_ID] = start_events
+            events[end_class.EVENT_TYPE_ID] = end_events
+        return events
+
+
+_EVENT_CLASSES = OrderedDict([
+    (EventConstants.FIXATION_START, FixationStartEvent),
+    (EventConstants.FIXATION_END, FixationEndEvent),
+    (EventConstants.SACCADE_START, SaccadeStartEvent),
+    (EventConstants.SACCADE_END, SaccadeEndEvent),
+    (EventConstants.BLINK_START, BlinkStartEvent),
+    (EventConstants.BLINK_END, BlinkEndEvent)])
+
+
+class _RunStats():
+    """Per run field averages and maximums, calculated as needed."""
+    def __init__(self, mono, run_starts, run_ends):
+        self.mono = mono
+        self.run_starts = run_starts
+        self.run_ends = run_ends
+
+    def mean(self, field, runs):
+        values = self.mono[field]
+        ends = self.run_ends[runs]
+        if field.endswith('_type'):
+            return values[ends]
+        starts = self.run_starts[runs]
+        cumulative = np.concatenate(([0.0], np.cumsum(values, dtype=np.float64)))
+        return (cumulative[ends + 1] - cumulative[starts]) / (ends - starts + 1)
+
+    def max(self, field, runs):
+        if len(runs) == 0:
+            return np.zeros(0)
+        return np.maximum.reduceat(self.mono[field], self.run_starts)[runs]
+
+
+def _iterativeThreshold(windows):
+    """Vectorised version of the iterative velocity threshold calculation
+    used by EyeTrackerEventParser.addVelocityToAdaptiveThreshold, applied to
+    each row of windows."""
+    threshold = windows.min(axis=1) + windows.std(axis=1) * 3.0
+    active = np.ones(len(windows), dtype=bool)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        while active.any():
+            active_ix = np.flatnonzero(active)
+            values = windows[active_ix]
+            below = values < threshold[active_ix, np.newaxis]
+            count = below.sum(axis=1)
+            mean = np.where(below, values, 0.0).sum(axis=1) / count
+            var = np.where(below, (values - mean[:, np.newaxis]) ** 2,
+                           0.0).sum(axis=1) / count
+            new_threshold = mean + 3.0 * np.sqrt(var)
+            done = ~(np.abs(new_threshold - threshold[active_ix]) >= 1.0)
+            threshold[active_ix] = new_threshold
+            active[active_ix[done]] = False
+    return threshold
+
+
+def _knotIndex(knot_pos, length):
+    if knot_pos == 'center':
+        if length % 2 == 0:
+            raise ValueError(
+                'MovingWindow length must be odd for a centered knot_pos.')
+        return length // 2
+    if knot_pos == 'latest':
+        return 0
+    if knot_pos == 'oldest':
+        return length - 1
+    if isinstance(knot_pos, str) or not 0 <= knot_pos < length:
+        raise ValueError(
+            'MovingWindow knot_pos must be between 0 and length-1.')
+    return knot_pos
+
+
+def _applyFilter(values, filter_settings):
+    """Apply an eventfilters field filter, given as a settings dict, to a
+    whole array of values at once."""
+    name = filter_settings.get('name', 'PassThroughFilter')
+    values = np.asarray(values, dtype=np.float64)
+    if name == 'PassThroughFilter':
+        return values
+
+    if name == 'StampFilter':
+        filtered = values.copy()
+        for _ in range(filter_settings.get('level', 1)):
+            v0, v1, v2 = filtered[:-2], filtered[1:-1], filtered[2:]
+            monotonic = ((v0 < v1) & (v1 < v2)) | ((v2 < v1) & (v1 < v0))
+            filtered[1:-1] = np.where(monotonic, v1, (v0 + v2) / 2.0)
+        return filtered
+
+    if name == 'WeightedAverageFilter':
+        weights = np.asarray(filter_settings['weights'], dtype=np.float64)
+        weights = weights / weights.sum()
+        length = len(weights)
+    elif name in ('MovingWindowFilter', 'MedianFilter'):
+        length = filter_settings['length']
+    else:
+        raise ValueError('Unsupported batch parser filter: %s' % name)
+
+    knot = _knotIndex(filter_settings.get('knot_pos', 'center'), length)
+    filtered = values.copy()
+    if len(values) < length:
+        return filtered
+    windows = sliding_window_view(values, length)
+    if name == 'WeightedAverageFilter':
+        window_values = windows.dot(weights)
+    elif name == 'MedianFilter':
+        window_values = np.median(windows, axis=1)
+    else:
+        window_values = windows.mean(axis=1)
+    filtered[knot:knot + len(windows)] = window_values
+    return filtered
@@ -5,6 +5,7 @@
 import struct
 from weakref import proxy
 
+import numpy as np
 from gevent import sleep, Greenlet
 import msgpack
 try:
@@ -132,6 +133,148 @@ class UDPClientConnection(SocketConnection):
         self.sock.settimeout(timeout)
         self.sock.setblocking(blocking)
 
+##### SHARED MEMORY EVENT TRANSPORT ######
+
+# Names of the SharedEventBuffer memory blocks created by this process.
+_ownedSharedMemory = set()
+
+
+class SharedEventBuffer():
+    """A ring buffer of fixed dtype event records held in shared memory.
+
+    Used when the iohub config setting event_transport is 'shared_memory'.
+    The ioHub Server creates one SharedEventBuffer per event type (using the
+    event class NUMPY_DTYPE) and is the only writer. The PsychoPy process
+    attaches to the same block of memory and reads new records as a numpy
+    array, without the events being serialized or sent over UDP.
+
+    The first 8 bytes of the memory hold the total number of records
+    written, and the next 16 the transport status (see setStatus), followed
+    by the records themselves. The reader keeps its own
+    read count, so a reader that falls `length` or more events behind loses
+    the oldest ones (counted in `lost_count`), as the slot being written next
+    is never read.
+    """
+    HEADER_SIZE = 64
+
+    def __init__(self, name, dtype, length, create=False):
+        from multiprocessing import shared_memory
+
+        self.dtype = np.dtype(dtype)
+        self.length = int(length)
+        size = self.HEADER_SIZE + self.length * self.dtype.itemsize
+        if create:
+            self._shm = shared_memory.SharedMemory(name=name, create=True,
+                                                   size=size)
+            _ownedSharedMemory.add(self._shm.name)
+        else:
+            self._shm = shared_memory.SharedMemory(name=name)
+            # The ioHub Server owns (and unlinks) the memory, so stop the
+            # resource tracker of this process from removing it at exit.
+            # If the owner is in this process, its unlink() unregisters it.
+            if (Computer.platform != 'win32' and
+                    self._shm.name not in _ownedSharedMemory):
+                try:
+                    from multiprocessing import resource_tracker
+                    resource_tracker.unregister(self._shm._name,
+                                                'shared_memory')
+                except Exception: # pylint: disable=broad-except
+                    pass
+        self.name = self._shm.name
+        self._owner = create
+        self._count = np.ndarray((1,), dtype=np.int64, buffer=self._shm.buf)
+        self._status = np.ndarray((2,), dtype=np.int64, buffer=self._shm.buf,
+                                  offset=8)
+        self._records = np.ndarray((self.length,), dtype=self.dtype,
+                                   buffer=self._shm.buf,
+                                   offset=self.HEADER_SIZE)
+        if create:
+            self._count[0] = 0
+            self._status[:] = 0
+        # A new reader gets every record written since the buffer was
+        # created (that is still in the ring), as none have been read yet.
+        self._read_count = 0
+        self.lost_count = 0
+        # Indexes of byte string fields; str values are utf-8 encoded
+        # before being stored.
+        self._str_fields = [i for i, n in enumerate(self.dtype.names)
+                            if self.dtype.fields[n][0].kind == 'S']
+
+    def write(self, event):
+        """Add an event (list of attribute values) to the buffer."""
+        if self._str_fields:
+            event = list(event)
+            for i in self._str_fields:
+                if isinstance(event[i], str):
+                    event[i] = event[i].encode('utf-8')
+        count = int(self._count[0])
+        self._records[count % self.length] = tuple(event)
+        # only publish the new count once the record is complete
+        self._count[0] = count + 1
+
+    def read(self):
+        """Return a numpy array (a copy) of the records written since the
+        last read() or clear()."""
+        start = self._read_count
+        end = int(self._count[0])
+        length = self.length
+        if end == start:
+            return self._records[:0].copy()
+        # The slot after the newest record may be being written, so at most
+        # length - 1 records can be read.
+        if end - start > length - 1:
+            self.lost_count += end - start - (length - 1)
+            start = end - length + 1
+        si = start % length
+        ei = end % length
+        if si < ei:
+            result = self._records[si:ei].copy()
+        else:
+            result = np.concatenate((self._records[si:], self._records[:ei]))
+        # Any records the writer replaced (or started replacing) while they
+        # were being copied are no longer valid, so drop them.
+        overwritten = int(self._count[0]) - length + 1 - start
+        if overwritten > 0:
+            self.lost_count += overwritten
+            result = result[overwritten:]
+        self._read_count = end
+        return result
+
+    def clear(self):
+        """Discard any records that have not been read yet."""
+        self._read_count = int(self._count[0])
+
+    def setStatus(self, buffer_count, pending_count):
+        """Set the state of the whole transport, written by the ioHub Server
+        to every buffer: the number of shared buffers it has created, and the
+        number of events waiting in its udp event buffer (events with no
+        shared buffer, to be fetched with a GET_EVENTS request)."""
+        self._status[0] = buffer_count
+        self._status[1] = pending_count
+
+    def getStatus(self):
+        """Return the (buffer_count, pending_count) set by setStatus."""
+        return int(self._status[0]), int(self._status[1])
+
+    def close(self):
+        if self._shm is None:
+            return
+        self._count = None
+        self._status = None
+        self._records = None
+        try:
+            self._shm.close()
+            if self._owner:
+                _ownedSharedMemory.discard(self._shm.name)
+                self._shm.unlink()
+        except Exception: # pylint: disable=broad-except
+            pass
+        self._shm = None
+
+    def __del__(self):
+        self.close()
+
+
 ##### TIME SYNC CLASS ######
 
 
@@ -23,7 +23,7 @@ except ImportError:
 
 from . import IOHUB_DIRECTORY, EXP_SCRIPT_DIRECTORY, _DATA_STORE_AVAILABLE
 from .errors import print2err, printExceptionDetailsToStdErr, ioHubError
-from .net import MAX_PACKET_SIZE
+from .net import MAX_PACKET_SIZE, SharedEventBuffer
 from .util import convertCamelToSnake, win32MessagePump
 from .util import yload, yLoader
 from .constants import DeviceConstants, EventConstants
@@ -218,6 +218,7 @@ class udpServer(DatagramServer):
             self.iohub.processDeviceEvents()
             currentEvents = list(self.iohub.eventBuffer)
             self.iohub.eventBuffer.clear()
+            self.iohub.updateSharedEventStatus()
 
             if len(currentEvents) > 0:
                 currentEvents = sorted(
@@ -244,6 +245,10 @@ class udpServer(DatagramServer):
             exp_dev_cb = io_dev_dict['Experiment']._nativeEventCallback
             for eventAsTuple in exp_events:
                 exp_dev_cb(eventAsTuple)
+            if self.iohub.sharedEventBuffers is not None:
+                # the client reads shared memory without a GET_EVENTS
+                # request, so write the messages before replying
+                self.iohub.processDeviceEvents()
             self.sendResponse(('EVENT_TX_RESULT', len(exp_events)), replyTo)
             return True
         elif request_type == 'DEV_RPC':
@@ -526,10 +531,21 @@ class udpServer(DatagramServer):
     def setProcessAffinity(processorList):
         return Computer.setCurrentProcessAffinity(processorList)
 
+    def getSharedEventBuffers(self):
+        """
+        Returns a list of [event_type_id, shared_memory_name, length] for each
+        shared memory event buffer, or None if the event_transport setting is
+        not 'shared_memory'.
+        """
+        sbuffers = self.iohub.sharedEventBuffers
+        if sbuffers is None:
+            return None
+        return [[eid, sb.name, sb.length] for eid, sb in sbuffers.items()]
+
     def flushIODataStoreFile(self):
         dsfile = self.iohub.dsfile
         if dsfile:
-            dsfile.emrtFile.flush()
+            dsfile.flush()
             return True
         return False
 
@@ -593,6 +609,14 @@ class ioServer():
         self._all_dev_conf_errors = []
         ebuf_sz = config.get('global_event_buffer', 2048)
         ioServer.eventBuffer = deque(maxlen=ebuf_sz)
+        # event type id -> SharedEventBuffer, when events are sent to the
+        # psychopy process using shared memory instead of udp.
+        self.sharedEventBuffers = None
+        # event type ids whose shared buffer could not be created; their
+        # events are kept in eventBuffer for GET_EVENTS requests.
+        self._unsharedEventTypes = set()
+        if config.get('event_transport', 'udp') == 'shared_memory':
+            self.sharedEventBuffers = OrderedDict()
 
         self._running = True
         # start UDP service
@@ -710,6 +734,8 @@ class ioServer():
                 dinstance, dconf, devt_ids, devt_classes = dev_data
                 DeviceConstants.addClassMapping(dinstance.__class__)
                 EventConstants.addClassMappings(devt_ids, devt_classes)
+                if dconf.get('stream_events') is True:
+                    self.createSharedEventBuffers(devt_ids)
             else:
                 print2err('## Device was not started by the ioHub Server: ',
                           dev_cls_name)
@@ -907,6 +933,41 @@ class ioServer():
 
             return dev_instance, dev_conf, monitor_evt_ids, evt_classes
 
+    def createSharedEventBuffers(self, event_ids):
+        if self.sharedEventBuffers is None:
+            return
+        length = self.config.get('shared_memory_buffer_length', 4096)
+        for eid in event_ids:
+            if eid in self.sharedEventBuffers:
+                continue
+            evt_cls = EventConstants.getClass(eid)
+            try:
+                name = 'iohub_{}_{}'.format(os.getpid(), eid)
+                self.sharedEventBuffers[eid] = SharedEventBuffer(
+                    name, evt_cls.NUMPY_DTYPE, length, create=True)
+            except Exception:
+                self._unsharedEventTypes.add(eid)
+                print2err('Error creating shared memory event buffer for: ',
+                          evt_cls)
+                printExceptionDetailsToStdErr()
+        self.updateSharedEventStatus()
+
+    def updateSharedEventStatus(self):
+        """Tell the psychopy process (through the header of every shared
+        buffer) how many shared buffers there are, and how many events are
+        waiting in eventBuffer for a GET_EVENTS request."""
+        if self.sharedEventBuffers:
+            buffer_count = len(self.sharedEventBuffers)
+            pending_count = len(self.eventBuffer)
+            for sbuffer in self.sharedEventBuffers.values():
+                sbuffer.setStatus(buffer_count, pending_count)
+
+    def closeSharedEventBuffers(self):
+        if self.sharedEventBuffers:
+            for sbuffer in self.sharedEventBuffers.values():
+                sbuffer.close()
+            self.sharedEventBuffers.clear()
+
     def log(self, text, level=None):
         try:
             log_time = getTime()
@@ -971,7 +1032,27 @@ class ioServer():
                 printExceptionDetailsToStdErr()
                 print2err('--------------------------------------')
 
+        if self.dsfile:
+            self.dsfile.checkEventBuffers()
+
     def _handleEvent(self, event):
+        if self.sharedEventBuffers is not None:
+            etype = event[DeviceEvent.EVENT_TYPE_ID_INDEX]
+            sbuffer = self.sharedEventBuffers.get(etype)
+            if sbuffer is None and etype not in self._unsharedEventTypes:
+                # e.g. the output of an event filter
+                self.createSharedEventBuffers([etype])
+                sbuffer = self.sharedEventBuffers.get(etype)
+            if sbuffer is not None:
+                try:
+                    sbuffer.write(event)
+                except Exception:
+                    print2err('Error writing event to shared memory: ', event)
+                    printExceptionDetailsToStdErr()
+                return
+            self.eventBuffer.append(event)
+            self.updateSharedEventStatus()
+            return
         self.eventBuffer.append(event)
 
     def clearEventBuffer(self, call_proc_events=True):
@@ -979,6 +1060,7 @@ class ioServer():
             self.processDeviceEvents()
         l = len(self.eventBuffer)
         self.eventBuffer.clear()
+        self.updateSharedEventStatus()
         return l
 
     def checkForPsychopyProcess(self, sleep_interval):
@@ -1022,6 +1104,8 @@ class ioServer():
 
             self.closeDataStoreFile()
 
+            self.closeSharedEventBuffers()
+
             while self.devices:
                 self.devices.pop(0)._close()
         except Exception:
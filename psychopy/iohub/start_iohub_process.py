@@ -64,7 +64,8 @@ def run(rootScriptPathDir, configFilePath):
             m.start()
             glets.append(m)
 
-        tlet = gevent.spawn(s.processEventsTasklet, 0.01)
+        tlet = gevent.spawn(s.processEventsTasklet,
+                            s.config.get('process_events_interval', 0.01))
         glets.append(tlet)
 
         if Computer.psychopy_process:
@@ -29,15 +29,19 @@ messages, (which PsychoPy doesn't use) using the commands::
 """
 
 # Much of the code below is based conceptually, if not syntactically, on the
-# python logging module but it's simpler (no threading) and maintaining a
-# stack of log entries for later writing (don't want files written while
-# drawing)
+# python logging module but it's simpler (no threading by default) and
+# maintaining a stack of log entries for later writing (don't want files
+# written while drawing). Optionally a background writer thread can do the
+# writing so that it never happens on the experiment thread at all.
 
 from os import path
 import atexit
 import sys
 import codecs
 import locale
+import struct
+import threading
+from collections import deque
 from pathlib import Path
 
 from psychopy import clock
@@ -119,20 +123,44 @@ def setDefaultClock(clock):
 
 
 class _LogEntry():
+    """A single log message. Uses `__slots__` and computes the derived
+    attributes (`t_ms`, `levelname`) only when they are asked for (usually
+    when the entry is formatted in :meth:`_Logger.flush`), so creating one
+    is cheap.
+
+    Entries act as a mapping of their attribute names so that they can be
+    used directly with the logger's format string.
+    """
+    __slots__ = ('t', 'level', 'message', 'obj')
 
     def __init__(self, level, message, t=None, obj=None):
-        super(_LogEntry, self).__init__()
-        try:
-            "%0.4f" % (t)
-        except (ValueError, TypeError):
-            raise ValueError("Value \"%s\" of log message \"%s\" could not be coerced to string from numeric" % (t, message))
+        if t.__class__ not in _numericTimeTypes:
+            try:
+                "%0.4f" % (t)
+            except (ValueError, TypeError):
+                raise ValueError("Value \"%s\" of log message \"%s\" could not be coerced to string from numeric" % (t, message))
         self.t = t
-        self.t_ms = t * 1000
         self.level = level
-        self.levelname = getLevel(level)
         self.message = message
         self.obj = obj
 
+    @property
+    def t_ms(self):
+        return self.t * 1000
+
+    @property
+    def levelname(self):
+        return getLevel(self.level)
+
+    def __getitem__(self, key):
+        try:
+            return getattr(self, key)
+        except AttributeError:
+            raise KeyError(key)
+
+
+_numericTimeTypes = (float, int)
+
 
 class LogFile():
     """A text stream to receive inputs from the logging system
@@ -224,6 +252,132 @@ class LogFile():
             pass
 
 
+class BinaryLogFile(LogFile):
+    """A compact binary stream to receive inputs from the logging system.
+
+    Entries are stored as fixed-size records (time, level, message length)
+    followed by the UTF-8 encoded message, which is much smaller and faster
+    to write than the text format. Use :func:`readBinaryLog` or
+    :func:`convertBinaryLog` to get the text version afterwards.
+    """
+
+    _header = b'PSYPYLOG\x01'
+    _record = struct.Struct('<dhI')  # t, level, length of message in bytes
+
+    def __init__(self, f, level=WARNING, filemode='ab', logger=None):
+        """Create a binary log file as a target for logged entries of a given
+        level
+
+        :parameters:
+
+            - f:
+                a path to the file (created if it doesn't exist) or a file
+                object opened in binary mode
+
+            - level:
+                The minimum level of importance that a message must have
+                to be logged by this target.
+
+            - filemode: 'ab', 'wb'
+                Append or overwrite existing log file
+
+        """
+        if isinstance(f, Path):
+            f = str(f)
+        if isinstance(f, str):
+            f = open(f, filemode)
+        elif not hasattr(f, 'write'):
+            raise TypeError("BinaryLogFile needs a filename or a binary "
+                            "file object, not %r" % (f,))
+        if f.tell() == 0:
+            f.write(self._header)
+        LogFile.__init__(self, f, level=level, logger=logger)
+
+    def writeEntries(self, entries):
+        """Write a list of log entries to the file as binary records
+        """
+        if not entries:
+            return
+        pack = self._record.pack
+        chunks = []
+        for entry in entries:
+            msg = str(entry.message).encode('utf-8')
+            chunks.append(pack(entry.t, entry.level, len(msg)))
+            chunks.append(msg)
+        self.stream.write(b''.join(chunks))
+
+    def write(self, txt):
+        """Write a message directly to the log file (without using logging
+        functions). It is stored with the current time and this target's
+        level.
+        """
+        self.writeEntries([_LogEntry(self.level, txt.rstrip('\n'),
+                                     defaultClock.getTime())])
+        self.stream.flush()
+
+
+def readBinaryLog(f):
+    """Read the entries stored by a :class:`BinaryLogFile`.
+
+    :parameters:
+
+        - f:
+            path to the binary log file
+
+    Returns a list of log entries, with attributes `t`, `level`,
+    `levelname` and `message`.
+    """
+    with open(str(f), 'rb') as stream:
+        raw = stream.read()
+    header = BinaryLogFile._header
+    if not raw.startswith(header):
+        raise ValueError("%s is not a PsychoPy binary log file" % (f,))
+    record = BinaryLogFile._record
+    unpack = record.unpack_from
+    recSize = record.size
+    entries = []
+    pos = len(header)
+    end = len(raw)
+    while pos + recSize <= end:
+        t, level, nBytes = unpack(raw, pos)
+        pos += recSize
+        msg = raw[pos:pos + nBytes].decode('utf-8', errors='replace')
+        pos += nBytes
+        entries.append(_LogEntry(level, msg, t))
+    return entries
+
+
+def convertBinaryLog(f, target=None, level=NOTSET, format=None):
+    """Convert a :class:`BinaryLogFile` into the standard text log format.
+
+    :parameters:
+
+        - f:
+            path to the binary log file
+
+        - target:
+            path of the text file to write. If None, the text is returned
+            as a string instead
+
+        - level:
+            minimum level of the entries to include
+
+        - format:
+            the format string for each entry (defaults to the format of the
+            root logger)
+
+    """
+    if format is None:
+        format = root.format
+    lines = [format % entry + '\n'
+             for entry in readBinaryLog(f) if entry.level >= level]
+    txt = ''.join(lines)
+    if target is None:
+        return txt
+    with codecs.open(str(target), 'w', 'utf-8') as stream:
+        stream.write(txt)
+
+
 class _Logger():
     """Maintains a set of log targets (text streams such as files of stdout)
 
@@ -231,17 +385,29 @@ class _Logger():
 
     """
 
-    def __init__(self, format="%(t).4f \t%(levelname)s \t%(message)s"):
+    def __init__(self, format="%(t).4f \t%(levelname)s \t%(message)s",
+                 maxFlushed=None):
         """The string-formatted elements %(xxxx)f can be used, where
         each xxxx is an attribute of the LogEntry.
         e.g. t, t_ms, level, levelname, message
+
+        `maxFlushed` limits how many entries are retained in `.flushed`
+        after being written (None keeps all of them, 0 keeps none).
         """
         super(_Logger, self).__init__()
         self.targets = []
         self.flushed = []
-        self.toFlush = []
+        self.toFlush = deque()
         self.format = format
         self.lowestTarget = 50
+        self.maxFlushed = maxFlushed
+        # used by the (optional) background writer thread
+        self._flushLock = threading.Lock()
+        self._writer = None
+        self._writerWake = threading.Event()
+        self._writerStop = False
+        self._writerInterval = 0.1
+        self._nDropped = 0
 
     def __del__(self):
         self.flush()
@@ -250,6 +416,82 @@ class _Logger():
         # terminal or Builder output. proper fix: fix coder unicode bug #97
         # (currently closed)
 
+    @property
+    def maxFlushed(self):
+        """Maximum number of entries to keep in `.flushed` once they have
+        been written to the targets. `None` (default) keeps every entry, `0`
+        discards them as soon as they are written. Useful for long sessions
+        that log on every frame, where keeping everything grows memory
+        without bound.
+        """
+        return self._maxFlushed
+
+    @maxFlushed.setter
+    def maxFlushed(self, value):
+        self._maxFlushed = value
+        if value is None:
+            self.flushed = list(self.flushed)
+        else:
+            self.flushed = deque(self.flushed, maxlen=int(value))
+
+    @property
+    def backgroundWriter(self):
+        """`True` if a background thread is currently writing log entries
+        (see :meth:`startBackgroundWriter`).
+        """
+        return self._writer is not None and self._writer.is_alive()
+
+    def startBackgroundWriter(self, interval=0.1, bufferSize=100000):
+        """Write log entries from a dedicated background thread.
+
+        Entries logged from the experiment thread are only appended to a
+        buffer; formatting and writing happens on the writer thread, which
+        writes all pending entries to each target in one batch every
+        `interval` seconds (or sooner, when the buffer is half full).
+        Calling :meth:`flush` still writes everything pending before it
+        returns.
+
+        Parameters
+        ----------
+        interval : float
+            Time in seconds between writes from the background thread.
+        bufferSize : int or None
+            Maximum number of entries waiting to be written. If the writer
+            can't keep up, the oldest pending entries are dropped (and a
+            warning reporting how many were lost is written instead) rather
+            than blocking the experiment thread. `None` means unbounded.
+
+        """
+        if self.backgroundWriter:
+            self.stopBackgroundWriter()
+        with self._flushLock:
+            self.toFlush = deque(self.toFlush, maxlen=bufferSize)
+        self._writerInterval = interval
+        self._writerStop = False
+        self._writerWake.clear()
+        self._writer = threading.Thread(
+            target=self._writerLoop, name='PsychoPyLogWriter', daemon=True)
+        self._writer.start()
+
+    def stopBackgroundWriter(self):
+        """Stop the background writer thread (if running) and write any
+        pending entries from the calling thread.
+        """
+        if self._writer is not None:
+            self._writerStop = True
+            self._writerWake.set()
+            self._writer.join()
+            self._writer = None
+        with self._flushLock:
+            self.toFlush = deque(self.toFlush)
+        self.flush()
+
+    def _writerLoop(self):
+        while not self._writerStop:
+            self._writerWake.wait(self._writerInterval)
+            self._writerWake.clear()
+            self.flush()
+
     def addTarget(self, target):
         """Add a target, typically a :class:`~log.LogFile` to the logger
         """
@@ -281,28 +523,62 @@ class _Logger():
         if t is None:
             global defaultClock
             t = defaultClock.getTime()
-        # add message to list
-        self.toFlush.append(
-            _LogEntry(t=t, level=level, message=message, obj=obj))
+        # add message to the queue
+        toFlush = self.toFlush
+        if toFlush.maxlen is not None:
+            nPending = len(toFlush)
+            if nPending >= toFlush.maxlen:
+                self._nDropped += 1  # the oldest entry is about to go
+            elif nPending * 2 >= toFlush.maxlen:
+                self._writerWake.set()
+        toFlush.append(_LogEntry(level, message, t, obj))
 
     def flush(self):
         """Process all current messages to each target
         """
-        # loop through targets then entries in toFlush
-        # so that stream.flush can be called just once
-        formatted = {}  # keep a dict - so only do the formatting once
-        for target in self.targets:
-            for thisEntry in self.toFlush:
-                if thisEntry.level >= target.level:
-                    if not thisEntry in formatted:
-                        # convert the entry into a formatted string
-                        formatted[thisEntry] = self.format % thisEntry.__dict__
-                    target.write(formatted[thisEntry] + '\n')
-            if hasattr(target.stream, 'flush'):
-                target.stream.flush()
-        # finished processing entries - move them to self.flushed
-        self.flushed.extend(self.toFlush)
-        self.toFlush = []  # a new empty list
+        with self._flushLock:
+            # take the pending entries (the queue may still be appended to
+            # by other threads while we do this)
+            entries = []
+            popleft = self.toFlush.popleft
+            try:
+                while True:
+                    entries.append(popleft())
+            except IndexError:
+                pass
+            if self._nDropped:
+                nDropped, self._nDropped = self._nDropped, 0
+                entries.insert(0, _LogEntry(
+                    t=defaultClock.getTime(), level=WARNING,
+                    message="%i log entries were dropped because the log "
+                            "buffer was full" % nDropped))
+            if not entries:
+                return
+            # loop through targets then entries so that each target gets a
+            # single write (and stream.flush) per call
+            formatted = [None] * len(entries)  # only do the formatting once
+            for target in self.targets:
+                writeEntries = getattr(target, 'writeEntries', None)
+                if writeEntries is not None:
+                    # the target takes care of its own (binary) format
+                    level = target.level
+                    writeEntries([e for e in entries if e.level >= level])
+                else:
+                    lines = []
+                    for n, thisEntry in enumerate(entries):
+                        if thisEntry.level >= target.level:
+                            if formatted[n] is None:
+                                # convert the entry into a formatted string
+                                formatted[n] = self.format % thisEntry + '\n'
+                            lines.append(formatted[n])
+                    if lines:
+                        target.write(''.join(lines))
+                if hasattr(target.stream, 'flush'):
+                    target.stream.flush()
+            # finished processing entries - move them to self.flushed
+            if self._maxFlushed != 0:
+                self.flushed.extend(entries)
+
 
 root = _Logger()
 console = LogFile()
@@ -313,6 +589,23 @@ def flush(logger=root):
     """
     logger.flush()
 
+
+def startBackgroundWriter(interval=0.1, bufferSize=100000, logger=root):
+    """Write log entries from a background thread rather than from the thread
+    that calls :func:`flush`. See :meth:`_Logger.startBackgroundWriter`.
+
+    usage::
+        logging.startBackgroundWriter()
+        logging.root.maxFlushed = 0  # don't keep entries once written
+    """
+    logger.startBackgroundWriter(interval=interval, bufferSize=bufferSize)
+
+
+def stopBackgroundWriter(logger=root):
+    """Stop the background writer thread and write any pending entries
+    """
+    logger.stopBackgroundWriter()
+
 # make sure this function gets called as python closes
 atexit.register(flush)
 
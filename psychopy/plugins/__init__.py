@@ -26,10 +26,12 @@ __all__ = [
 
 import os
 import sys
+import json
 import inspect
 import collections
 import hashlib
 import importlib
+from importlib import metadata as importlib_metadata
 import psychopy.tools.pkgtools as pkgtools
 import pkg_resources
 import psychopy.tools.pkgtools as pkgtools
@@ -56,6 +58,10 @@ _installed_plugins_ = collections.OrderedDict()
 # Keep track of plugins that failed to load here
 _failed_plugins_ = []
 
+# Version of the format of the plugin index file, change this if the format
+# changes so old index files are rebuilt
+_pluginIndexVersion = 1
+
 
 # ------------------------------------------------------------------------------
 # Functions
@@ -336,7 +342,137 @@ def installPlugin(package, local=True, upgrade=False, forceReinstall=False,
         noDeps=noDeps)
 
 
-def scanPlugins():
+def _getPluginIndexPath():
+    """Get the path of the file the plugin index is saved to."""
+    return os.path.join(prefs.paths['userPrefsDir'], 'pluginIndex.json')
+
+
+def _getPluginSearchPaths():
+    """Get the directories which are searched for plugin distributions."""
+    paths = [path for path in sys.path if path]  # '' is the working directory
+    pluginDir = prefs.paths['packages']
+    if pluginDir not in paths:
+        paths.append(pluginDir)
+    return paths
+
+
+def _getEnvironmentFingerprint(paths):
+    """Get a hash which changes if packages are added to, upgraded in or
+    removed from the environment.
+
+    Rather than reading the metadata of every package, only the names of the
+    package metadata files and directories (e.g. `.dist-info`) in each
+    directory and the modification times of their `entry_points.txt` files are
+    used. This includes the bundle directories in the plugin directory.
+
+    """
+    infoExts = ('.dist-info', '.egg-info', '.egg-link', '.egg', '.pth')
+    pluginDir = prefs.paths['packages']
+    allPaths = set(paths)
+    if os.path.isdir(pluginDir):
+        allPaths.update(
+            entry.path for entry in os.scandir(pluginDir) if entry.is_dir())
+
+    stamps = []
+    for path in sorted(allPaths):
+        if not os.path.isdir(path):
+            stamps.append((path, os.path.exists(path)))  # e.g. zip files
+            continue
+        try:
+            entries = sorted(os.scandir(path), key=lambda entry: entry.name)
+        except OSError:
+            continue
+        for entry in entries:
+            if not entry.name.endswith(infoExts):
+                continue
+            try:
+                if entry.is_dir():
+                    epFile = os.path.join(entry.path, 'entry_points.txt')
+                    mtime = os.stat(epFile).st_mtime_ns
+                else:
+                    mtime = entry.stat().st_mtime_ns
+            except OSError:  # no entry points
+                mtime = None
+            stamps.append((entry.path, mtime))
+
+    from psychopy import __version__
+    fingerprint = json.dumps(
+        [_pluginIndexVersion, sys.executable, sys.version, __version__,
+         stamps])
+
+    return hashlib.sha256(fingerprint.encode('utf-8')).hexdigest()
+
+
+def _buildPluginIndex(paths):
+    """Find the distributions with entry points into PsychoPy.
+
+    Parameters
+    ----------
+    paths : list
+        Directories to search for distributions.
+
+    Returns
+    -------
+    dict
+        Location and entry points (as a mapping of groups to names and
+        specifiers) of each plugin, by project name.
+
+    """
+    plugins = collections.OrderedDict()
+    for dist in importlib_metadata.distributions(path=paths):
+        # only parse the entry points of packages which might be plugins
+        entryPointsText = dist.read_text('entry_points.txt')
+        if not entryPointsText or '[psychopy' not in entryPointsText:
+            continue
+
+        entryPoints = collections.OrderedDict()
+        for ep in dist.entry_points:
+            entryPoints.setdefault(ep.group, collections.OrderedDict())[
+                ep.name] = ep.value
+
+        if not any([group.startswith('psychopy') for group in entryPoints]):
+            continue
+
+        projectName = pkg_resources.safe_name(dist.metadata['Name'])
+        if projectName in plugins:
+            continue  # found earlier on the path, so that one is used
+
+        plugins[projectName] = {
+            'location': str(dist.locate_file('')),
+            'entryPoints': entryPoints}
+
+    return plugins
+
+
+def _loadPluginIndex(fingerprint):
+    """Load the saved plugin index if it was made for the same environment,
+    else return `None`."""
+    try:
+        with open(_getPluginIndexPath(), 'r', encoding='utf-8') as f:
+            index = json.load(f, object_pairs_hook=collections.OrderedDict)
+    except (OSError, ValueError):
+        return None
+
+    if index.get('fingerprint') != fingerprint:
+        return None
+
+    return index
+
+
+def _savePluginIndex(index):
+    """Save the plugin index for later sessions."""
+    indexPath = _getPluginIndexPath()
+    try:
+        # write then rename, so other sessions never read a partial file
+        with open(indexPath + '.tmp', 'w', encoding='utf-8') as f:
+            json.dump(index, f, indent=1)
+        os.replace(indexPath + '.tmp', indexPath)
+    except OSError as err:
+        logging.debug('Could not save the plugin index to `{}` ({}).'.format(
+            indexPath, err))
+
+
+def scanPlugins(useIndex=True):
     """Scan the system for installed plugins.
 
     This function scans installed packages for the current Python environment
@@ -346,6 +482,18 @@ def scanPlugins():
     called automatically when PsychoPy starts, so you do not need to call this
     unless packages have been added since the session began.
 
+    The plugins found are saved to an index file in the user preferences
+    directory, which is reused by later scans (including in later sessions)
+    until packages are installed or removed, which makes scanning large
+    environments much faster.
+
+    Parameters
+    ----------
+    useIndex : bool
+        Use the saved plugin index if the environment hasn't changed since it
+        was made. If `False`, packages are always scanned and the index is
+        rebuilt.
+
     Returns
     -------
     int
@@ -356,27 +504,46 @@ def scanPlugins():
     global _installed_plugins_
     _installed_plugins_ = {}  # clear installed plugins
 
-    refreshBundlePaths()  # refresh plugin bundles directory
+    paths = _getPluginSearchPaths()
+    fingerprint = _getEnvironmentFingerprint(paths)
+    index = _loadPluginIndex(fingerprint) if useIndex else None
+
+    if index is None:
+        logging.debug('Building plugin index.')
+        bundles = refreshBundlePaths()  # refresh plugin bundles directory
+        pluginDir = prefs.paths['packages']
+        bundlePaths = [os.path.join(pluginDir, bundle) for bundle in bundles]
+        index = {
+            'version': _pluginIndexVersion,
+            'fingerprint': fingerprint,
+            'bundles': bundlePaths,
+            'plugins': _buildPluginIndex(_getPluginSearchPaths())}
+        _savePluginIndex(index)
+    else:
+        # add bundles to the path, as `refreshBundlePaths` would have done
+        for bundlePath in index['bundles']:
+            if bundlePath not in sys.path:
+                sys.path.append(bundlePath)
+            pkgtools.addDistribution(bundlePath)
 
     # make sure we have the plugin directory in the working set
-    pluginDir = prefs.paths['packages']
-    if pluginDir not in pkg_resources.working_set.entries:
-        pkg_resources.working_set.add_entry(pluginDir)
-
-    # find all packages with entry points defined
-    pluginEnv = pkg_resources.Environment()  # supported by the platform
-    dists, _ = pkg_resources.working_set.find_plugins(pluginEnv)
-
-    for dist in dists:
-        entryMap = dist.get_entry_map()
-        if any([i.startswith('psychopy') for i in entryMap.keys()]):
-            logging.debug('Found plugin `{}` at location `{}`.'.format(
-                dist.project_name, dist.location))
-            _installed_plugins_[dist.project_name] = entryMap
+    pkgtools.addDistribution(prefs.paths['packages'])
 
-            # try adding the plugin to the working set
-            if dist.location not in pkg_resources.working_set.entries:
-                pkg_resources.working_set.add(dist)
+    for projectName, plugin in index['plugins'].items():
+        logging.debug('Found plugin `{}` at location `{}`.'.format(
+            projectName, plugin['location']))
+        # Entry points are made without their distribution, which is only
+        # looked up if the plugin is loaded (see `loadPlugin`).
+        entryMap = collections.OrderedDict()
+        for group, entryPoints in plugin['entryPoints'].items():
+            entryMap[group] = collections.OrderedDict(
+                (name, pkg_resources.EntryPoint.parse(
+                    '{} = {}'.format(name, value)))
+                for name, value in entryPoints.items())
+        _installed_plugins_[projectName] = entryMap
+
+        # try adding the plugin to the working set
+        pkgtools.addDistribution(plugin['location'])
 
     return len(_installed_plugins_)
 
@@ -696,6 +863,11 @@ def loadPlugin(plugin):
                     #
                     # return False
             try:
+                if ep.dist is None:
+                    # entry points from the plugin index are made without
+                    # their distribution, which is needed to check the
+                    # plugin's requirements
+                    ep.dist = pkg_resources.get_distribution(plugin)
                 ep = ep.load()  # load the entry point
             except ImportError as e:
                 logging.error(
@@ -720,7 +720,7 @@ class AudioClip:
         return self
 
     def transcribe(self, engine='sphinx', language='en-US', expectedWords=None,
-                   config=None):
+                   config=None, block=True):
         """Convert speech in audio to text.
 
         This feature passes the audio clip samples to a specified text-to-speech
@@ -731,10 +731,10 @@ class AudioClip:
         languages. For more robust transcription capabilities with a greater
         range of language support, online providers such as Google may be used.
 
-        Speech-to-text conversion blocks the main application thread when used
-        on Python. Don't transcribe audio during time-sensitive parts of your
-        experiment! This issue is known to the developers and will be fixed in a
-        later release.
+        Speech-to-text conversion blocks the main application thread by
+        default. Don't transcribe audio during time-sensitive parts of your
+        experiment, or set `block=False` to run the transcription in the
+        background.
 
         Parameters
         ----------
@@ -761,6 +761,12 @@ class AudioClip:
             Additional configuration options for the specified engine. These
             are specified using a dictionary (ex. `config={'pfilter': 1}` will
             enable the profanity filter when using the `'google'` engine).
+        block : bool
+            Wait for the transcription to complete before returning. If
+            `False`, the transcription runs in the background and a
+            :class:`~psychopy.sound.transcribe.PendingTranscriptionResult` is
+            returned straight away, which is filled in when the transcription
+            completes.
 
         Returns
         -------
@@ -788,7 +794,8 @@ class AudioClip:
             engine=engine,
             language=language,
             expectedWords=expectedWords,
-            config=config)
+            config=config,
+            block=block)
 
 
 def load(filename, codec=None):
@@ -11,6 +11,7 @@
 __all__ = ['Microphone']
 
 import sys
+import time
 import psychopy.logging as logging
 from psychopy.constants import NOT_STARTED
 from psychopy.preferences import prefs
@@ -521,6 +522,7 @@ class Microphone:
         self.lastClip = None
         self.scripts = {}
         self.lastScript = None
+        self._pendingScripts = []  # transcriptions running in the background
         self._isStarted = False  # internal state
 
         logging.debug('Audio capture device #{} ready'.format(
@@ -920,7 +922,11 @@ class Microphone:
             transcribe using that engine, or set as `False` to not transcribe.
         kwargs : dict
             Additional keyword arguments to pass to
-            :class:`~psychopy.sound.AudioClip.transcribe()`.
+            :class:`~psychopy.sound.AudioClip.transcribe()`. Pass
+            ``block=False`` to transcribe in the background. The script stored
+            is then a placeholder which is filled in when the transcription
+            completes, call :meth:`waitForTranscriptions()` to make sure all
+            scripts are complete.
 
         """
         # make sure the tag exists in both clips and transcripts dicts
@@ -954,6 +960,11 @@ class Microphone:
 
             self.lastScript = self.lastClip.transcribe(
                 engine=engine, **kwargs)
+
+            # keep track of transcriptions running in the background
+            from psychopy.sound.transcribe import PendingTranscriptionResult
+            if isinstance(self.lastScript, PendingTranscriptionResult):
+                self._pendingScripts.append(self.lastScript)
         else:
             self.lastScript = "Transcription disabled."
 
@@ -968,6 +979,34 @@ class Microphone:
         else:
             return self.lastClip
 
+    def waitForTranscriptions(self, timeout=None):
+        """Wait for transcriptions running in the background to complete.
+
+        Call this at the end of the experiment, before saving data, if clips
+        were banked using ``bank(..., block=False)``.
+
+        Parameters
+        ----------
+        timeout : float or None
+            Maximum time in seconds to wait for. If `None`, wait until all
+            transcriptions are complete.
+
+        Returns
+        -------
+        bool
+            `True` if all transcriptions have completed.
+
+        """
+        deadline = None if timeout is None else time.time() + timeout
+        for script in self._pendingScripts:
+            remaining = None if deadline is None else max(
+                deadline - time.time(), 0.0)
+            script.wait(remaining)
+        self._pendingScripts = [
+            script for script in self._pendingScripts if not script.done]
+
+        return not self._pendingScripts
+
     def clear(self):
         """Wipe all clips. Deletes previously banked audio clips.
         """
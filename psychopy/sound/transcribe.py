@@ -10,6 +10,9 @@
 
 __all__ = [
     'TranscriptionResult',
+    'PendingTranscriptionResult',
+    'TranscriptionQueue',
+    'getTranscriptionQueue',
     'transcribe',
     'TRANSCR_LANG_DEFAULT',
     'BaseTranscriber',
@@ -23,6 +26,7 @@ __all__ = [
 
 import sys
 import os
+import concurrent.futures
 import psychopy.logging as logging
 from psychopy.alerts import alert
 from pathlib import Path
@@ -136,14 +140,12 @@ class TranscriptionResult:
         self._confidence = 0.0  
         self._response = None
         self._expectedWords = None
-        self._requestFailed = True
-        self._unknownValue = True
 
     def __repr__(self):
         return (f"TranscriptionResult(words={self._words}, "
-                f"unknownValue={self._unknownValue}, ",
-                f"requestFailed={self._requestFailed}, ",
-                f"engine={self._engine}, ",
+                f"unknownValue={self._unknownValue}, "
+                f"requestFailed={self._requestFailed}, "
+                f"engine={self._engine}, "
                 f"language={self._language})")
 
     def __str__(self):
@@ -262,6 +264,221 @@ NULL_TRANSCRIPTION_RESULT = TranscriptionResult(
 )
 
 
+class PendingTranscriptionResult(TranscriptionResult):
+    """Placeholder for a transcription running in the background.
+
+    This is returned instead of a :class:`TranscriptionResult` when a
+    transcription is requested with ``block=False``. Until the transcription
+    completes the placeholder has no words and `success` is `False`. Once it
+    completes, all fields are filled in with those of the actual result, so
+    the object can be used anywhere a `TranscriptionResult` is expected. Use
+    `done` to check if the transcription has completed, or `wait()` to block
+    until it has.
+
+    Parameters
+    ----------
+    engine : str
+        Name of engine used to perform this transcription.
+    language : str
+        Identifier for the language used to perform the transcription.
+
+    """
+    __slots__ = ['_future', '_exception']
+
+    def __init__(self, engine, language):
+        TranscriptionResult.__init__(
+            self, [], unknownValue=True, requestFailed=True, engine='null',
+            language=language)
+        self._engine = str(engine)  # don't need the engine module here
+        self._future = None
+        self._exception = None
+
+    def __repr__(self):
+        if not self.done:
+            return (f"PendingTranscriptionResult(engine={self._engine}, "
+                    f"language={self._language})")
+        return TranscriptionResult.__repr__(self)
+
+    @property
+    def done(self):
+        """`True` if the transcription has completed or failed (`bool`)."""
+        return self._future is not None and self._future.done()
+
+    @property
+    def exception(self):
+        """Exception raised by the transcriber, or `None` if the
+        transcription did not fail (`Exception` or `None`)."""
+        return self._exception
+
+    def wait(self, timeout=None):
+        """Wait for the transcription to complete.
+
+        Parameters
+        ----------
+        timeout : float or None
+            Maximum time in seconds to wait for. If `None`, wait until the
+            transcription is complete.
+
+        Returns
+        -------
+        bool
+            `True` if the transcription has completed.
+
+        """
+        if self._future is None:
+            return False
+        concurrent.futures.wait([self._future], timeout=timeout)
+        return self._future.done()
+
+    def result(self, timeout=None):
+        """Wait for the transcription to complete and return this object,
+        which then holds the transcription result.
+
+        Parameters
+        ----------
+        timeout : float or None
+            Maximum time in seconds to wait for. If `None`, wait until the
+            transcription is complete.
+
+        Returns
+        -------
+        PendingTranscriptionResult
+            This object.
+
+        """
+        if not self.wait(timeout):
+            raise TimeoutError(
+                "Transcription did not complete within {} seconds.".format(
+                    timeout))
+        return self
+
+    def _setResult(self, result):
+        """Copy the fields of a completed transcription to this object."""
+        for slot in TranscriptionResult.__slots__:
+            setattr(self, slot, getattr(result, slot))
+
+
+class TranscriptionQueue:
+    """Queue for running transcriptions on background worker threads.
+
+    Transcriptions submitted to the queue return immediately with a
+    :class:`PendingTranscriptionResult` which is filled in when the
+    transcription completes. This allows speech to be transcribed while the
+    experiment keeps running, instead of blocking between trials. Most
+    transcription engines spend their time in compiled code or waiting on the
+    network, so they run well alongside the main thread.
+
+    The default queue used by ``transcribe(..., block=False)`` can be
+    obtained by calling :func:`getTranscriptionQueue`.
+
+    Parameters
+    ----------
+    maxWorkers : int
+        Number of transcriptions that may run at the same time. The default of
+        1 runs transcriptions one after the other, which is safe for engines
+        that keep a single model loaded.
+
+    """
+    def __init__(self, maxWorkers=1):
+        self._maxWorkers = int(maxWorkers)
+        self._executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=self._maxWorkers,
+            thread_name_prefix='PsychoPyTranscription')
+        self._futures = []
+
+    @property
+    def maxWorkers(self):
+        """Number of transcriptions that may run at the same time (`int`)."""
+        return self._maxWorkers
+
+    @property
+    def pending(self):
+        """Number of submitted transcriptions that have not completed yet
+        (`int`)."""
+        self._futures = [f for f in self._futures if not f.done()]
+        return len(self._futures)
+
+    def submit(self, audioClip, engine='sphinx', language='en-US',
+               expectedWords=None, config=None):
+        """Add a transcription to the queue.
+
+        Parameters are the same as :func:`transcribe`.
+
+        Returns
+        -------
+        PendingTranscriptionResult
+            Placeholder which is filled in when the transcription completes.
+
+        """
+        result = PendingTranscriptionResult(engine=engine, language=language)
+        result._future = self._executor.submit(
+            self._transcribe, result, audioClip, engine=engine,
+            language=language, expectedWords=expectedWords, config=config)
+        self._futures.append(result._future)
+        return result
+
+    @staticmethod
+    def _transcribe(result, audioClip, **kwargs):
+        try:
+            result._setResult(transcribe(audioClip, block=True, **kwargs))
+        except Exception as err:
+            result._exception = err
+            logging.error(
+                "Background transcription using engine '{}' failed: {}".format(
+                    kwargs.get('engine'), err))
+        return result
+
+    def wait(self, timeout=None):
+        """Wait for all submitted transcriptions to complete.
+
+        Parameters
+        ----------
+        timeout : float or None
+            Maximum time in seconds to wait for. If `None`, wait until all
+            transcriptions are complete.
+
+        Returns
+        -------
+        bool
+            `True` if all transcriptions have completed.
+
+        """
+        concurrent.futures.wait(list(self._futures), timeout=timeout)
+        return self.pending == 0
+
+    def shutdown(self, wait=True):
+        """Stop the worker threads. Transcriptions that have not started yet
+        are cancelled.
+
+        Parameters
+        ----------
+        wait : bool
+            Wait for running transcriptions to complete before returning.
+
+        """
+        for future in self._futures:
+            future.cancel()
+        self._executor.shutdown(wait=wait)
+
+
+_transcriptionQueue = None
+
+def getTranscriptionQueue():
+    """Get the default queue used for background transcriptions, creating it
+    if needed.
+
+    Returns
+    -------
+    TranscriptionQueue
+        Default transcription queue.
+
+    """
+    global _transcriptionQueue
+    if _transcriptionQueue is None:
+        _transcriptionQueue = TranscriptionQueue()
+    return _transcriptionQueue
+
+
 # ------------------------------------------------------------------------------
 # Transcription interfaces
 #
@@ -746,6 +963,34 @@ class WhisperTranscriber(BaseTranscriber):
 
         return whisper.available_models()
     
+    @staticmethod
+    def _prepareWaveform(audioClip):
+        """Convert an audio clip to the padded or trimmed 16kHz `float32`
+        waveform used by Whisper.
+        """
+        if isinstance(audioClip, AudioClip):  # use raw samples from mic
+            samples = audioClip.samples
+            sr = audioClip.sampleRateHz
+        elif isinstance(audioClip, (list, tuple,)):
+            samples, sr = audioClip
+            samples = np.asarray(samples)
+
+        # whisper requires data to be a flat `float32` array
+        waveform = np.frombuffer(
+            samples, samples.dtype).flatten().astype(np.float32)
+
+        # resample if needed
+        if sr != 16000:
+            import librosa
+            waveform = librosa.resample(
+                waveform,
+                orig_sr=sr,
+                target_sr=16000)
+
+        # pad and trim the data as required
+        import whisper.audio as _audio
+        return _audio.pad_or_trim(waveform)
+
     def transcribe(self, audioClip, modelConfig=None, decoderConfig=None):
         """Perform a speech-to-text transcription of a voice recording.
 
@@ -773,27 +1018,7 @@ class WhisperTranscriber(BaseTranscriber):
           overhead.
 
         """
-        if isinstance(audioClip, AudioClip):  # use raw samples from mic
-            samples = audioClip.samples
-            sr = audioClip.sampleRateHz
-        elif isinstance(audioClip, (list, tuple,)):
-            samples, sr = audioClip
-
-        # whisper requires data to be a flat `float32` array
-        waveform = np.frombuffer(
-            samples, samples.dtype).flatten().astype(np.float32)
-        
-        # resample if needed
-        if sr != 16000:
-            import librosa
-            waveform = librosa.resample(
-                waveform, 
-                orig_sr=sr, 
-                target_sr=16000)
-        
-        # pad and trim the data as required
-        import whisper.audio as _audio
-        waveform = _audio.pad_or_trim(waveform)
+        waveform = self._prepareWaveform(audioClip)
 
         modelConfig = {} if modelConfig is None else modelConfig
         decoderConfig = {} if decoderConfig is None else decoderConfig
@@ -828,6 +1053,82 @@ class WhisperTranscriber(BaseTranscriber):
         
         return toReturn
 
+    def transcribeBatch(self, audioClips, modelConfig=None, decoderConfig=None,
+                        batchSize=8):
+        """Perform speech-to-text transcription of many voice recordings.
+
+        Clips are padded to the 30 second window used by Whisper and decoded
+        in batches using the loaded model, which is much faster than calling
+        `transcribe()` for each clip when transcribing a whole session after
+        the experiment.
+
+        Parameters
+        ----------
+        audioClips : list
+            Audio clips containing speech to transcribe. Each value can be any
+            of the types accepted by `transcribe()`.
+        modelConfig : dict or None
+            Configuration options for the model.
+        decoderConfig : dict or None
+            Additional options passed to `whisper.DecodingOptions`.
+        batchSize : int
+            Number of clips to decode at once. Larger batches are faster but
+            use more memory.
+
+        Returns
+        -------
+        list of TranscriptionResult
+            Transcription results, in the same order as `audioClips`.
+
+        Notes
+        -----
+        * Batches are decoded using a single 30 second window per clip, so
+          speech after the first 30 seconds of a clip is not transcribed. Use
+          `transcribe()` for longer recordings.
+        * Word timestamps are not available for batched transcriptions.
+
+        """
+        import torch
+        import whisper
+
+        audioClips = list(audioClips)
+        modelConfig = {} if modelConfig is None else modelConfig
+        decoderConfig = {} if decoderConfig is None else dict(decoderConfig)
+
+        # our defaults
+        language = "en" if self._modelName.endswith(".en") else None
+        options = whisper.DecodingOptions(
+            language=decoderConfig.pop('language', language),
+            temperature=decoderConfig.pop(
+                'temperature', modelConfig.get('temperature', 0.0)),
+            fp16=decoderConfig.pop('fp16', self._device != 'cpu'),
+            **decoderConfig)
+
+        nMels = self._model.dims.n_mels
+        batchSize = max(int(batchSize), 1)
+        toReturn = []
+        for i in range(0, len(audioClips), batchSize):
+            mels = [
+                whisper.log_mel_spectrogram(self._prepareWaveform(clip), nMels)
+                for clip in audioClips[i:i + batchSize]]
+            results = whisper.decode(
+                self._model, torch.stack(mels).to(self._model.device), options)
+
+            for result in results:
+                transcribed = TranscriptionResult(
+                    words=result.text.strip().split(' '),
+                    unknownValue=False,
+                    requestFailed=False,
+                    engine=self._engine,
+                    language=result.language)
+                transcribed.response = str(result)  # provide raw response
+                toReturn.append(transcribed)
+
+        if toReturn:
+            self.lastResult = toReturn[-1]
+
+        return toReturn
+
 
 # ------------------------------------------------------------------------------
 # Functions
@@ -884,7 +1185,7 @@ def getAllTranscribers(engineKeys=False):
 
 
 def transcribe(audioClip, engine='sphinx', language='en-US', expectedWords=None,
-               config=None):
+               config=None, block=True):
     """Convert speech in audio to text.
 
     This feature passes the audio clip samples to a specified text-to-speech
@@ -895,10 +1196,9 @@ def transcribe(audioClip, engine='sphinx', language='en-US', expectedWords=None,
     For more robust transcription capabilities with a greater range of language
     support, online providers such as Google may be used.
 
-    Speech-to-text conversion blocks the main application thread when used on
-    Python. Don't transcribe audio during time-sensitive parts of your
-    experiment! This issue is known to the developers and will be fixed in a
-    later release.
+    Speech-to-text conversion blocks the main application thread by default.
+    Don't transcribe audio during time-sensitive parts of your experiment, or
+    set `block=False` to run the transcription in the background.
 
     Parameters
     ----------
@@ -930,11 +1230,17 @@ def transcribe(audioClip, engine='sphinx', language='en-US', expectedWords=None,
         Additional configuration options for the specified engine. These
         are specified using a dictionary (ex. `config={'pfilter': 1}` will
         enable the profanity filter when using the `'google'` engine).
+    block : bool
+        Wait for the transcription to complete before returning. If `False`,
+        the transcription is added to the default :class:`TranscriptionQueue`
+        and a :class:`PendingTranscriptionResult` is returned straight away.
 
     Returns
     -------
     :class:`~psychopy.sound.transcribe.TranscriptionResult`
-        Transcription result.
+        Transcription result. This is a
+        :class:`~psychopy.sound.transcribe.PendingTranscriptionResult` if
+        `block` is `False`.
 
     Notes
     -----
@@ -996,6 +1302,14 @@ def transcribe(audioClip, engine='sphinx', language='en-US', expectedWords=None,
     # check if the engine parameter is valid
     engine = engine.lower()  # make lower case
 
+    if not block:
+        return getTranscriptionQueue().submit(
+            audioClip,
+            engine=engine,
+            language=language,
+            expectedWords=expectedWords,
+            config=config)
+
     # check if we have necessary keys
     if engine in ('google',):
         alert(4615, strFields={'engine': engine})
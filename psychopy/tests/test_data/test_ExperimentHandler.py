@@ -4,6 +4,7 @@ from psychopy import data, logging
 import numpy as np
 import os, glob, shutil
 import io
+import codecs
 from tempfile import mkdtemp
 
 from psychopy.tools.filetools import openOutputFile
@@ -165,6 +166,127 @@ class TestExperimentHandler():
                 # If failed, remove and store character which failed
                 raise UnicodeEncodeError(*err.args[:4], "character failing to save to csv")
 
+    def test_streamData(self):
+        fileName = os.path.join(self.tmpDir, 'streamed')
+        exp = data.ExperimentHandler(
+            savePickle=False,
+            saveWideText=True,
+            dataFileName=fileName,
+            streamData=True,
+            maxEntriesInMemory=2
+        )
+        for n in range(5):
+            exp.addData('n', n)
+            exp.addData('resp', 'a,b')
+            if n >= 3:
+                # a column appearing part way through
+                exp.addData('late', n * 10)
+            exp.nextEntry()
+            # each entry is on disk as soon as it is complete
+            with io.open(fileName + '.csv', 'r', encoding='utf-8-sig') as f:
+                assert len(f.read().splitlines()) == n + 2
+        assert len(exp.entries) == 2
+        exp.addData('n', 5)  # orphan entry is written on close
+        exp.close()
+
+        with io.open(fileName + '.csv', 'r', encoding='utf-8-sig') as f:
+            contents = f.read()
+        assert contents == (
+            'n,resp,late,\n'
+            '0,"a,b",\n1,"a,b",\n2,"a,b",\n'
+            '3,"a,b",30,\n4,"a,b",40,\n5,,,\n')
+        columns = data.readStreamedData(fileName + '.csv')
+        assert list(columns) == ['n', 'resp', 'late']
+        assert columns['n'] == [0, 1, 2, 3, 4, 5]
+        assert columns['late'] == [None, None, None, 30, 40, None]
+
+    def test_streaming_append_new_columns(self):
+        fileName = os.path.join(self.tmpDir, 'appended.csv')
+        for session in range(2):
+            writer = data.StreamingDataWriter(fileName, append=True,
+                                              sidecar=False)
+            writer.writeEntry({'n': 0})
+            # a new column makes the header be rewritten on close
+            writer.writeEntry({'n': 1, 'session': session})
+            writer.close()
+        with io.open(fileName, 'rb') as f:
+            contents = f.read()
+        # only the start of the file has a BOM
+        assert contents.count(codecs.BOM_UTF8) == 1
+        assert contents.decode('utf-8-sig') == (
+            'n,session,\n0,\n1,0,\n'
+            'n,session,\n0,\n1,1,\n')
+
+    def test_readStreamedData_after_crash(self):
+        fileName = os.path.join(self.tmpDir, 'crashed.csv')
+        writer = data.StreamingDataWriter(fileName, chunkSize=2)
+        for n in range(5):
+            writer.writeEntry({'n': n, 'rt': np.float64(n / 10)})
+        # the last entry is waiting for its chunk to fill, simulate a crash
+        # part way through writing it
+        writer._sidecarFile.write('{"nRows": 1, "colu')
+        writer._sidecarFile.flush()
+        columns = data.readStreamedData(writer.sidecarFileName)
+        assert columns == {'n': [0, 1, 2, 3], 'rt': [0.0, 0.1, 0.2, 0.3]}
+        writer._chunk = []
+        writer.close()
+
+    def test_columnar(self):
+        exps = [data.ExperimentHandler(savePickle=False, saveWideText=False,
+                                       columnar=columnar)
+                for columnar in (False, True)]
+        for exp in exps:
+            trials = data.TrialHandler(
+                [{'ori': 0}, {'ori': 90}], nReps=3, method='sequential',
+                name='trials')
+            exp.addLoop(trials)
+            for trial in trials:
+                exp.addData('rt', 0.5 + trials.thisN / 10)
+                exp.addData('key', ['left', 'right'][trials.thisN % 2])
+                if trials.thisN % 3:
+                    exp.addData('correct', trials.thisN % 2 == 0)
+                exp.nextEntry()
+        rows, cols = exps
+        assert not cols.entries
+        assert len(cols.columns) == 6
+        assert cols.getAllEntries() == rows.getAllEntries()
+
+        df = cols.toDataFrame()
+        assert list(df.columns) == list(rows.toDataFrame().columns)
+        assert df['rt'].dtype == np.float64
+        assert df['trials.thisN'].dtype == np.int64
+        assert str(df['correct'].dtype) == 'boolean'
+        assert df['correct'].isna().sum() == 2
+        # the data frame uses the stored arrays
+        assert np.shares_memory(df['rt'].to_numpy(),
+                                cols.columns.getColumn('rt'))
+
+        for exp, name in zip(exps, ('rows', 'cols')):
+            fileName = os.path.join(self.tmpDir, name + '.csv')
+            exp.saveAsWideText(fileName)
+        with io.open(os.path.join(self.tmpDir, 'rows.csv'),
+                     encoding='utf-8-sig') as f1, \
+                io.open(os.path.join(self.tmpDir, 'cols.csv'),
+                        encoding='utf-8-sig') as f2:
+            assert f1.read() == f2.read()
+
+    def test_saveAsParquet(self):
+        import pytest
+        pytest.importorskip('pyarrow')
+        import pandas as pd
+        exp = data.ExperimentHandler(savePickle=False, saveWideText=False,
+                                     columnar=True)
+        for n in range(10):
+            exp.addData('n', n)
+            exp.addData('pos', [n, n])
+            exp.nextEntry()
+        fileName = exp.saveAsParquet(os.path.join(self.tmpDir, 'data'))
+        df = pd.read_parquet(fileName)
+        assert df['n'].tolist() == list(range(10))
+        assert df['pos'][1] == '[1, 1]'
+        fileName = exp.saveAsFeather(os.path.join(self.tmpDir, 'data'))
+        assert pd.read_feather(fileName)['n'].tolist() == list(range(10))
+
 
 if __name__ == '__main__':
     import pytest
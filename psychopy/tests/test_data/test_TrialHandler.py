@@ -153,6 +153,29 @@ class TestTrialHandler():
         trials.saveAsWideText(pjoin(self.temp_dir, 'testRandom.csv'), delim=',', appendFile=False)#this omits values
         utils.compareTextFiles(pjoin(self.temp_dir, 'testRandom.csv'), pjoin(fixturesPath,'corrRandom.csv'))
 
+    def test_constrained_sequence(self):
+        conditions = [{'trialType': n, 'congruent': n % 2} for n in range(6)]
+        trials = data.TrialHandler(
+            trialList=conditions, seed=self.random_seed, nReps=10,
+            method='constrained', autoLog=False,
+            constraints={'key': 'congruent', 'maxRunLength': 2})
+        order = [thisTrial['trialType'] for thisTrial in trials]
+        assert sorted(order) == sorted(list(range(6)) * 10)
+        congruent = ''.join(str(n % 2) for n in order)
+        assert '000' not in congruent and '111' not in congruent
+        # seeded, so the same each time
+        trials = data.TrialHandler(
+            trialList=conditions, seed=self.random_seed, nReps=10,
+            method='constrained', autoLog=False,
+            constraints={'key': 'congruent', 'maxRunLength': 2})
+        assert [thisTrial['trialType'] for thisTrial in trials] == order
+
+    def test_makeIndices(self):
+        trials = data.TrialHandler([], 1, autoLog=False)
+        assert trials._makeIndices(['a', 'b', 'c']) == [(0,), (1,), (2,)]
+        assert trials._makeIndices([['a', 'b', 'c'], ['d', 'e', 'f']]) == [
+            [(0, 0), (0, 1), (0, 2)], [(1, 0), (1, 1), (1, 2)]]
+
     def test_comparison_equals(self):
         t1 = data.TrialHandler([dict(foo=1)], 2)
         t2 = data.TrialHandler([dict(foo=1)], 2)
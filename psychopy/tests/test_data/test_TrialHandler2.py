@@ -148,6 +148,19 @@ class TestTrialHandler2:
         utils.compareTextFiles(pjoin(self.temp_dir, 'testRandom.csv'),
                                pjoin(fixturesPath,'corrRandomTH2.csv'))
 
+    def test_constrained_sequence2(self):
+        conditions = [{'trialType': n} for n in range(4)]
+        trials = data.TrialHandler2(
+            conditions, 5, method='constrained', seed=self.random_seed,
+            constraints={'minGap': 2}, autoLog=False)
+        order = []
+        for thisTrial in trials:
+            order.append(thisTrial['trialType'])
+            assert trials.thisRepN == order.count(order[-1]) - 1
+        assert sorted(order) == sorted(list(range(4)) * 5)
+        for n in range(len(order) - 2):
+            assert len(set(order[n:n + 3])) == 3
+
     def test_comparison_equals(self):
         t1 = data.TrialHandler2([dict(foo=1)], 2, seed=self.random_seed)
         t2 = data.TrialHandler2([dict(foo=1)], 2, seed=self.random_seed)
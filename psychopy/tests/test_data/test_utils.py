@@ -153,6 +153,101 @@ class Test_utilsClass:
         assert len(conds) == 6
         assert len(list(conds[0].keys())) == 6
 
+    def test_importConditions_cache(self, tmp_path, monkeypatch):
+        from psychopy import prefs
+        # keep the cache away from the real user folder
+        monkeypatch.setitem(prefs.paths, 'userPrefsDir', str(tmp_path / 'user'))
+        fileName = str(tmp_path / 'conds.csv')
+        with open(fileName, 'w') as f:
+            f.write('a,b,c\n"1,5","[1, 2]",x\\ny\n,3,z\n')
+        expected = [{'a': 1.5, 'b': [1, 2], 'c': 'x\ny'},
+                    {'a': None, 'b': 3, 'c': 'z'}]
+        assert utils.importConditions(fileName) == expected
+        assert utils._loadCachedConditions(fileName) is not None
+        # the cache gives new objects, so trials can't change each other
+        conds = utils.importConditions(fileName)
+        assert conds == expected
+        assert utils.importConditions(fileName)[0]['b'] is not conds[0]['b']
+        # selections are applied to cached conditions
+        assert utils.importConditions(fileName, selection='1') == expected[1:]
+        # changing the file invalidates the cache
+        with open(fileName, 'w') as f:
+            f.write('a\n1\n2\n3\n')
+        os.utime(fileName, ns=(0, 0))
+        assert utils.importConditions(fileName) == [{'a': 1}, {'a': 2},
+                                                    {'a': 3}]
+        utils.clearConditionsCache()
+        assert utils._loadCachedConditions(fileName) is None
+        utils.importConditions(fileName, useCache=False)
+        assert utils._loadCachedConditions(fileName) is None
+        # the least recently used files are dropped from the cache
+        monkeypatch.setattr(utils, '_maxConditionsCacheFiles', 2)
+        fileNames = [str(tmp_path / 'conds{}.csv'.format(n)) for n in range(3)]
+        for n, name in enumerate(fileNames):
+            with open(name, 'w') as f:
+                f.write('a\n{}\n'.format(n))
+            utils.importConditions(name)
+            cachePath = utils._getConditionsCachePath(name)
+            os.utime(cachePath, ns=(n * 10 ** 9, n * 10 ** 9))
+        cacheDir = os.path.dirname(cachePath)
+        assert len(os.listdir(cacheDir)) == 2
+        assert utils._loadCachedConditions(fileNames[0]) is None
+        assert utils._loadCachedConditions(fileNames[2]) is not None
+    def test_importConditions_textNumbers(self, tmp_path):
+        # text cells are converted as they were one by one with float()
+        cells = ['1', '2,5', ' 3 ', '1_000', '1e3', '-inf', 'NaN ', 'nan',
+                 '', 'x', '1,5,2', '0x10', '[1, 2]', 'True']
+
+        def oldValue(cell):
+            if cell in ('', 'nan'):  # read as missing by pandas
+                return None
+            try:
+                val = float(cell.replace(",", "."))
+            except ValueError:
+                return eval(cell) if cell.startswith('[') else cell
+            return None if np.isnan(val) else val
+
+        fileName = str(tmp_path / 'conds.csv')
+        with open(fileName, 'w') as f:
+            f.write('a,b\n')
+            for cell in cells:
+                f.write('"{}",x\n'.format(cell))
+        conds = utils.importConditions(fileName, useCache=False)
+        assert [cond['a'] for cond in conds] == [oldValue(c) for c in cells]
+
+
+def test_makeConstrainedSequence():
+    trialList = [{'target': n % 2, 'n': n} for n in range(8)]
+    order = utils.makeConstrainedSequence(
+        trialList, nReps=50, key='target', maxRunLength=3, seed=1)
+    assert sorted(order) == sorted(list(range(8)) * 50)
+    kinds = ''.join(str(trialList[n]['target']) for n in order)
+    assert '0000' not in kinds and '1111' not in kinds
+    assert (utils.makeConstrainedSequence(
+        trialList, nReps=50, key='target', maxRunLength=3, seed=1) ==
+        order).all()
+
+    # each kind follows each kind (equally often, as there are 100 of each)
+    order = utils.makeConstrainedSequence(
+        trialList, nReps=100, key=lambda trial: trial['n'] % 4,
+        balanceTransitions=True, seed=2)
+    kinds = order % 4
+    transitions = np.zeros((4, 4), dtype=int)
+    np.add.at(transitions, (kinds[:-1], kinds[1:]), 1)
+    assert transitions.max() - transitions.min() <= 1
+
+    # spacing
+    order = utils.makeConstrainedSequence(trialList, nReps=20, minGap=5,
+                                          seed=3)
+    for n in range(len(order) - 5):
+        assert len(set(order[n:n + 6])) == 6
+
+    # impossible: two 0s for each 1, with no repeats
+    with pytest.raises(ValueError):
+        utils.makeConstrainedSequence([0, 0, 1], nReps=2,
+                                      key=lambda kind: kind, maxRunLength=1)
+
+
 def test_listFromString():
     assert ['yes', 'no'] == utils.listFromString("yes, no")
     assert ['yes', 'no'] == utils.listFromString("[yes, no]")
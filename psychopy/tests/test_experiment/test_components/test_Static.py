@@ -57,4 +57,23 @@ class TestStaticComponent(_TestBaseComponentsMixin, _TestDisabledMixin):
             for phrase in case['avoid']:
                 assert not _find_global_resource_in_js_experiment(script, phrase), (
                     f"'{phrase}' was found in resources for {case['exp']}.psyexp"
-                )
\ No newline at end of file
+                )
+    def test_background_image_loads(self):
+        """
+        Check that images set during a static period are loaded in the background while it runs
+        """
+        from psychopy.experiment.components.image import ImageComponent
+        # Make an image component whose image is set during the static period
+        img = ImageComponent(exp=self.exp, parentName="testRoutine", name="testImage")
+        img.params['image'].val = "$imageFile"
+        img.params['image'].allowedUpdates.append("set during: testRoutine.testStatic")
+        img.params['image'].updates = "set during: testRoutine.testStatic"
+        self.routine.insertComponent(0, img)
+        self.comp.addComponentUpdate("testRoutine", "testImage", "image")
+        # Write script
+        script = self.exp.writeScript(target="PsychoPy")
+        # The image is found and loaded by a task which isn't required
+        assert (
+            "testStatic.submit(visual.imagecache.preloadImage, imageFile, 'RGBA', "
+            "required=False, name='testImage.image')"
+        ) in script
@@ -0,0 +1,80 @@
+"""Tests for pairing presses and releases in the software key buffer used with
+the Psychtoolbox backend, fed with events directly instead of from a device.
+"""
+from collections import deque
+
+import numpy as np
+
+from psychopy.hardware import keyboard
+
+codes = {name: code for code, name in keyboard.keyNames.items()}
+
+
+class _NoDevice:
+    def flush(self, flush_type):
+        return 0
+
+
+def _buffer(monkeypatch):
+    monkeypatch.setattr(keyboard.Keyboard, '_backend', 'ptb')
+    buffer = keyboard._KeyBuffer.__new__(keyboard._KeyBuffer)
+    buffer._evts = deque()
+    buffer.dev = _NoDevice()
+    buffer._clearKeys()
+    return buffer
+
+
+def _events(buffer, *events):
+    for name, down, t in events:
+        buffer._evts.append({'keycode': codes[name], 'down': down, 'time': t})
+
+
+def test_pairing(monkeypatch):
+    buffer = _buffer(monkeypatch)
+    _events(buffer,
+            ('a', True, 1.0), ('b', True, 1.5), ('a', False, 2.0),
+            ('a', True, 3.0),  # 'b' is still down
+            ('a', False, 3.25), ('space', True, 4.0))
+    # only released keys, in the order they were pressed
+    keys = buffer.getKeys(waitRelease=True, clear=False)
+    assert [(k.name, k.tDown, k.duration) for k in keys] == [
+        ('a', 1.0, 1.0), ('a', 3.0, 0.25)]
+    # all keys
+    keys = buffer.getKeys(waitRelease=False, clear=False)
+    assert [k.name for k in keys] == ['a', 'b', 'a', 'space']
+    # a key list only returns (and clears) those keys
+    keys = buffer.getKeys(['b', 'space'], waitRelease=False)
+    assert [k.name for k in keys] == ['b', 'space']
+    keys = buffer.getKeys(['b', 'space'], waitRelease=False)
+    assert not keys
+    # 'b' is released later, and its original press is updated
+    _events(buffer, ('b', False, 5.0))
+    keys = buffer.getKeys(waitRelease=True)
+    assert [k.name for k in keys] == ['a', 'a']
+    # keys still down are always included when fetching all keys
+    keys = buffer.getKeys(waitRelease=False)
+    assert [k.name for k in keys] == ['space']
+    assert not buffer.getKeys(waitRelease=False)
+
+
+def test_release_without_press(monkeypatch):
+    buffer = _buffer(monkeypatch)
+    _events(buffer, ('a', False, 1.0), ('a', True, 2.0), ('a', False, 2.5))
+    keys = buffer.getKeys()
+    assert len(keys) == 1
+    assert keys[0].duration == 0.5
+
+
+def test_keysToRecArray(monkeypatch):
+    buffer = _buffer(monkeypatch)
+    _events(buffer, ('a', True, 10.0), ('a', False, 10.5),
+            ('b', True, 11.0))
+    keys = buffer.getKeys(waitRelease=False)
+    presses = keyboard._keysToRecArray(keys, tOffset=1.0, tReset=9.0)
+    assert presses.name.tolist() == ['a', 'b']
+    assert presses.code.tolist() == [codes['a'], codes['b']]
+    assert np.allclose(presses.tDown, [9.0, 10.0])
+    assert np.allclose(presses.rt, [1.0, 2.0])
+    assert presses.duration[0] == 0.5
+    assert np.isnan(presses.duration[1])
+    assert len(keyboard._keysToRecArray([])) == 0
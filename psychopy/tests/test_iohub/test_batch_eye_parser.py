@@ -0,0 +1,104 @@
+""" Test the offline eye sample event parser using a synthetic binocular
+    sample array.
+"""
+import numpy as np
+
+from psychopy.iohub.constants import EventConstants
+from psychopy.iohub.devices.eyetracker.eye_events import \
+    BinocularEyeSampleEvent, MonocularEyeSampleEvent
+from psychopy.iohub.devices.eyetracker.filters.batchparser import \
+    EyeTrackerBatchEventParser
+
+SAMPLING_RATE = 500
+DISPLAY = {'mm_size': {'width': 500, 'height': 280},
+           'pixel_res': (1920, 1080),
+           'eye_distance': 550}
+
+
+def _gazeTrace():
+    """Fixations at x = 0, 300 and 0 pixels, joined by 10 sample saccades."""
+    fix = 300
+    trace = np.concatenate([np.zeros(fix), np.linspace(0, 300, 12)[1:-1],
+                            np.full(fix, 300.0), np.linspace(300, 0, 12)[1:-1],
+                            np.zeros(fix)])
+    # small fixational jitter, so there are velocities to base the
+    # adaptive threshold on
+    return trace + 0.5 * np.sin(np.arange(len(trace)) * 0.7)
+
+
+def _parser(**kwargs):
+    return EyeTrackerBatchEventParser(SAMPLING_RATE, DISPLAY,
+                                      adaptive_vel_thresh_history=0.1,
+                                      **kwargs)
+
+
+def testBinocularSamples():
+    gaze_x = _gazeTrace()
+    n = len(gaze_x)
+    samples = np.zeros(n, dtype=BinocularEyeSampleEvent.NUMPY_DTYPE)
+    samples['session_id'] = 1
+    samples['time'] = np.arange(n) / float(SAMPLING_RATE)
+    for eye in ('left', 'right'):
+        samples['%s_gaze_x' % eye] = gaze_x
+        samples['%s_gaze_y' % eye] = 0.3 * np.cos(np.arange(n) * 0.9)
+        samples['%s_pupil_measure1' % eye] = 4.0
+    # a blink during the second fixation
+    samples['status'][450:480] = 22
+
+    events = _parser(position_filter={'name': 'MedianFilter', 'length': 3,
+                                      'knot_pos': 'center'}).parse(samples)
+    assert list(events.keys()) == [
+        EventConstants.FIXATION_START, EventConstants.FIXATION_END,
+        EventConstants.SACCADE_START, EventConstants.SACCADE_END,
+        EventConstants.BLINK_START, EventConstants.BLINK_END]
+
+    saccades = events[EventConstants.SACCADE_END]
+    assert len(saccades) == 2
+    assert saccades['amplitude_x'][0] > 0 > saccades['amplitude_x'][1]
+    assert np.all(saccades['duration'] < 0.03)
+    assert np.all(saccades['peak_velocity_xy'] >= saccades['average_velocity_xy'])
+    assert np.all(saccades['type'] == EventConstants.SACCADE_END)
+
+    blinks = events[EventConstants.BLINK_END]
+    assert len(blinks) == 1
+    blink_start = events[EventConstants.BLINK_START]['time'][0]
+    assert np.isclose(blink_start, samples['time'][450])
+    assert np.isclose(blinks['duration'][0], 29.0 / SAMPLING_RATE)
+
+    # fixation end events are only created for complete fixations, which
+    # are bounded by the saccades and the blink
+    fixations = events[EventConstants.FIXATION_END]
+    assert len(fixations) == 2
+    assert np.all(np.abs(fixations['average_gaze_x'] - 300) < 5)
+    starts = events[EventConstants.FIXATION_START]
+    assert np.allclose(fixations['time'] - fixations['duration'], starts['time'])
+
+
+def testMonocularSessions():
+    gaze_x = _gazeTrace()
+    n = len(gaze_x)
+    samples = np.zeros(n, dtype=MonocularEyeSampleEvent.NUMPY_DTYPE)
+    samples['time'] = np.arange(n) / float(SAMPLING_RATE)
+    samples['gaze_x'] = gaze_x
+    samples['gaze_y'] = 0.3 * np.cos(np.arange(n) * 0.9)
+    samples['session_id'] = 1
+    both = np.concatenate([samples, samples])
+    both['session_id'][n:] = 2
+
+    parser = _parser(velocity_filter={'name': 'WeightedAverageFilter',
+                                      'weights': (25, 50, 25)},
+                     threshold_update_interval=5)
+    one = parser.parse(samples)
+    two = parser.parse(both)
+    for etype, events in one.items():
+        assert len(two[etype]) == 2 * len(events)
+        assert np.all(two[etype]['session_id'][len(events):] == 2)
+    assert len(one[EventConstants.SACCADE_END]) == 2
+    assert len(one[EventConstants.BLINK_END]) == 0
+
+
+def testNoValidSamples():
+    samples = np.zeros(10, dtype=MonocularEyeSampleEvent.NUMPY_DTYPE)
+    samples['status'] = 2
+    events = _parser().parse(samples)
+    assert all(len(e) == 0 for e in events.values())
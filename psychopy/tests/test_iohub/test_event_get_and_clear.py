@@ -92,3 +92,29 @@ def testAllBuffersClear():
     assert len(exp_events) == 0
 
     stopHubProcess()
+
+@skip_under_vm
+def testGetEventsAsNumpy():
+    """
+    """
+    io = startHubProcess()
+
+    exp = io.devices.experiment
+    assert exp != None
+
+    io.sendMessageEvent("Test Message 1")
+    io.sendMessageEvent("Category Test", category="TEST")
+
+    events = io.getEvents(as_type='numpy')
+    assert list(events.keys()) == ['MESSAGE']
+    messages = events['MESSAGE']
+    assert len(messages) == 2
+    assert list(messages['text']) == [b"Test Message 1", b"Category Test"]
+    assert messages['category'][1] == b"TEST"
+
+    assert len(io.getEvents(as_type='numpy')) == 0
+
+    exp_events = exp.getEvents(asType='numpy')
+    assert len(exp_events['MESSAGE']) == 2
+
+    stopHubProcess()
@@ -0,0 +1,129 @@
+""" Test the iohub moving window event field filters against plain numpy
+    calculations over the same windows.
+"""
+import numpy as np
+import pytest
+
+from psychopy.iohub.constants import EventConstants
+from psychopy.iohub.devices import eventfilters
+from psychopy.iohub.devices.eyetracker.eye_events import MonocularEyeSampleEvent
+
+LENGTH = 5
+RNG = np.random.default_rng(12345)
+VALUES = RNG.normal(100.0, 20.0, size=500)
+
+
+def _windows(values, length=LENGTH):
+    return np.lib.stride_tricks.sliding_window_view(values, length)
+
+
+def _filtered(filter_obj, values):
+    results = []
+    for v in values:
+        r = filter_obj.add(v)
+        if r:
+            results.append(r[1])
+    return np.asarray(results)
+
+
+@pytest.mark.parametrize('filter_class, expected', [
+    (eventfilters.MovingWindowFilter, lambda w: w.mean(axis=-1)),
+    (eventfilters.MedianFilter, lambda w: np.median(w, axis=-1)),
+])
+def testWindowFilters(filter_class, expected):
+    f = filter_class(length=LENGTH, knot_pos='center')
+    assert np.allclose(_filtered(f, VALUES), expected(_windows(VALUES)))
+    # clearing starts a new window
+    f.clear()
+    assert f.add(1.0) is None
+
+
+def testWeightedAverageFilter():
+    weights = [17.0, 33.0, 50.0, 33.0, 11.0]
+    f = eventfilters.WeightedAverageFilter(weights=weights, knot_pos='center')
+    expected = [np.convolve(w, np.asarray(weights) / sum(weights), 'valid')[0]
+                for w in _windows(VALUES)]
+    assert np.allclose(_filtered(f, VALUES), expected)
+
+
+def testRunningSumResync():
+    f = eventfilters.MovingWindowFilter(length=3, knot_pos='center')
+    f.resync_interval = 10
+    values = np.concatenate([np.full(50, 1e9), RNG.random(50)])
+    result = _filtered(f, values)
+    assert np.allclose(result[-10:], _windows(values, 3)[-10:].mean(axis=1))
+
+
+def testMultiFieldFilter():
+    EventConstants.addClassMappings(
+        [EventConstants.MONOCULAR_EYE_SAMPLE],
+        {'MonocularEyeSampleEvent': MonocularEyeSampleEvent})
+    fields = ['gaze_x', 'gaze_y', 'pupil_measure1']
+    field_ix = [MonocularEyeSampleEvent.CLASS_ATTRIBUTE_NAMES.index(f)
+                for f in fields]
+    data = RNG.normal(0.0, 10.0, size=(100, 3))
+    events = []
+    for row in data:
+        e = [0] * len(MonocularEyeSampleEvent.CLASS_ATTRIBUTE_NAMES)
+        for i, v in zip(field_ix, row):
+            e[i] = v
+        events.append(e)
+
+    f = eventfilters.MedianFilter(length=LENGTH, knot_pos='center',
+                                  event_type=EventConstants.MONOCULAR_EYE_SAMPLE,
+                                  event_field_names=fields, inplace=True)
+    filtered_events = []
+    for e in events:
+        r = f.add(e)
+        if r:
+            filtered_event, filtered_value = r
+            assert filtered_value.shape == (3,)
+            filtered_events.append(filtered_event)
+
+    expected = np.median(np.lib.stride_tricks.sliding_window_view(
+        data, LENGTH, axis=0), axis=-1)
+    assert len(filtered_events) == len(expected)
+    # the centre event of each window is filtered in place
+    assert filtered_events[0] is events[LENGTH // 2]
+    filtered = np.asarray([[e[i] for i in field_ix] for e in filtered_events])
+    assert np.allclose(filtered, expected)
+
+
+def testMultiFieldValues():
+    data = RNG.normal(0.0, 10.0, size=(50, 2))
+    f = eventfilters.MovingWindowFilter(length=LENGTH, knot_pos='latest',
+                                        field_count=2)
+    result = _filtered(f, data)
+    expected = np.lib.stride_tricks.sliding_window_view(
+        data, LENGTH, axis=0).mean(axis=-1)
+    assert np.allclose(result, expected)
+
+
+@pytest.mark.parametrize('filter_class, expected', [
+    (eventfilters.MovingWindowFilter, lambda w: w.mean(axis=-1)),
+    (eventfilters.MedianFilter, lambda w: np.median(w, axis=-1)),
+])
+def testNonFiniteValues(filter_class, expected):
+    # missing samples are often NaN or inf
+    values = VALUES[:60].copy()
+    values[[10, 11, 30]] = np.nan
+    values[20] = np.inf
+    f = filter_class(length=LENGTH, knot_pos='center')
+    result = _filtered(f, values)
+    assert np.allclose(result, expected(_windows(values)), equal_nan=True)
+    # the filter recovers once the values have left the window
+    assert np.isfinite(result[-20:]).all()
+
+
+def testMultiFieldNaN():
+    data = RNG.normal(0.0, 10.0, size=(40, 2))
+    data[5, 0] = np.nan
+    windows = np.lib.stride_tricks.sliding_window_view(data, LENGTH, axis=0)
+    for filter_class, expected in [
+            (eventfilters.MovingWindowFilter, windows.mean(axis=-1)),
+            (eventfilters.MedianFilter, np.median(windows, axis=-1))]:
+        f = filter_class(length=LENGTH, knot_pos='latest', field_count=2)
+        result = _filtered(f, data)
+        assert np.allclose(result, expected, equal_nan=True)
+        assert np.isnan(result[:, 0]).sum() == LENGTH
+        assert not np.isnan(result[:, 1]).any()
@@ -0,0 +1,94 @@
+""" Test the shared memory ring buffer used by the 'shared_memory'
+    event_transport setting.
+"""
+import os
+import numpy as np
+
+from psychopy.iohub.net import SharedEventBuffer
+from psychopy.tests import skip_under_vm
+from psychopy.tests.test_iohub.testutil import stopHubProcess
+
+DTYPE = np.dtype([('event_id', np.uint32), ('time', np.float64),
+                  ('text', '|S8')])
+
+
+def _name(label):
+    return 'iohub_test_{}_{}'.format(os.getpid(), label)
+
+
+def testReadWrite():
+    server = SharedEventBuffer(_name('rw'), DTYPE, 4, create=True)
+    client = SharedEventBuffer(server.name, DTYPE, 4)
+    try:
+        assert len(client.read()) == 0
+        for i in range(3):
+            server.write([i, i / 10.0, u'é{}'.format(i)])
+        events = client.read()
+        assert events.dtype == DTYPE
+        assert list(events['event_id']) == [0, 1, 2]
+        assert events['text'][0].decode('utf-8') == u'é0'
+        assert len(client.read()) == 0
+
+        # wrap around the end of the ring
+        for i in range(3, 6):
+            server.write([i, i / 10.0, 'e'])
+        assert list(client.read()['event_id']) == [3, 4, 5]
+        assert client.lost_count == 0
+    finally:
+        client.close()
+        server.close()
+
+
+def testOverflowAndClear():
+    server = SharedEventBuffer(_name('of'), DTYPE, 4, create=True)
+    client = SharedEventBuffer(server.name, DTYPE, 4)
+    try:
+        for i in range(10):
+            server.write([i, 0.0, ''])
+        # only the newest 3 events are still available; the oldest slot is
+        # the one the next write goes to
+        assert list(client.read()['event_id']) == [7, 8, 9]
+        assert client.lost_count == 7
+
+        server.write([10, 0.0, ''])
+        client.clear()
+        assert len(client.read()) == 0
+    finally:
+        client.close()
+        server.close()
+
+
+def testLappedReader():
+    server = SharedEventBuffer(_name('lap'), DTYPE, 4, create=True)
+    client = SharedEventBuffer(server.name, DTYPE, 4)
+    try:
+        for i in range(4):
+            server.write([i, 0.0, ''])
+        # a full ring: event 0 is in the slot the writer fills next, so it
+        # can be half written by the time it is copied and is dropped
+        assert list(client.read()['event_id']) == [1, 2, 3]
+        assert client.lost_count == 1
+    finally:
+        client.close()
+        server.close()
+
+
+@skip_under_vm
+def testSharedMemoryTransport():
+    from psychopy.iohub import launchHubServer
+
+    io = launchHubServer(event_transport='shared_memory')
+    try:
+        io.sendMessageEvent("Test Message 1")
+        io.sendMessageEvent("Category Test", category="TEST")
+
+        events = io.getEvents()
+        assert [e.text for e in events] == ["Test Message 1", "Category Test"]
+        assert events[1].category == "TEST"
+        assert len(io.getEvents()) == 0
+
+        io.sendMessageEvent("Test Message 2")
+        messages = io.getEvents(as_type='numpy')['MESSAGE']
+        assert list(messages['text']) == [b"Test Message 2"]
+    finally:
+        stopHubProcess()
@@ -1,8 +1,12 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
 
+import time
+
 import numpy as np
+import pytest
 
+from psychopy import clock
 from psychopy.clock import wait, StaticPeriod, CountdownTimer
 from psychopy.visual import Window
 from psychopy.tools import systemtools
@@ -26,6 +30,44 @@ def test_StaticPeriod_overrun():
     assert static.complete() == 0
 
 
+def test_StaticPeriod_submit():
+    """Test that submitted tasks run in the background and are waited for
+    """
+    static = StaticPeriod(name='ISI')
+    static.start(0.1)
+    required = static.submit(time.sleep, 0.05)
+    optional = static.submit(time.sleep, 0.5, required=False, name='slow')
+    assert not required.done()
+    assert static.complete() == 1
+    assert required.done() and not optional.done()
+    assert [task.name for task in static.tasks] == ['sleep', 'slow']
+    assert static.tasks[0].duration >= 0.05
+    assert static.tasks[1].duration is None
+
+
+def test_StaticPeriod_submit_overrun():
+    static = StaticPeriod()
+    static.start(0.05)
+    static.submit(time.sleep, 0.1)
+    assert static.complete() == 0
+
+
+def test_StaticPeriod_submit_error():
+    def fail():
+        raise IOError("missing file")
+
+    static = StaticPeriod()
+    static.start(0.05)
+    static.submit(fail)
+    with pytest.raises(IOError):
+        static.complete()
+    # errors of tasks which aren't required are only logged
+    static.start(0.05)
+    future = static.submit(fail, required=False)
+    assert static.complete() == 1
+    assert isinstance(future.exception(), IOError)
+
+
 def test_StaticPeriod_recordFrameIntervals():
     win = Window(autoLog=False)
     static = StaticPeriod(screenHz=60, win=win)
@@ -59,3 +101,57 @@ def test_StaticPeriod_screenHz():
                        1.0/refresh_rate,
                        atol=tolerance)
     win.close()
+
+
+def test_wait_precision():
+    """Test that waits end on time, using the calibrated polling period
+    """
+    slack = clock.calibrateWait(nSamples=10)
+    assert clock._minSleepSlack <= slack <= clock._maxSleepSlack
+    clock.resetWaitStats()
+    for duration in (0.001, 0.012, 0.05):
+        t0 = time.perf_counter()
+        wait(duration)
+        assert time.perf_counter() - t0 >= duration
+    stats = clock.getWaitStats()
+    assert stats['n'] == 3
+    assert 0 <= stats['min'] <= stats['mean'] <= stats['max']
+    tolerance = 0.01 if systemtools.isVM_CI() else 0.002
+    assert stats['max'] < tolerance
+    # the old fixed period can still be used
+    wait(0.01, hogCPUperiod=0.005)
+    assert clock.getWaitStats()['n'] == 4
+    clock.resetWaitStats()
+    assert clock.getWaitStats()['mean'] is None
+
+
+def test_wait_calibration_deadline():
+    """Test that calibration stops at its deadline and that a long slack
+    shrinks back to the calibrated one
+    """
+    t0 = clock.getTime()
+    clock.calibrateWait(nSamples=1000, sleepDur=0.001, deadline=t0 + 0.02)
+    assert clock.getTime() - t0 < 0.5
+    calibrated = clock._calibratedSlack
+    assert calibrated >= clock._minSleepSlack
+    clock._sleepSlack = clock._maxSleepSlack
+    # a wait this short doesn't sleep, so can't raise the slack again
+    wait(0.001)
+    assert clock._sleepSlack == pytest.approx(
+        calibrated + clock._sleepSlackDecay * (clock._maxSleepSlack - calibrated))
+
+
+def test_wait_calibration_percentile(monkeypatch):
+    """Test that one late sleep during calibration doesn't set the slack
+    """
+    realSleep = time.sleep
+    sleeps = []
+
+    def sleep(secs):
+        sleeps.append(secs)
+        realSleep(secs + (0.015 if len(sleeps) == 5 else 0))
+
+    monkeypatch.setattr(time, 'sleep', sleep)
+    assert clock.calibrateWait(nSamples=20, percentile=90) < 0.015
+    del sleeps[:]
+    assert clock.calibrateWait(nSamples=20, percentile=100) >= 0.015
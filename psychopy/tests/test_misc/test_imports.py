@@ -0,0 +1,43 @@
+"""Tests that subpackages only import their modules when they are used.
+"""
+import os
+import sys
+import subprocess
+from pathlib import Path
+
+import pytest
+
+root = Path(__file__).parent.parent.parent.parent
+
+
+def _modulesAfter(code):
+    """Run code in a new interpreter and get the modules it imported."""
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.pathsep.join(
+        [str(root)] + [p for p in [env.get('PYTHONPATH')] if p])
+    code += "\nimport sys\nprint(' '.join(sys.modules))"
+    proc = subprocess.run([sys.executable, '-c', code], env=env,
+                          stdout=subprocess.PIPE, universal_newlines=True)
+    assert proc.returncode == 0
+    return set(proc.stdout.splitlines()[-1].split())
+
+
+@pytest.mark.parametrize('pkg', ['visual', 'data', 'hardware'])
+def test_lazy_subpackage(pkg):
+    modules = _modulesAfter("import psychopy.{}".format(pkg))
+    assert 'psychopy.visual.window' not in modules
+    assert 'psychopy.hardware.eyetracker' not in modules
+    assert 'pandas' not in modules
+
+
+def test_lazy_attributes():
+    from psychopy import data, hardware, visual
+    assert data.TrialHandler is data.trial.TrialHandler
+    assert data.utils.importConditions is data.importConditions
+    assert isinstance(data.haveOpenpyxl, bool)
+    assert hardware.eyetracker.__name__ == 'psychopy.hardware.eyetracker'
+    assert visual.helpers.pointInPolygon is visual.pointInPolygon
+    assert 'GratingStim' in dir(visual)
+    for pkg in (data, hardware, visual):
+        with pytest.raises(AttributeError):
+            pkg.notAnAttribute
@@ -0,0 +1,105 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import io
+import time
+
+import pytest
+
+from psychopy import logging
+
+
+class TestLogger:
+    def setup_method(self):
+        self.logger = logging._Logger()
+        self.stream = io.StringIO()
+        self.target = logging.LogFile(
+            self.stream, level=logging.DEBUG, logger=self.logger)
+
+    def teardown_method(self):
+        self.logger.stopBackgroundWriter()
+        self.logger.removeTarget(self.target)
+
+    def test_flush(self):
+        self.logger.log("first", logging.INFO, t=1.0)
+        self.logger.log("second", logging.DEBUG, t=2.0)
+        assert self.stream.getvalue() == ""
+        self.logger.flush()
+        assert self.stream.getvalue() == (
+            "1.0000 \tINFO \tfirst\n2.0000 \tDEBUG \tsecond\n")
+        assert len(self.logger.flushed) == 2
+
+    def test_maxFlushed(self):
+        self.logger.maxFlushed = 3
+        for n in range(10):
+            self.logger.log("msg %i" % n, logging.INFO, t=n)
+        self.logger.flush()
+        assert [e.message for e in self.logger.flushed] == [
+            "msg 7", "msg 8", "msg 9"]
+        # keep nothing at all
+        self.logger.maxFlushed = 0
+        self.logger.log("another", logging.INFO, t=11)
+        self.logger.flush()
+        assert len(self.logger.flushed) == 0
+        assert self.stream.getvalue().count('\n') == 11
+
+    def test_backgroundWriter(self):
+        self.logger.startBackgroundWriter(interval=0.01)
+        assert self.logger.backgroundWriter
+        for n in range(100):
+            self.logger.log("msg %i" % n, logging.EXP, t=n)
+        # the writer thread should get there without an explicit flush
+        deadline = time.time() + 5
+        while self.stream.getvalue().count('\n') < 100:
+            assert time.time() < deadline
+            time.sleep(0.01)
+        lines = self.stream.getvalue().splitlines()
+        assert lines[0].endswith("msg 0")
+        assert lines[-1].endswith("msg 99")
+        self.logger.stopBackgroundWriter()
+        assert not self.logger.backgroundWriter
+
+    def test_backgroundWriter_overflow(self):
+        self.logger.startBackgroundWriter(interval=10, bufferSize=10)
+        # hold the lock so that the writer can't drain the buffer
+        with self.logger._flushLock:
+            for n in range(15):
+                self.logger.log("msg %i" % n, logging.INFO, t=n)
+        self.logger.flush()
+        lines = self.stream.getvalue().splitlines()
+        assert "5 log entries were dropped" in lines[0]
+        assert lines[1].endswith("msg 5")
+        assert len(lines) == 11
+
+
+def test_LogEntry():
+    entry = logging._LogEntry(logging.DATA, "a message", t=1.5)
+    assert entry.t_ms == 1500
+    assert entry.levelname == 'DATA'
+    assert not hasattr(entry, '__dict__')
+    assert "%(t).2f %(levelname)s %(message)s" % entry == "1.50 DATA a message"
+    with pytest.raises(ValueError):
+        logging._LogEntry(logging.DATA, "bad time", t="soon")
+
+
+def test_BinaryLogFile(tmp_path):
+    logger = logging._Logger()
+    binPath = tmp_path / 'test.bin'
+    binLog = logging.BinaryLogFile(binPath, level=logging.INFO, logger=logger)
+    textLog = io.StringIO()
+    logging.LogFile(textLog, level=logging.INFO, logger=logger)
+    logger.log("first", logging.EXP, t=0.5)
+    logger.log("not this one", logging.DEBUG, t=1.0)
+    logger.log(u"ünïcödé", logging.WARNING, t=2.25)
+    logger.flush()
+    # flushing the logger writes the records to disk
+    assert len(logging.readBinaryLog(binPath)) == 2
+    binLog.stream.close()
+
+    entries = logging.readBinaryLog(binPath)
+    assert [e.message for e in entries] == ["first", u"ünïcödé"]
+    assert [e.level for e in entries] == [logging.EXP, logging.WARNING]
+    # converting gives the same text as the text target
+    assert logging.convertBinaryLog(binPath) == textLog.getvalue()
+    assert logging.convertBinaryLog(binPath, level=logging.WARNING) == \
+        "2.2500 \tWARNING \tünïcödé\n"
@@ -0,0 +1,61 @@
+"""Tests for finding plugins with the saved plugin index.
+"""
+import os
+import sys
+
+from psychopy import plugins
+from psychopy.preferences import prefs
+
+
+def _makePlugin(path, name, module):
+    """Make the metadata of an installed plugin package."""
+    infoDir = path / '{}-1.0.dist-info'.format(name.replace('-', '_'))
+    infoDir.mkdir()
+    (infoDir / 'METADATA').write_text(
+        'Metadata-Version: 2.1\nName: {}\nVersion: 1.0\n'.format(name))
+    (infoDir / 'entry_points.txt').write_text(
+        '[psychopy.visual]\nFancyStim = {}:FancyStim\n'.format(module))
+
+
+def test_scanPlugins_index(tmp_path, monkeypatch):
+    sitePackages = tmp_path / 'site-packages'
+    sitePackages.mkdir()
+    userDir = tmp_path / 'user'
+    (userDir / 'packages').mkdir(parents=True)
+    monkeypatch.setitem(prefs.paths, 'userPrefsDir', str(userDir))
+    monkeypatch.setitem(prefs.paths, 'packages', str(userDir / 'packages'))
+    monkeypatch.setattr(sys, 'path', sys.path + [str(sitePackages)])
+    # restored after the test
+    monkeypatch.setattr(plugins, '_installed_plugins_', {})
+
+    _makePlugin(sitePackages, 'psychopy-fancy', 'psychopy_fancy')
+    assert plugins.scanPlugins() >= 1
+    assert 'psychopy-fancy' in plugins.listPlugins()
+    assert os.path.isfile(plugins._getPluginIndexPath())
+    ep = plugins.pluginEntryPoints('psychopy-fancy')['psychopy.visual'][
+        'FancyStim']
+    assert ep.module_name == 'psychopy_fancy'
+    assert plugins.pluginEntryPoints('psychopy-fancy', parse=True) == {
+        'psychopy.visual': {'FancyStim': 'psychopy_fancy.FancyStim'}}
+
+    # the index is used while nothing has been installed
+    def noScan(paths):
+        raise AssertionError("Packages were scanned")
+
+    with monkeypatch.context() as m:
+        m.setattr(plugins, '_buildPluginIndex', noScan)
+        plugins.scanPlugins()
+        assert 'psychopy-fancy' in plugins.listPlugins()
+
+    # installing another plugin is noticed
+    _makePlugin(sitePackages, 'psychopy-other', 'psychopy_other')
+    plugins.scanPlugins()
+    assert {'psychopy-fancy', 'psychopy-other'} <= set(plugins.listPlugins())
+
+    # as is changing the entry points of a plugin
+    (sitePackages / 'psychopy_other-1.0.dist-info' / 'entry_points.txt'
+     ).write_text('[console_scripts]\nother = psychopy_other:main\n')
+    os.utime(sitePackages / 'psychopy_other-1.0.dist-info' /
+             'entry_points.txt', ns=(1, 1))
+    plugins.scanPlugins()
+    assert 'psychopy-other' not in plugins.listPlugins()
@@ -0,0 +1,141 @@
+"""Tests for background transcription using `TranscriptionQueue`, and for
+batched transcription with `WhisperTranscriber.transcribeBatch`.
+"""
+import sys
+import threading
+import numpy as np
+from psychopy.sound import AudioClip
+
+# `psychopy.sound.transcribe` is shadowed by the function of the same name
+transcribe = sys.modules['psychopy.sound.transcribe']
+
+
+def _clip():
+    return AudioClip(np.zeros((1600, 1)), sampleRateHz=16000)
+
+
+def test_transcriptionQueue(monkeypatch):
+    """Transcriptions submitted to the queue return a placeholder right away,
+    which is filled in by the worker thread."""
+    release = threading.Event()
+
+    def fakeRecognizer(audioClip, language=None, expectedWords=None,
+                       config=None):
+        release.wait(5.0)
+        return transcribe.TranscriptionResult(
+            words=['hello', 'world'], unknownValue=False, requestFailed=False,
+            engine='whisper', language='en')
+
+    monkeypatch.setattr(transcribe, 'recognizeWhisper', fakeRecognizer)
+
+    queue = transcribe.TranscriptionQueue()
+    try:
+        results = [queue.submit(_clip(), engine='whisper') for _ in range(3)]
+        assert isinstance(results[0], transcribe.TranscriptionResult)
+        assert not results[0].done
+        assert not results[0].success
+        assert queue.pending == 3
+        assert not queue.wait(timeout=0.01)
+
+        release.set()
+        assert queue.wait(timeout=5.0)
+        for result in results:
+            assert result.done
+            assert result.success
+            assert result.words == ['hello', 'world']
+            assert str(result) == 'hello world'
+        assert queue.pending == 0
+    finally:
+        queue.shutdown()
+
+
+def test_transcriptionQueueError(monkeypatch):
+    """Errors raised by the transcriber leave a failed result."""
+    def failingRecognizer(audioClip, **kwargs):
+        raise RuntimeError('no model')
+
+    monkeypatch.setattr(transcribe, 'recognizeWhisper', failingRecognizer)
+
+    result = _clip().transcribe(engine='whisper', block=False)
+    assert result.result(timeout=5.0) is result
+    assert result.requestFailed
+    assert not result.success
+    assert isinstance(result.exception, RuntimeError)
+
+
+class _FakeBatch:
+    """Stands in for the tensor of stacked spectrograms."""
+    def __init__(self, mels):
+        self.mels = list(mels)
+
+    def to(self, device):
+        return self
+
+
+class _FakeModel:
+    device = 'cpu'
+
+    class dims:
+        n_mels = 80
+
+    def to(self, device):
+        return self
+
+
+def _stubWhisper(monkeypatch, batches, options):
+    """Put stand-ins for `whisper` and `torch` in `sys.modules`, recording
+    the size of each decoded batch and the decoding options."""
+    import types
+
+    def decodingOptions(**kwargs):
+        options.append(kwargs)
+        return kwargs
+
+    def decode(model, batch, opts):
+        batches.append(len(batch.mels))
+        # each clip is filled with its index, so results can be told apart
+        return [types.SimpleNamespace(text=' clip %i' % mel[0], language='en')
+                for mel in batch.mels]
+
+    whisper = types.ModuleType('whisper')
+    whisper.load_model = lambda name: _FakeModel()
+    whisper.DecodingOptions = decodingOptions
+    whisper.log_mel_spectrogram = lambda waveform, nMels: waveform
+    whisper.decode = decode
+    whisper.audio = types.ModuleType('whisper.audio')
+    whisper.audio.pad_or_trim = lambda waveform: waveform
+    torch = types.ModuleType('torch')
+    torch.stack = _FakeBatch
+    monkeypatch.setitem(sys.modules, 'whisper', whisper)
+    monkeypatch.setitem(sys.modules, 'whisper.audio', whisper.audio)
+    monkeypatch.setitem(sys.modules, 'torch', torch)
+
+
+def test_transcribeBatch(monkeypatch):
+    """Clips are decoded in batches of `batchSize`, giving results in the
+    order of the clips."""
+    batches = []
+    options = []
+    _stubWhisper(monkeypatch, batches, options)
+
+    transcriber = transcribe.WhisperTranscriber({'model_name': 'base.en'})
+    clips = [AudioClip(np.full((1600, 1), n), sampleRateHz=16000)
+             for n in range(7)]
+    results = transcriber.transcribeBatch(
+        clips, modelConfig={'temperature': 0.2}, batchSize=3)
+    assert batches == [3, 3, 1]
+    assert [result.words for result in results] == [
+        ['clip', str(n)] for n in range(7)]
+    assert all(result.success for result in results)
+    assert transcriber.lastResult is results[-1]
+    assert options[0]['language'] == 'en'
+    assert options[0]['temperature'] == 0.2
+
+    # decoder options take precedence over the model's temperature
+    results = transcriber.transcribeBatch(
+        clips[:2], modelConfig={'temperature': 0.2},
+        decoderConfig={'temperature': 0.5, 'language': 'fr'})
+    assert batches[3:] == [2]
+    assert options[1]['temperature'] == 0.5
+    assert options[1]['language'] == 'fr'
+    assert transcriber.transcribeBatch([]) == []
@@ -100,3 +100,21 @@ def test_val2array():
             case['ans'],
             equal_nan=True
         )
+
+
+def test_createLumPattern_cache():
+    clearLumPatternCache()
+    gauss = createLumPattern('gauss', 64, None, {'sd': 3, 'fringeWidth': 0.2})
+    # the same array is returned, whatever the unused mask parameters
+    assert createLumPattern('gauss', 64, None, {'sd': 3}) is gauss
+    assert createLumPattern('gauss', 64, None, {'sd': 2}) is not gauss
+    with pytest.raises(ValueError):
+        gauss[0, 0] = 0
+    clearLumPatternCache()
+    again = createLumPattern('gauss', 64, None, {'sd': 3})
+    assert again is not gauss and numpy.array_equal(again, gauss)
+    # errors aren't cached
+    with pytest.raises(ValueError):
+        createLumPattern('gauss', 64)
+    with pytest.raises(ValueError):
+        createLumPattern('stripes', 64)
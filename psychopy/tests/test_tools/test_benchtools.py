@@ -0,0 +1,51 @@
+"""Tests for psychopy.tools.benchtools
+"""
+import pytest
+
+from psychopy.tools import benchtools
+
+
+def test_timeCalls():
+    calls = []
+    result = benchtools.timeCalls(lambda: calls.append(1), nCalls=50,
+                                  before=lambda: None, nWarmup=5, name='x')
+    assert result.name == 'x'
+    assert result.stats['n'] == 50
+    assert len(calls) == 5 + 50 + 50  # warmup, timed and traced calls
+    assert 0 <= result.stats['p50'] <= result.stats['p99'] <= \
+        result.stats['max']
+    assert result.allocPeak is not None
+
+
+def test_runBenchmarks(tmp_path):
+    names = ['MonotonicClock.getTime', 'core.wait(0.001)', 'logging.flush']
+    results = benchtools.runBenchmarks(names, nCalls=20)
+    assert [r.name for r in results] == names
+    for result in results:
+        assert not result.skipped
+    # waits report how late they finish, not how long they take
+    assert results[1].stats['p50'] < 0.001
+
+    fileName = str(tmp_path / 'results.json')
+    benchtools.saveResults(results, fileName)
+    loaded = benchtools.loadResults(fileName)
+    assert [r.toDict() for r in loaded] == [r.toDict() for r in results]
+
+    with pytest.raises(ValueError):
+        benchtools.runBenchmarks(['notABenchmark'])
+
+
+def test_compareResults():
+    def result(name, p50, skipped=None):
+        stats = None if skipped else {'p50': p50, 'p99': p50 * 2}
+        return benchtools.BenchmarkResult(name, stats=stats, skipped=skipped)
+
+    baseline = [result('a', 1e-3), result('b', 1e-7), result('c', 1e-3),
+                result('d', None, skipped='no display')]
+    results = [result('a', 2e-3), result('b', 1e-6), result('c', 1.1e-3),
+               result('d', 1.0), result('e', 1.0)]
+    slower = benchtools.compareResults(results, baseline, tolerance=0.5)
+    # 'b' is 10x slower but by less than minDiff, 'c' is within tolerance,
+    # and 'd' and 'e' have nothing to compare with
+    assert [(name, stat) for name, stat, _, _ in slower] == [
+        ('a', 'p50'), ('a', 'p99')]
@@ -0,0 +1,81 @@
+import threading
+
+import numpy
+import pytest
+from PIL import Image
+
+from psychopy.tools.movietools import MovieFrameWriter
+
+
+def _frames(n, size=(8, 6)):
+    w, h = size
+    rng = numpy.random.default_rng(0)
+    return [rng.integers(0, 256, size=(h, w, 4), dtype=numpy.uint8)
+            for _ in range(n)]
+
+
+def test_image_sequence(tmp_path):
+    frames = _frames(5)
+    writer = MovieFrameWriter(tmp_path / "frame.png", size=(8, 6),
+                              maxQueueSize=2, flipVert=True)
+    assert writer.encoder == 'images'
+    writer.open()
+    for frame in frames:
+        writer.write(frame)
+    writer.close()
+    assert not writer.isOpen
+    assert writer.framesWritten == 5
+    for i, frame in enumerate(frames):
+        written = numpy.array(Image.open(tmp_path / "frame{:05d}.png".format(i + 1)))
+        # rows are flipped and the alpha channel dropped
+        assert numpy.array_equal(written, frame[::-1, :, :3])
+
+
+def test_bounded_queue(tmp_path):
+    """Writing blocks while the queue is full, rather than keeping all frames."""
+    release = threading.Event()
+    written = []
+
+    class SlowWriter(MovieFrameWriter):
+        def _openEncoder(self):
+            def write(frame):
+                release.wait(5)
+                written.append(frame)
+            return write, lambda: None
+
+    writer = SlowWriter(tmp_path / "movie.mp4", size=(8, 6), encoder='images',
+                        maxQueueSize=2)
+    writer.open()
+    frames = _frames(5)
+    done = threading.Event()
+
+    def produce():
+        for frame in frames:
+            writer.write(frame)
+        done.set()
+
+    producer = threading.Thread(target=produce)
+    producer.start()
+    # one frame being encoded and two waiting, the producer is blocked
+    assert not done.wait(0.2)
+    assert writer.framesPending <= 2
+    release.set()
+    producer.join(5)
+    writer.close()
+    assert writer.framesWritten == len(written) == 5
+
+
+def test_encoder_error(tmp_path):
+    class FailingWriter(MovieFrameWriter):
+        def _openEncoder(self):
+            def write(frame):
+                raise IOError("disk full")
+            return write, lambda: None
+
+    writer = FailingWriter(tmp_path / "movie.mp4", size=(8, 6), encoder='images')
+    writer.open()
+    writer.write(_frames(1)[0])
+    with pytest.raises(RuntimeError):
+        writer.close()
+    with pytest.raises(ValueError):
+        MovieFrameWriter(tmp_path / "movie.mp4", size=(8, 6), encoder='vhs')
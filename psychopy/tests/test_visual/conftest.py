@@ -0,0 +1,18 @@
+"""
+py.test fixtures shared by the visual tests
+"""
+
+import pytest
+from psychopy.visual.textbox2.fontmanager import FontManager, GLFont
+
+
+@pytest.fixture(scope='session', autouse=True)
+def glyphCacheDir(tmp_path_factory):
+    """Keep the glyph caches of fonts used by the tests out of the user's
+    fonts folder."""
+    cacheDir = GLFont.cacheDir
+    GLFont.cacheDir = tmp_path_factory.mktemp('glyphCache')
+    yield GLFont.cacheDir
+    # save now rather than at exit, when the real folder is used again
+    FontManager.saveFontCaches()
+    GLFont.cacheDir = cacheDir
@@ -0,0 +1,48 @@
+import numpy
+
+from psychopy.visual import filters
+
+
+def test_makeGrating_cached():
+    grating = filters.makeGrating(64, ori=20.0, cycles=3.0, gratType='sqr')
+    again = filters.makeGrating(64, ori=20.0, cycles=3.0, gratType='sqr')
+    # copies of the cached grating, which can be changed
+    assert again is not grating
+    assert numpy.array_equal(again, grating)
+    grating *= 0
+    assert not numpy.array_equal(
+        filters.makeGrating(64, ori=20.0, cycles=3.0, gratType='sqr'), grating)
+
+
+def test_makeMask_cached():
+    mask = filters.makeMask(32, 'raisedCosine', radius=[1.0, 0.5])
+    assert numpy.array_equal(
+        filters.makeMask(32, 'raisedCosine', radius=(1.0, 0.5)), mask)
+    assert not numpy.array_equal(
+        filters.makeMask(32, 'raisedCosine', radius=1.0), mask)
+    # unhashable arguments aren't cached
+    center = numpy.array([[0.0], [0.0]])
+    assert filters.makeMask(32, 'circle', center=center).shape == (32, 32)
+    # neither are 0-d arrays, which can't be converted to tuples
+    assert numpy.array_equal(
+        filters.makeGrating(32, cycles=numpy.array(3.0)),
+        filters.makeGrating(32, cycles=3.0))
+
+
+def test_cached_original_arguments():
+    calls = []
+
+    @filters._cached
+    def make(values):
+        calls.append(values)
+        return numpy.asarray(values, dtype=float)
+
+    values = [1.0, 2.0]
+    assert numpy.array_equal(make(values), values)
+    # the function is given the arguments it was called with, not the key
+    assert calls[0] is values
+    make([1.0, 2.0])
+    assert len(calls) == 1
+    make.cache_clear()
+    make([1.0, 2.0])
+    assert len(calls) == 2
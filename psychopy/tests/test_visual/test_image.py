@@ -215,4 +215,71 @@ class TestImageAnimation:
             # Cleanup
             win.close()
             del img
-            
\ No newline at end of file
+            
+
+def test_image_cache(tmp_path):
+    """
+    Check that prefetched images are decoded in the background, cached and reloaded if the file changes
+    """
+    import os
+    from PIL import Image
+    from psychopy.visual.imagecache import ImageCache
+
+    cache = ImageCache(maxItems=2)
+    try:
+        imgPath = Path(TESTS_DATA_PATH) / 'testimage.jpg'
+        trial = {'image': str(imgPath), 'corrAns': 'left', 'n': 1}
+        futures = cache.prefetch(trial, mode='RGBA')
+        assert len(futures) == 1
+        im = futures[0].result(timeout=10)
+        assert im.mode == 'RGBA'
+        # Images are flipped ready to be made into textures
+        with Image.open(imgPath) as orig:
+            assert im.size == orig.size
+            assert im.getpixel((0, 0)) == orig.convert('RGBA').getpixel((0, orig.size[1] - 1))
+        # Getting the same image uses the cached one
+        assert cache.get(imgPath, mode='RGBA') is im
+        # Images which weren't prefetched aren't kept, unless asked to
+        assert cache.get(imgPath) is not im
+        assert len(cache) == 1
+        # Least recently used images are dropped
+        lumPath = tmp_path / 'lum.png'
+        Image.new('L', (4, 2), 128).save(lumPath)
+        assert cache.get(lumPath, mode='RGBA', retain=True).mode == 'L'  # luminance images are kept
+        assert len(cache) == 2
+        assert cache.get(imgPath, retain=True) is not im
+        assert len(cache) == 2
+        # Changed files are decoded again
+        lumIm = cache.get(lumPath, retain=True)
+        Image.new('L', (8, 2), 128).save(lumPath)
+        os.utime(lumPath, ns=(0, 1))
+        assert cache.get(lumPath) is not lumIm
+        assert cache.get(lumPath).size == (8, 2)
+    finally:
+        cache.shutdown()
+
+
+def test_image_cache_bytes(tmp_path):
+    """
+    Check that the image cache is bounded by the memory used by the decoded images
+    """
+    from PIL import Image
+    from psychopy.visual.imagecache import ImageCache
+
+    paths = []
+    for n in range(3):
+        paths.append(tmp_path / f'im{n}.png')
+        Image.new('RGB', (10, 10), (n, n, n)).save(paths[-1])
+    # room for two 10x10 RGBA images
+    cache = ImageCache(maxBytes=2 * 10 * 10 * 4)
+    try:
+        for future in cache.prefetch(paths, mode='RGBA'):
+            future.result(timeout=10)
+        cache.shutdown()  # waits for the decoded images to be counted
+        assert len(cache) == 2
+        assert cache.nBytes == 2 * 10 * 10 * 4
+        assert str(paths[0]) not in cache
+        cache.clear()
+        assert cache.nBytes == 0
+    finally:
+        cache.shutdown()
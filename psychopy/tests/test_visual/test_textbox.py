@@ -1,3 +1,4 @@
+import os
 from pathlib import Path
 
 import numpy as np
@@ -8,7 +9,8 @@ from psychopy.tests.test_visual.test_basevisual import _TestColorMixin, _TestUni
 from psychopy.tests.test_experiment.test_component_compile_python import _TestBoilerplateMixin
 from psychopy.visual import Window
 from psychopy.visual import TextBox2
-from psychopy.visual.textbox2.fontmanager import FontManager
+from psychopy.visual.textbox2.fontmanager import FontManager, GLFont
+from psychopy import prefs
 import pytest
 from psychopy.tests import utils
 
@@ -328,6 +330,32 @@ class Test_textbox(_TestColorMixin, _TestUnitsMixin, _TestBoilerplateMixin):
         # Set editable back to start value
         self.textbox.editable = wasEditable
 
+    def test_incremental_layout(self):
+        """Check that editing text gives the same layout as setting it from scratch"""
+        texts = [
+            "A PsychoPy zealot\nknows a smidge of wx,\n\nbut JavaScript is the question.",
+            "A PsychoPy zealot\nknows a <b>smidge</b> of wx,\n\nbut JavaScript is the question.",
+            "A PsychoPy zealot\nknows a <b>smidge</b> of wx,\n\nbut antidisestablishmentarianism is the question.",
+            "\nA PsychoPy zealot\nknows a <b>smidge</b> of wx,\nbut antidisestablishmentarianism is the question.",
+        ]
+        for text in texts:
+            self.textbox.text = text
+            fresh = TextBox2(self.win, text,
+                             font="Noto Sans", alignment="top left", lineSpacing=1, padding=0.05,
+                             pos=(0, 0), size=(1, 1), units='height',
+                             letterHeight=0.1, colorSpace="rgb",
+                             lineBreaking=self.textbox._lineBreaking)
+            assert np.allclose(self.textbox.vertices, fresh.vertices)
+            assert np.allclose(self.textbox._texcoords, fresh._texcoords)
+            assert np.allclose(self.textbox._colors, fresh._colors)
+            assert list(self.textbox._lineLenChars) == list(fresh._lineLenChars)
+            assert np.allclose(self.textbox._lineBottoms, fresh._lineBottoms)
+        # changing the colour only changes the colours
+        vertices = self.textbox.vertices.copy()
+        self.textbox.color = "red"
+        assert np.allclose(self.textbox.vertices, vertices)
+        assert np.allclose(self.textbox._colors, self.textbox._foreColor.render('rgba1'))
+
     def test_basic(self):
         pass
 
@@ -466,6 +494,79 @@ def test_font_manager():
         assert bool(mgr.getFontNamesSimilar("Hanalei"))
 
 
+def test_glyph_cache(tmp_path, monkeypatch):
+    # Keep the glyph cache for this test in a temporary folder
+    monkeypatch.setattr(GLFont, 'cacheDir', tmp_path)
+    fontFile = Path(prefs.paths['resources']) / "fonts" / "DejaVuSerif.ttf"
+    font = GLFont(fontFile, 32)
+    assert not font.loadFromCache()
+    font.fetch("Hello world")
+    font.saveToCache()
+    assert font.cacheFilename.is_file()
+    # A new font of the same file and size loads glyphs and texture from cache
+    cached = GLFont(fontFile, 32)
+    assert cached.loadFromCache()
+    assert set(cached.glyphs) == set(font.glyphs)
+    for char, glyph in font.glyphs.items():
+        for attr in ('size', 'offset', 'advance', 'texcoords'):
+            assert getattr(cached.glyphs[char], attr) == getattr(glyph, attr)
+    assert np.array_equal(cached.atlas.data, font.atlas.data)
+    assert cached.atlas.nodes == font.atlas.nodes
+    # New glyphs are packed around the cached ones
+    cached.fetch("XYZ")
+    assert np.array_equal(
+        cached.atlas.data[font.atlas.data > 0], font.atlas.data[font.atlas.data > 0])
+    # A different size or a changed font file doesn't use the cache
+    assert not GLFont(fontFile, 24).loadFromCache()
+    changedFile = tmp_path / "changed.ttf"
+    changedFile.write_bytes(fontFile.read_bytes())
+    changed = GLFont(changedFile, 32)
+    assert changed.cacheFilename == cached.cacheFilename
+    with open(changedFile, 'ab') as f:
+        f.write(b"\0")
+    assert changed.cacheFilename != cached.cacheFilename
+
+
+def test_glyph_cache_pruned(tmp_path, monkeypatch):
+    monkeypatch.setattr(GLFont, 'cacheDir', tmp_path)
+    monkeypatch.setattr(GLFont, 'maxCacheFiles', 2)
+    fontFile = Path(prefs.paths['resources']) / "fonts" / "DejaVuSerif.ttf"
+    fonts = {size: GLFont(fontFile, size) for size in (20, 24, 28)}
+    for size in (20, 24):
+        fonts[size].fetch("Hi")
+        fonts[size].saveToCache()
+    os.utime(fonts[20].cacheFilename, (1000, 1000))
+    os.utime(fonts[24].cacheFilename, (2000, 2000))
+    # Loading a cache marks it as recently used...
+    assert GLFont(fontFile, 20).loadFromCache()
+    # ...so the least recently used one is deleted to make room
+    fonts[28].fetch("Hi")
+    fonts[28].saveToCache()
+    assert sorted(path.name for path in tmp_path.iterdir()) == sorted(
+        fonts[size].cacheFilename.name for size in (20, 28))
+
+
+def test_glyph_metric_arrays(monkeypatch):
+    monkeypatch.setattr(GLFont, 'useDiskCache', False)
+    fontFile = Path(prefs.paths['resources']) / "fonts" / "DejaVuSerif.ttf"
+    font = GLFont(fontFile, 32)
+    text = "Hello world"
+    ids = font.getGlyphIds(text)
+    # Each character has one id, which indexes the metrics of its glyph
+    assert len(ids) == len(text)
+    assert ids[2] == ids[3] == font.getGlyphIds("l")[0]
+    for char, glyphId in zip(text, ids):
+        glyph = font[char]
+        assert np.array_equal(font.glyphSizes[glyphId], glyph.size)
+        assert np.array_equal(font.glyphOffsets[glyphId], glyph.offset)
+        assert np.array_equal(font.glyphAdvances[glyphId], glyph.advance)
+        assert np.array_equal(font.glyphTexcoords[glyphId], glyph.texcoords)
+    # Ids don't change as more glyphs are added
+    font.fetch("".join(chr(c) for c in range(0x41, 0x41 + 200)))
+    assert np.array_equal(font.getGlyphIds(text), ids)
+    assert len(font.glyphSizes) == len(font.glyphs)
+
+
 @pytest.mark.uax14
 class Test_uax14_textbox(Test_textbox):
     """Runs the same tests as for Test_textbox, but with the textbox set to uax14 line breaking"""
@@ -15,10 +15,18 @@ __all__ = ["createXYs",
            "shuffleArray",
            "val2array",
            "array2pointer",
-           "createLumPattern"]
+           "createLumPattern",
+           "clearLumPatternCache"]
 
 import numpy
 import ctypes
+from collections import OrderedDict
+
+# patterns made by `createLumPattern`, by the parameters they were made with,
+# most recently used last
+_lumPatternCache = OrderedDict()
+# total size of the cached patterns which can be kept, in bytes
+lumPatternCacheSize = 128 * 1024 ** 2
 
 
 def createXYs(x, y=None):
@@ -291,7 +299,15 @@ def createLumPattern(patternType, res, texParams=None, maskParams=None):
     -------
     ndarray
         Array of normalized intensity values containing the desired pattern
-        specified by `mode`.
+        specified by `mode`. The array is read-only, as patterns are cached and
+        the same array is returned each time the same pattern is requested
+        (copy it to change it).
+
+    Notes
+    -----
+    * Patterns are cached until their total size exceeds
+      `lumPatternCacheSize` bytes, when the least recently used are removed.
+      Call `clearLumPatternCache()` to remove them all.
 
     Examples
     --------
@@ -330,6 +346,46 @@ def createLumPattern(patternType, res, texParams=None, maskParams=None):
     else:
         raise TypeError('parameter `maskParams` must be type `dict` or `None`')
 
+    # only the mask parameter used by the pattern (if any) is part of the key,
+    # so e.g. gratings with different masks share the same pattern
+    if patternType in (None, "none", "None", "color"):
+        key = (None, 1, None)
+    elif patternType == "gauss":
+        key = (patternType, res, allMaskParams.get('sd'))
+    elif patternType == "raisedCos":
+        key = (patternType, res, allMaskParams.get('fringeWidth'))
+    else:
+        key = (patternType, res, None)
+    try:
+        intensity = _lumPatternCache.pop(key)
+    except KeyError:
+        pass
+    except TypeError:  # unhashable parameter, don't cache it
+        return _makeLumPattern(patternType, res, allMaskParams)
+    else:
+        _lumPatternCache[key] = intensity  # now the most recently used
+        return intensity
+
+    intensity = numpy.asarray(_makeLumPattern(patternType, res, allMaskParams))
+    intensity.flags.writeable = False
+    _lumPatternCache[key] = intensity
+    # remove the least recently used patterns if there are too many
+    cacheSize = sum(arr.nbytes for arr in _lumPatternCache.values())
+    while cacheSize > lumPatternCacheSize and len(_lumPatternCache) > 1:
+        _, oldest = _lumPatternCache.popitem(last=False)
+        cacheSize -= oldest.nbytes
+
+    return intensity
+
+
+def clearLumPatternCache():
+    """Remove all the patterns cached by `createLumPattern`."""
+    _lumPatternCache.clear()
+
+
+def _makeLumPattern(patternType, res, allMaskParams):
+    """Generate a pattern for `createLumPattern`, which has already checked
+    the parameters."""
     # correct `makeRadialMatrix` from filters, duplicated her to avoid importing
     # all of visual to test this function out
     def _makeRadialMatrix(matrixSize, center=(0.0, 0.0), radius=1.0):
@@ -0,0 +1,504 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# Part of the PsychoPy library
+# Copyright (C) 2002-2018 Jonathan Peirce (C) 2019-2022 Open Science Tools Ltd.
+# Distributed under the terms of the GNU General Public License (GPL).
+
+"""Benchmarks of the timing-critical functions of PsychoPy (clocks, waits,
+polling for events, flushing logs and flipping windows), reporting the latency
+of each call and memory allocated, which can be saved and compared with a
+baseline to catch regressions, e.g. after updating a lab machine.
+
+Run all the benchmarks which can run on this machine from the command line::
+
+    python -m psychopy.tools.benchtools --save baseline.json
+    python -m psychopy.tools.benchtools --compare baseline.json
+
+On Linux machines without a display (e.g. when building lab images), windows
+are made offscreen using pyglet's headless (EGL) mode. Benchmarks which need
+something that isn't available (e.g. OpenGL, or iohub) are skipped.
+"""
+
+__all__ = [
+    'BenchmarkResult',
+    'BenchmarkSkipped',
+    'timeCalls',
+    'getBenchmarkNames',
+    'runBenchmarks',
+    'saveResults',
+    'loadResults',
+    'compareResults'
+]
+
+import os
+import sys
+import json
+import time
+import platform
+import argparse
+import tempfile
+import tracemalloc
+
+import numpy
+
+# percentiles of the latencies reported for each benchmark
+percentiles = (50, 90, 99)
+
+
+class BenchmarkSkipped(Exception):
+    """Raised when setting up a benchmark which can't run on this machine."""
+
+
+class BenchmarkResult:
+    """Latencies and memory allocations of the calls made by a benchmark.
+
+    Parameters
+    ----------
+    name : str
+        Name of the benchmark.
+    latencies : ArrayLike or None
+        Time taken by each call in seconds, less the nominal duration of the
+        call (e.g. the duration of a wait).
+    allocPeak : int or None
+        Peak memory allocated while making the calls, in bytes.
+    allocNet : float or None
+        Memory allocated and not freed per call, in bytes.
+    skipped : str or None
+        Why the benchmark was skipped, or `None` if it ran.
+    stats : dict or None
+        Statistics of the latencies, if loaded from a file rather than
+        computed from `latencies`.
+
+    """
+    def __init__(self, name, latencies=None, allocPeak=None, allocNet=None,
+                 skipped=None, stats=None):
+        self.name = name
+        self.allocPeak = allocPeak
+        self.allocNet = allocNet
+        self.skipped = skipped
+        if stats is None and latencies is not None:
+            latencies = numpy.asarray(latencies, dtype=float)
+            stats = {'n': len(latencies),
+                     'mean': float(latencies.mean()),
+                     'sd': float(latencies.std()),
+                     'max': float(latencies.max())}
+            for p in percentiles:
+                stats['p%d' % p] = float(numpy.percentile(latencies, p))
+        self.stats = stats or {}
+
+    def __repr__(self):
+        if self.skipped:
+            return "<BenchmarkResult {!r} skipped: {}>".format(
+                self.name, self.skipped)
+        return "<BenchmarkResult {!r} p50={:.1f}us p99={:.1f}us>".format(
+            self.name, self.stats['p50'] * 1e6, self.stats['p99'] * 1e6)
+
+    def toDict(self):
+        """Get the result as a `dict`, as saved by `saveResults`."""
+        return {'name': self.name, 'stats': self.stats,
+                'allocPeak': self.allocPeak, 'allocNet': self.allocNet,
+                'skipped': self.skipped}
+
+    @classmethod
+    def fromDict(cls, values):
+        """Make a result from a `dict` made by `toDict`."""
+        return cls(values['name'], stats=values.get('stats'),
+                   allocPeak=values.get('allocPeak'),
+                   allocNet=values.get('allocNet'),
+                   skipped=values.get('skipped'))
+
+
+def timeCalls(func, nCalls=1000, before=None, nominal=0.0, nWarmup=10,
+              measureAllocations=True, name=None):
+    """Time repeated calls to a function.
+
+    Parameters
+    ----------
+    func : callable
+        Function to call, with no arguments.
+    nCalls : int
+        Number of calls to time.
+    before : callable or None
+        Function called before each call to `func`, which isn't timed.
+    nominal : float
+        Time each call is meant to take, in seconds, which is subtracted from
+        the latencies (e.g. so waits report how late they finish).
+    nWarmup : int
+        Number of calls made before timing, so caches etc. are filled.
+    measureAllocations : bool
+        Also make (up to 100) calls while tracing memory allocations, which
+        is slower so is done separately from timing.
+    name : str or None
+        Name of the result, the name of `func` if `None`.
+
+    Returns
+    -------
+    BenchmarkResult
+        Latencies and allocations of the calls.
+
+    """
+    if name is None:
+        name = getattr(func, '__name__', repr(func))
+    clock = time.perf_counter
+    for _ in range(nWarmup):
+        if before is not None:
+            before()
+        func()
+
+    latencies = numpy.zeros(max(int(nCalls), 1))
+    for i in range(len(latencies)):
+        if before is not None:
+            before()
+        t0 = clock()
+        func()
+        latencies[i] = clock() - t0
+    latencies -= nominal
+
+    allocPeak = allocNet = None
+    if measureAllocations and not tracemalloc.is_tracing():
+        nTraced = min(len(latencies), 100)
+        tracemalloc.start()
+        try:
+            start, _ = tracemalloc.get_traced_memory()
+            if hasattr(tracemalloc, 'reset_peak'):  # Python 3.9+
+                tracemalloc.reset_peak()
+            for _ in range(nTraced):
+                if before is not None:
+                    before()
+                func()
+            current, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        allocPeak = max(peak - start, 0)
+        allocNet = (current - start) / nTraced
+
+    return BenchmarkResult(name, latencies, allocPeak, allocNet)
+
+
+# Benchmarks by name. Each is a function which sets up the benchmark (raising
+# `BenchmarkSkipped` if it can't run) and returns a dict of arguments for
+# `timeCalls` (at least 'func'), optionally with a 'teardown' function.
+_benchmarks = {}
+
+
+def _benchmark(name):
+    """Decorator registering a benchmark's setup function."""
+    def register(setup):
+        _benchmarks[name] = setup
+        return setup
+    return register
+
+
+@_benchmark('MonotonicClock.getTime')
+def _benchMonotonicClock():
+    from psychopy.clock import MonotonicClock
+    return {'func': MonotonicClock().getTime}
+
+
+@_benchmark('CountdownTimer.getTime')
+def _benchCountdownTimer():
+    from psychopy.clock import CountdownTimer
+    return {'func': CountdownTimer(10).getTime}
+
+
+@_benchmark('core.wait(0.001)')
+def _benchWait1ms():
+    from psychopy import core
+    return {'func': lambda: core.wait(0.001), 'nominal': 0.001,
+            'maxCalls': 500}
+
+
+@_benchmark('core.wait(0.01)')
+def _benchWait10ms():
+    from psychopy import core
+    return {'func': lambda: core.wait(0.01), 'nominal': 0.01,
+            'maxCalls': 100}
+
+
+@_benchmark('event.getKeys')
+def _benchEventGetKeys():
+    try:
+        from psychopy import event
+    except Exception as err:  # e.g. no display for pyglet
+        raise BenchmarkSkipped(str(err))
+    return {'func': event.getKeys}
+
+
+@_benchmark('Keyboard.getKeys')
+def _benchKeyboardGetKeys():
+    try:
+        from psychopy.hardware import keyboard
+        kb = keyboard.Keyboard()
+    except Exception as err:
+        raise BenchmarkSkipped(str(err))
+    return {'func': kb.getKeys}
+
+
+@_benchmark('logging.flush')
+def _benchLoggingFlush():
+    from psychopy import logging
+    logger = logging._Logger()
+    logFile = tempfile.TemporaryFile('w+')
+    logging.LogFile(logFile, level=logging.DEBUG, logger=logger)
+
+    def logEntries():
+        # a frame's worth of typical entries
+        for i in range(10):
+            logger.log("benchmark entry %i" % i, logging.EXP)
+
+    return {'func': logger.flush, 'before': logEntries,
+            'teardown': logFile.close}
+
+
+def _useHeadlessWindows():
+    """Make pyglet windows offscreen (using EGL) if there is no display, so
+    flips can still be timed. Only possible before pyglet opens a display."""
+    if not sys.platform.startswith('linux') or 'pyglet.canvas' in sys.modules:
+        return
+    if os.environ.get('DISPLAY') or os.environ.get('WAYLAND_DISPLAY'):
+        return
+    try:
+        import pyglet
+    except ImportError:
+        return
+    pyglet.options['headless'] = True
+
+
+@_benchmark('Window.flip')
+def _benchWindowFlip():
+    _useHeadlessWindows()
+    try:
+        from psychopy import visual
+        win = visual.Window(size=(64, 64), checkTiming=False, autoLog=False)
+    except Exception as err:  # e.g. no OpenGL, or no EGL when headless
+        raise BenchmarkSkipped(str(err))
+    return {'func': win.flip, 'maxCalls': 300, 'teardown': win.close}
+
+
+@_benchmark('iohub.getEvents')
+def _benchIohubGetEvents():
+    try:
+        from psychopy.iohub import launchHubServer
+        io = launchHubServer()
+    except Exception as err:
+        raise BenchmarkSkipped(str(err))
+    return {'func': io.getEvents, 'teardown': io.quit}
+
+
+def getBenchmarkNames():
+    """Get the names of the benchmarks, in the order they are run.
+
+    Returns
+    -------
+    list
+        Names of the benchmarks.
+
+    """
+    return list(_benchmarks)
+
+
+def runBenchmarks(names=None, nCalls=1000, measureAllocations=True,
+                  exclude=('iohub.getEvents',)):
+    """Run benchmarks.
+
+    Parameters
+    ----------
+    names : list or None
+        Names of the benchmarks to run (see `getBenchmarkNames`), or `None`
+        to run all of them except those in `exclude`.
+    nCalls : int
+        Number of calls to time for each benchmark. Benchmarks of slow calls
+        (waits and flips) make fewer.
+    measureAllocations : bool
+        Also measure the memory allocated by the calls.
+    exclude : list or tuple
+        Benchmarks not run unless they are in `names`. The iohub benchmark is
+        excluded by default as starting iohub takes a few seconds.
+
+    Returns
+    -------
+    list
+        A :class:`BenchmarkResult` for each benchmark, including those which
+        were skipped.
+
+    """
+    if names is None:
+        names = [name for name in _benchmarks if name not in exclude]
+    # before any benchmark imports pyglet
+    _useHeadlessWindows()
+    results = []
+    for name in names:
+        try:
+            setup = _benchmarks[name]
+        except KeyError:
+            raise ValueError("Unknown benchmark {!r}, should be one of {}"
+                             .format(name, getBenchmarkNames()))
+        try:
+            kwargs = setup()
+        except BenchmarkSkipped as err:
+            results.append(BenchmarkResult(name, skipped=str(err) or 'skipped'))
+            continue
+        teardown = kwargs.pop('teardown', None)
+        maxCalls = kwargs.pop('maxCalls', nCalls)
+        try:
+            results.append(timeCalls(
+                nCalls=min(nCalls, maxCalls),
+                measureAllocations=measureAllocations, name=name, **kwargs))
+        finally:
+            if teardown is not None:
+                teardown()
+
+    return results
+
+
+def _getMachineInfo():
+    """Describe this machine and installation, saved with the results."""
+    try:
+        from psychopy import __version__ as psychopyVersion
+    except ImportError:
+        psychopyVersion = None
+    return {'platform': platform.platform(), 'machine': platform.machine(),
+            'processor': platform.processor(), 'node': platform.node(),
+            'python': sys.version.split()[0], 'psychopy': psychopyVersion,
+            'time': time.strftime('%Y-%m-%d %H:%M:%S')}
+
+
+def saveResults(results, fileName):
+    """Save benchmark results (and a description of this machine) to a JSON
+    file, e.g. as a baseline for `compareResults`.
+
+    Parameters
+    ----------
+    results : list
+        Results from `runBenchmarks`.
+    fileName : str
+        Path of the file to write.
+
+    """
+    data = {'machine': _getMachineInfo(),
+            'results': [result.toDict() for result in results]}
+    with open(fileName, 'w') as f:
+        json.dump(data, f, indent=2)
+
+
+def loadResults(fileName):
+    """Load benchmark results saved by `saveResults`.
+
+    Parameters
+    ----------
+    fileName : str
+        Path of the file to read.
+
+    Returns
+    -------
+    list
+        A :class:`BenchmarkResult` for each benchmark.
+
+    """
+    with open(fileName, 'r') as f:
+        data = json.load(f)
+    return [BenchmarkResult.fromDict(values) for values in data['results']]
+
+
+def compareResults(results, baseline, tolerance=0.5, minDiff=2e-6,
+                   stats=('p50', 'p99')):
+    """Find benchmarks which have become slower than a baseline.
+
+    Parameters
+    ----------
+    results : list
+        Results to check, from `runBenchmarks`.
+    baseline : list
+        Results to compare with, e.g. from `loadResults`.
+    tolerance : float
+        Proportion a statistic can increase by before it counts as slower.
+    minDiff : float
+        Smallest increase in seconds that counts as slower, so tiny
+        latencies (e.g. of reading a clock) don't report noise.
+    stats : tuple
+        Statistics of the latencies to compare.
+
+    Returns
+    -------
+    list
+        `(name, stat, baselineValue, value)` for each statistic which is
+        slower than the baseline.
+
+    """
+    baseline = {result.name: result for result in baseline
+                if not result.skipped}
+    slower = []
+    for result in results:
+        old = baseline.get(result.name)
+        if result.skipped or old is None:
+            continue
+        for stat in stats:
+            if stat not in result.stats or stat not in old.stats:
+                continue
+            oldValue, value = old.stats[stat], result.stats[stat]
+            if value - oldValue > max(abs(oldValue) * tolerance, minDiff):
+                slower.append((result.name, stat, oldValue, value))
+
+    return slower
+
+
+def _printResults(results):
+    header = "{:<26}".format('benchmark') + ''.join(
+        "{:>10}".format('p%d (us)' % p) for p in percentiles) + \
+        "{:>10}{:>12}".format('max (us)', 'alloc (B)')
+    print(header)
+    for result in results:
+        if result.skipped:
+            print("{:<26}skipped: {}".format(
+                result.name, result.skipped.splitlines()[0][:60]))
+            continue
+        row = "{:<26}".format(result.name) + ''.join(
+            "{:>10.1f}".format(result.stats['p%d' % p] * 1e6)
+            for p in percentiles)
+        row += "{:>10.1f}".format(result.stats['max'] * 1e6)
+        row += "{:>12}".format(
+            '' if result.allocPeak is None else result.allocPeak)
+        print(row)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog='python -m psychopy.tools.benchtools',
+        description="Benchmark the timing of PsychoPy's clocks, waits, event "
+                    "polling, logging and window flips.")
+    parser.add_argument('names', nargs='*',
+                        help="benchmarks to run (default: all but iohub), "
+                             "from: {}".format(', '.join(_benchmarks)))
+    parser.add_argument('--calls', type=int, default=1000,
+                        help="number of calls to time for each benchmark")
+    parser.add_argument('--no-alloc', action='store_true',
+                        help="don't measure memory allocations")
+    parser.add_argument('--save', metavar='FILE',
+                        help="save the results to a JSON file")
+    parser.add_argument('--compare', metavar='FILE',
+                        help="compare with results saved with --save, "
+                             "exiting with status 1 if any are slower")
+    parser.add_argument('--tolerance', type=float, default=0.5,
+                        help="proportion latencies can increase by before "
+                             "they count as slower (default: 0.5)")
+    args = parser.parse_args(argv)
+
+    results = runBenchmarks(names=args.names or None, nCalls=args.calls,
+                            measureAllocations=not args.no_alloc)
+    _printResults(results)
+    if args.save:
+        saveResults(results, args.save)
+    if args.compare:
+        slower = compareResults(results, loadResults(args.compare),
+                                tolerance=args.tolerance)
+        for name, stat, oldValue, value in slower:
+            print("{} {} is slower: {:.1f} us (was {:.1f} us)".format(
+                name, stat, value * 1e6, oldValue * 1e6))
+        if slower:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,275 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# Part of the PsychoPy library
+# Copyright (C) 2002-2018 Jonathan Peirce (C) 2019-2022 Open Science Tools Ltd.
+# Distributed under the terms of the GNU General Public License (GPL).
+
+"""Classes for writing frames to movie files while an experiment is running.
+"""
+
+__all__ = ['MovieFrameWriter', 'getFFmpegExecutable']
+
+import os
+import queue
+import shutil
+import subprocess
+import threading
+
+import numpy
+
+from psychopy import logging
+
+try:
+    from PIL import Image
+except ImportError:
+    import Image
+
+# file extensions written as a sequence of numbered image files
+_imageExtensions = ('.png', '.tif', '.tiff', '.jpg', '.jpeg', '.bmp')
+
+
+def getFFmpegExecutable():
+    """Get the path to an `ffmpeg` executable.
+
+    Looks on the system path first and then for the executable installed with
+    `imageio-ffmpeg` (a dependency of `moviepy`).
+
+    Returns
+    -------
+    str or None
+        Path to `ffmpeg`, or `None` if it can't be found.
+    """
+    exe = shutil.which('ffmpeg')
+    if exe is not None:
+        return exe
+    try:
+        import imageio_ffmpeg
+        return imageio_ffmpeg.get_ffmpeg_exe()
+    except Exception:  # not installed or no binary for this platform
+        return None
+
+
+class MovieFrameWriter:
+    """Write frames to a movie file from a background thread.
+
+    Frames are put in a bounded queue and encoded by a worker thread, so only
+    a few frames are held in memory at a time however long the recording is.
+    If the encoder can't keep up the queue fills and `write()` blocks until
+    there is space, so no frames are lost.
+
+    Parameters
+    ----------
+    fileName : str
+        File to write. Image extensions (e.g. '.png') write a numbered image
+        file for each frame ('name00001.png' etc.), other extensions (e.g.
+        '.mp4', '.mov', '.gif') write a movie.
+    size : tuple of int
+        Width and height of the frames in pixels.
+    fps : float
+        Frame rate of the movie.
+    codec : str or None
+        Video codec used by the encoder, e.g. 'libx264' or 'mpeg4'. Ignored
+        for GIFs and image files. If `None` the encoder picks one.
+    encoder : str or None
+        How to encode the movie: 'ffmpeg' pipes the frames to an `ffmpeg`
+        process, 'imageio' uses an `imageio` writer and 'images' saves each
+        frame with PIL. If `None`, 'images' is used for image extensions and
+        otherwise 'ffmpeg' if an executable is found (see
+        `getFFmpegExecutable()`), else 'imageio'.
+    maxQueueSize : int
+        Number of frames which can be waiting to be encoded.
+    flipVert : bool
+        Flip frames upside down before encoding, for frames read from OpenGL
+        which start at the bottom row.
+
+    Examples
+    --------
+    Write frames from an array to a movie::
+
+        writer = MovieFrameWriter('stimuli.mp4', size=(800, 600), fps=60)
+        writer.open()
+        for frame in frames:  # uint8 arrays of shape (600, 800, 3)
+            writer.write(frame)
+        writer.close()
+
+    """
+    def __init__(self, fileName, size, fps=30, codec='libx264', encoder=None,
+                 maxQueueSize=32, flipVert=False):
+        self.fileName = str(fileName)
+        self.size = tuple(int(v) for v in size)
+        self.fps = fps
+        self.codec = codec
+        self.maxQueueSize = maxQueueSize
+        self.flipVert = flipVert
+
+        fileExt = os.path.splitext(self.fileName)[1].lower()
+        if encoder is None:
+            if fileExt in _imageExtensions:
+                encoder = 'images'
+            elif getFFmpegExecutable() is not None:
+                encoder = 'ffmpeg'
+            else:
+                encoder = 'imageio'
+        if encoder not in ('ffmpeg', 'imageio', 'images'):
+            raise ValueError(
+                "Unknown movie encoder '{}', should be 'ffmpeg', 'imageio' or "
+                "'images'.".format(encoder))
+        self.encoder = encoder
+
+        self._queue = None
+        self._thread = None
+        self._error = None
+        self._nFramesWritten = 0
+        self._warnedFull = False
+
+    @property
+    def isOpen(self):
+        """`True` if the writer is accepting frames (`bool`)."""
+        return self._thread is not None
+
+    @property
+    def framesWritten(self):
+        """Number of frames encoded so far (`int`)."""
+        return self._nFramesWritten
+
+    @property
+    def framesPending(self):
+        """Number of frames waiting to be encoded (`int`)."""
+        return 0 if self._queue is None else self._queue.qsize()
+
+    def open(self):
+        """Open the file and start the encoder thread."""
+        if self.isOpen:
+            raise RuntimeError("Movie writer for `{}` is already open."
+                               .format(self.fileName))
+        # open the encoder here, so errors are raised in the calling thread
+        encoder = self._openEncoder()
+        self._error = None
+        self._nFramesWritten = 0
+        self._queue = queue.Queue(maxsize=self.maxQueueSize)
+        self._thread = threading.Thread(
+            target=self._run, args=(encoder,), name='MovieFrameWriter',
+            daemon=True)
+        self._thread.start()
+
+    def write(self, frame):
+        """Queue a frame to be encoded.
+
+        Parameters
+        ----------
+        frame : ArrayLike or PIL.Image.Image
+            Frame to write, as an image or an array of 8-bit RGB or RGBA
+            values with shape (height, width, channels). Arrays must not be
+            changed after they are written, as they are encoded later.
+        """
+        if not self.isOpen:
+            raise RuntimeError("Movie writer for `{}` is not open."
+                               .format(self.fileName))
+        self._raiseError()
+        if self._queue.full() and not self._warnedFull:
+            logging.warning(
+                "Movie encoder can't keep up with frames being captured, "
+                "waiting for it to catch up.")
+            self._warnedFull = True
+        self._queue.put(frame)
+
+    def close(self):
+        """Finish encoding the queued frames and close the file."""
+        if not self.isOpen:
+            return
+        self._queue.put(None)  # tells the thread to finish
+        self._thread.join()
+        self._thread = None
+        self._queue = None
+        self._raiseError()
+        logging.info("Wrote {} frames to {}".format(
+            self._nFramesWritten, self.fileName))
+
+    def _raiseError(self):
+        if self._error is not None:
+            err, self._error = self._error, None
+            raise RuntimeError("Failed to write movie frames to `{}`"
+                               .format(self.fileName)) from err
+
+    def _toArray(self, frame):
+        """Get a frame as a (height, width, 3) uint8 array."""
+        frame = numpy.asarray(frame, dtype=numpy.uint8)
+        if frame.ndim == 2:
+            frame = numpy.repeat(frame[:, :, numpy.newaxis], 3, axis=2)
+        if self.flipVert:
+            frame = frame[::-1]
+        return numpy.ascontiguousarray(frame[:, :, :3])
+
+    def _run(self, encoder):
+        """Encode frames from the queue until `None` is received."""
+        write, close = encoder
+        try:
+            while True:
+                frame = self._queue.get()
+                if frame is None:
+                    break
+                if self._error is not None:
+                    continue  # keep emptying the queue so `write` can't block
+                try:
+                    write(self._toArray(frame))
+                    self._nFramesWritten += 1
+                except Exception as err:
+                    self._error = err
+        finally:
+            try:
+                close()
+            except Exception as err:
+                if self._error is None:
+                    self._error = err
+
+    def _openEncoder(self):
+        """Open the output and get functions to write a frame and close it."""
+        if self.encoder == 'images':
+            fileRoot, fileExt = os.path.splitext(self.fileName)
+
+            def write(frame):
+                fileName = "{}{:05d}{}".format(
+                    fileRoot, self._nFramesWritten + 1, fileExt)
+                Image.fromarray(frame).save(fileName)
+
+            return write, lambda: None
+
+        elif self.encoder == 'imageio':
+            import imageio
+            kwargs = {'fps': self.fps}
+            if self.codec and not self.fileName.lower().endswith('.gif'):
+                kwargs['codec'] = self.codec
+            writer = imageio.get_writer(self.fileName, **kwargs)
+            return writer.append_data, writer.close
+
+        # pipe raw frames to ffmpeg
+        exe = getFFmpegExecutable()
+        if exe is None:
+            raise RuntimeError("Couldn't find an `ffmpeg` executable to write "
+                               "movie `{}`.".format(self.fileName))
+        cmd = [exe, '-y', '-loglevel', 'error',
+               '-f', 'rawvideo', '-pix_fmt', 'rgb24',
+               '-s', '{}x{}'.format(*self.size), '-r', str(self.fps),
+               '-i', '-', '-an']
+        if not self.fileName.lower().endswith('.gif'):
+            if self.codec:
+                cmd += ['-vcodec', self.codec]
+            # most players need 4:2:0 chroma and even frame sizes
+            cmd += ['-pix_fmt', 'yuv420p',
+                    '-vf', 'pad=ceil(iw/2)*2:ceil(ih/2)*2']
+        cmd.append(self.fileName)
+        proc = subprocess.Popen(
+            cmd, stdin=subprocess.PIPE, stdout=subprocess.DEVNULL,
+            stderr=subprocess.PIPE)
+
+        def write(frame):
+            proc.stdin.write(frame.tobytes())
+
+        def close():
+            _, stderr = proc.communicate()
+            if proc.returncode != 0:
+                raise RuntimeError("ffmpeg exited with code {}: {}".format(
+                    proc.returncode, stderr.decode(errors='replace').strip()))
+
+        return write, close
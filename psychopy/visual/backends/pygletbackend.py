@@ -179,7 +179,8 @@ class PygletBackend(BaseBackend):
                     'integer greater than two. Disabling.')
                 win.multiSample = False
 
-        if platform.system() == 'Linux':
+        if platform.system() == 'Linux' and \
+                not pyglet.options.get('headless', False):
             display = pyglet.canvas.Display(x_screen=win.screen)
             allScrs = display.get_screens()
         else:
@@ -294,7 +295,8 @@ class PygletBackend(BaseBackend):
                 # pyglet 1.2 with 64bit python?
                 win._hw_handle = self.winHandle._nswindow.windowNumber()
         elif sys.platform.startswith('linux'):
-            win._hw_handle = self.winHandle._window
+            # headless (EGL) windows have no X window
+            win._hw_handle = getattr(self.winHandle, '_window', None)
             self._frameBufferSize = win.clientSize
 
         if win.useFBO:  # check for necessary extensions
@@ -42,6 +42,7 @@ from psychopy.tools.monitorunittools import (cm2pix, deg2pix, pix2cm,
                                              pix2deg, convertToPix)
 from psychopy.visual.helpers import (pointInPolygon, polygonsOverlap,
                                      setColor, findImageFile)
+from psychopy.visual.imagecache import imageCache
 from psychopy.tools.typetools import float_uint8
 from psychopy.tools.arraytools import makeRadialMatrix, createLumPattern
 from psychopy.event import Mouse
@@ -1046,8 +1047,11 @@ class TextureMixin:
                     logging.flush()
                     raise IOError(msg % (tex, os.path.abspath(tex)))
                 try:
-                    im = Image.open(filename)
-                    im = im.transpose(Image.FLIP_TOP_BOTTOM)
+                    if pixFormat == GL.GL_RGB and not forcePOW2:
+                        # won't be resized, so can be converted in advance
+                        im = imageCache.get(filename, mode='RGBA')
+                    else:
+                        im = imageCache.get(filename)
                 except IOError:
                     msg = "Found file '%s', failed to load as an image"
                     logging.error(msg % (filename))
@@ -1112,7 +1116,8 @@ class TextureMixin:
             elif pixFormat == GL.GL_RGB:
                 # we want RGB and might need to convert from CMYK or Lm
                 # texture = im.tostring("raw", "RGB", 0, -1)
-                im = im.convert("RGBA")
+                if im.mode != "RGBA":
+                    im = im.convert("RGBA")
                 wasLum = False
             else:
                 raise ValueError('cannot determine if image is luminance or RGB')
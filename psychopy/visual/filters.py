@@ -9,9 +9,45 @@
 # Copyright (C) 2002-2018 Jonathan Peirce (C) 2019-2022 Open Science Tools Ltd.
 # Distributed under the terms of the GNU General Public License (GPL).
 
+import functools
+from collections import OrderedDict
+
 import numpy
 from numpy.fft import fft2, ifft2, fftshift, ifftshift
 
+# number of gratings and masks cached by `makeGrating` and `makeMask`
+_cacheSize = 16
+
+
+def _cached(func):
+    """Cache the arrays made by a function for each set of arguments.
+
+    The cached arrays are read-only and copies are returned, so the caller can
+    change them. Sequences in the arguments are converted to tuples for the
+    key, and calls with other unhashable arguments aren't cached.
+    """
+    cache = OrderedDict()  # most recently used last
+
+    @functools.wraps(func)
+    def wrapper(*args):
+        try:
+            key = tuple(
+                tuple(arg) if isinstance(arg, (list, numpy.ndarray)) else arg
+                for arg in args)
+            arr = cache.pop(key, None)
+        except TypeError:  # unhashable arguments, or 0-d arrays
+            return func(*args)
+        if arr is None:
+            arr = func(*args)
+            arr.flags.writeable = False
+        cache[key] = arr  # now the most recently used
+        while len(cache) > _cacheSize:
+            cache.popitem(last=False)
+        return arr.copy()
+
+    wrapper.cache_clear = cache.clear
+    return wrapper
+
 
 def makeGrating(res,
                 ori=0.0,  # in degrees
@@ -39,7 +75,14 @@ def makeGrating(res,
     :Returns:
         a square numpy array of size resXres
 
+    Gratings are cached, so making the same grating again only copies it.
+
     """
+    return _makeGrating(res, ori, cycles, phase, gratType, contr)
+
+
+@_cached
+def _makeGrating(res, ori, cycles, phase, gratType, contr):
     # to prevent the sinusoid ever being exactly at zero (for sqr wave):
     tiny = 0.0000000000001
     ori *= -numpy.pi / 180.
@@ -119,7 +162,14 @@ def makeMask(matrixSize, shape='circle', radius=1.0, center=(0.0, 0.0),
                 The proportion of the raisedCosine that is being blurred.
             range: 2x1 tuple or list (default=[-1,1])
                 The minimum and maximum value in the mask matrix
+
+    Masks are cached, so making the same mask again only copies it.
     """
+    return _makeMask(matrixSize, shape, radius, center, range, fringeWidth)
+
+
+@_cached
+def _makeMask(matrixSize, shape, radius, center, range, fringeWidth):
     rad = makeRadialMatrix(matrixSize, center, radius)
     if shape == 'ramp':
         outArray = 1 - rad
@@ -26,6 +26,7 @@ import psychopy  # so we can get the __path__
 from psychopy import logging, colors, layout
 
 from psychopy.tools.attributetools import attributeSetter, setAttribute
+from psychopy.visual.imagecache import imageCache
 from psychopy.visual.basevisual import (
     BaseVisualStim, DraggingMixin, ContainerMixin, ColorMixin, TextureMixin
 )
@@ -411,6 +412,30 @@ class ImageStim(BaseVisualStim, DraggingMixin, ContainerMixin, ColorMixin,
         """
         setAttribute(self, 'image', value, log)
 
+    @staticmethod
+    def prefetch(images):
+        """Decode image files in the background, so that setting the `image`
+        of an ImageStim to them later doesn't have to wait for the files to
+        be loaded.
+
+        Decoded images are kept in a cache shared by all image stimuli (see
+        :mod:`psychopy.visual.imagecache`).
+
+        Parameters
+        ----------
+        images : str, Path, dict or list
+            Paths of image files. Values of a dict and items of a list which
+            are paths of image files are prefetched and others are ignored, so
+            the conditions of the next trial can be given, e.g.
+            ``ImageStim.prefetch(trials.getFutureTrial())``.
+
+        Returns
+        -------
+        list
+            A `concurrent.futures.Future` for each image being decoded.
+        """
+        return imageCache.prefetch(images, mode='RGBA')
+
     @property
     def aspectRatio(self):
         """
@@ -0,0 +1,305 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Cache of decoded image files, which can be filled in the background so that
+images are ready before the stimuli using them are updated.
+
+Decoding a photograph (and flipping and converting it for use as a texture)
+can take longer than a frame, so setting the image of a stimulus in the
+middle of a trial may drop frames. Images can instead be prefetched while
+there is time to spare, for example using the conditions of the next trial::
+
+    for trial in trials:
+        visual.ImageStim.prefetch(trials.getFutureTrial())
+        ...
+        stim.image = trial['image']  # decoded by the prefetch
+
+"""
+
+# Part of the PsychoPy library
+# Copyright (C) 2002-2018 Jonathan Peirce (C) 2019-2022 Open Science Tools Ltd.
+# Distributed under the terms of the GNU General Public License (GPL).
+
+__all__ = ['ImageCache', 'imageCache', 'prefetchImages', 'preloadImage']
+
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+
+try:
+    from PIL import Image
+except ImportError:
+    from . import Image
+
+from psychopy.visual.helpers import findImageFile
+
+
+def _decodeImage(filename, mode=None):
+    """Open an image file and flip it, ready for making a texture.
+
+    Parameters
+    ----------
+    filename : str
+        Path of the image file.
+    mode : str or None
+        PIL mode to convert the image to, or `None` to keep the mode of the
+        file. Luminance (mode 'L') images are never converted to 'RGBA', as
+        they are used as luminance textures.
+
+    Returns
+    -------
+    PIL.Image.Image
+        Decoded image, flipped top to bottom.
+    """
+    with Image.open(filename) as im:
+        # transposing also decodes the image
+        im = im.transpose(Image.FLIP_TOP_BOTTOM)
+    if mode is not None and im.mode != mode and \
+            not (mode == 'RGBA' and im.mode == 'L'):
+        im = im.convert(mode)
+    return im
+
+
+def _imageBytes(im):
+    """Approximate memory used by a decoded image."""
+    return im.size[0] * im.size[1] * len(im.getbands())
+
+
+class ImageCache:
+    """Least recently used cache of decoded images, keyed by file path and
+    mode, which can be filled by a pool of background threads.
+
+    Only prefetched images (and those got with ``retain=True``) are kept, so
+    loading an image which wasn't prefetched doesn't keep it alive after the
+    stimulus using it is gone.
+
+    Images returned by the cache are shared, so they must not be modified
+    in place.
+
+    Parameters
+    ----------
+    maxItems : int
+        Number of images to keep. The least recently used images are dropped
+        when more are added.
+    maxBytes : int
+        Memory the decoded images may use, counted as width * height * bands.
+        The least recently used images are dropped when it is exceeded.
+    maxWorkers : int
+        Number of threads used to decode prefetched images.
+    """
+    def __init__(self, maxItems=64, maxBytes=256 * 2 ** 20, maxWorkers=2):
+        self.maxItems = maxItems
+        self.maxBytes = maxBytes
+        self.maxWorkers = maxWorkers
+        self._items = OrderedDict()  # key -> Future of the decoded image
+        self._sizes = {}  # key -> bytes used by the decoded image
+        self._nBytes = 0
+        # reentrant, as callbacks of finished futures run when added
+        self._lock = threading.RLock()
+        self._executor = None
+
+    @property
+    def nBytes(self):
+        """Memory used by the decoded images in the cache (`int`)."""
+        return self._nBytes
+
+    def __len__(self):
+        return len(self._items)
+
+    def __contains__(self, filename):
+        return any(key[0] == os.path.abspath(filename) for key in self._items)
+
+    @staticmethod
+    def _key(filename, mode):
+        """Key for an image, which changes if the file is modified."""
+        filename = os.path.abspath(filename)
+        return filename, os.stat(filename).st_mtime_ns, mode
+
+    def _submit(self, key, filename, mode, background):
+        """Get the future of a cached image, decoding it if needed. Call with
+        the lock held."""
+        future = self._items.get(key)
+        if future is not None:
+            self._items.move_to_end(key)
+            return future, False
+        if background:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.maxWorkers,
+                    thread_name_prefix='ImageCache')
+            future = self._executor.submit(_decodeImage, filename, mode)
+        else:
+            # decoded by the caller, outside of the lock
+            future = Future()
+        self._items[key] = future
+        future.add_done_callback(lambda f: self._onDecoded(key, f))
+        self._evict()
+        return future, not background
+
+    def _onDecoded(self, key, future):
+        """Count the memory used by a decoded image."""
+        if future.cancelled() or future.exception() is not None:
+            return
+        with self._lock:
+            if self._items.get(key) is not future or key in self._sizes:
+                return
+            self._sizes[key] = _imageBytes(future.result())
+            self._nBytes += self._sizes[key]
+            self._evict()
+
+    def _remove(self, key):
+        """Remove an image from the cache. Call with the lock held."""
+        del self._items[key]
+        self._nBytes -= self._sizes.pop(key, 0)
+
+    def _evict(self):
+        """Drop the least recently used images until the cache is within its
+        limits. Call with the lock held."""
+        while self._items and (len(self._items) > self.maxItems or
+                               self._nBytes > self.maxBytes):
+            self._remove(next(iter(self._items)))
+
+    def get(self, filename, mode=None, retain=False):
+        """Get a decoded image, waiting for it if it is being prefetched or
+        decoding it now if it isn't in the cache.
+
+        Parameters
+        ----------
+        filename : str or Path
+            Path of the image file.
+        mode : str or None
+            PIL mode to convert the image to (see `prefetch`).
+        retain : bool
+            Keep the image in the cache if it had to be decoded now. By
+            default only prefetched images are kept.
+
+        Returns
+        -------
+        PIL.Image.Image
+            Decoded image, flipped top to bottom.
+        """
+        filename = str(filename)
+        key = self._key(filename, mode)
+        with self._lock:
+            future, decodeNow = None, False
+            if key in self._items or retain:
+                future, decodeNow = self._submit(key, filename, mode, False)
+        if future is None:
+            # not prefetched, so isn't kept
+            return _decodeImage(filename, mode)
+        if decodeNow:
+            try:
+                future.set_result(_decodeImage(filename, mode))
+            except BaseException as err:
+                future.set_exception(err)
+        try:
+            return future.result()
+        except BaseException:
+            # don't keep failures, so the error is raised again next time
+            with self._lock:
+                if self._items.get(key) is future:
+                    self._remove(key)
+            raise
+
+    def prefetch(self, images, mode=None):
+        """Decode images in the background, so they are ready for `get`.
+
+        Parameters
+        ----------
+        images : str, Path, dict or iterable
+            Image file paths to decode. Values of a dict (e.g. the conditions
+            of a trial) and items of lists are searched for paths of existing
+            image files, other values are ignored.
+        mode : str or None
+            PIL mode to convert the images to, or `None` to keep the mode of
+            each file. Luminance images are not converted to 'RGBA'.
+
+        Returns
+        -------
+        list
+            A `concurrent.futures.Future` for each image, giving the decoded
+            image when it is ready.
+        """
+        futures = []
+        for filename in _findImageFiles(images):
+            try:
+                key = self._key(filename, mode)
+            except OSError:
+                continue
+            with self._lock:
+                future, _ = self._submit(key, filename, mode, True)
+            futures.append(future)
+        return futures
+
+    def clear(self):
+        """Remove all images from the cache."""
+        with self._lock:
+            self._items.clear()
+            self._sizes.clear()
+            self._nBytes = 0
+
+    def shutdown(self, wait=True):
+        """Stop the background threads, after any pending images are
+        decoded if `wait` is `True`."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait)
+
+
+def _findImageFiles(images):
+    """Yield the paths of image files in a path, dict or (nested) iterable."""
+    if images is None:
+        return
+    if isinstance(images, (str, Path)):
+        filename = str(images)
+        ext = os.path.splitext(filename)[1].lower()
+        if ext in Image.registered_extensions() and os.path.isfile(filename):
+            yield filename
+    elif isinstance(images, dict):
+        for value in images.values():
+            yield from _findImageFiles(value)
+    elif isinstance(images, (list, tuple, set)):
+        for value in images:
+            yield from _findImageFiles(value)
+
+
+# cache used by image stimuli
+imageCache = ImageCache()
+
+
+def prefetchImages(images, mode=None):
+    """Decode images in the background using the cache shared by image
+    stimuli. See `ImageCache.prefetch`.
+    """
+    return imageCache.prefetch(images, mode=mode)
+
+
+def preloadImage(image, mode=None):
+    """Find and decode the image file a stimulus will be set to, keeping it
+    in the cache shared by image stimuli so setting the image uses it.
+
+    The file is looked for in the same way as when the image of a stimulus is
+    set. Used by Builder to load images during a Static period.
+
+    Parameters
+    ----------
+    image : str, Path or None
+        Image file of the stimulus. Values which aren't paths, or are blank,
+        are ignored.
+    mode : str or None
+        PIL mode to convert the image to (see `ImageCache.prefetch`).
+
+    Returns
+    -------
+    PIL.Image.Image or None
+        Decoded image, or `None` if there isn't an image file to load.
+    """
+    if not isinstance(image, (str, Path)) or str(image).strip() in ('', 'None'):
+        return None
+    filename = findImageFile(image, checkResources=True)
+    if not filename:
+        raise IOError("Couldn't find image %s" % image)
+    return imageCache.get(filename, mode=mode, retain=True)
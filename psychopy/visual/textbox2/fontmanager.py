@@ -17,6 +17,8 @@
 import re
 import sys, os
 import math
+import atexit
+import hashlib
 import numpy as np
 import ctypes
 import freetype as ft
@@ -319,6 +321,41 @@ class _TextureAtlas:
         gl.glBindTexture(gl.GL_TEXTURE_2D, 0)
 
 
+_fontFileHashes = {}
+
+
+def _fontFileHash(filename):
+    """Hash of the contents of a font file, used to name glyph caches. Hashes
+    are reused while the file's size and modification time are unchanged."""
+    stat = os.stat(filename)
+    key = (str(filename), stat.st_size, stat.st_mtime_ns)
+    if key not in _fontFileHashes:
+        sha = hashlib.sha1()
+        with open(filename, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                sha.update(chunk)
+        _fontFileHashes[key] = sha.hexdigest()
+    return _fontFileHashes[key]
+
+
+def _pruneGlyphCache(cacheDir, maxFiles):
+    """Delete the least recently used glyph caches in `cacheDir`, leaving
+    `maxFiles`."""
+    try:
+        paths = [path for path in Path(cacheDir).iterdir()
+                 if path.suffix == '.npz']
+        if len(paths) <= maxFiles:
+            return
+        paths.sort(key=lambda path: path.stat().st_mtime)
+    except OSError:
+        return
+    for path in paths[:len(paths) - maxFiles]:
+        try:
+            path.unlink()
+        except OSError:
+            pass
+
+
 class GLFont:
     """
     A GLFont gathers a set of glyphs for a given font filename and size.
@@ -345,6 +382,15 @@ class GLFont:
             Position of the tops of the next line's ascenders relative to this line's baseline
     """
 
+    # Store rasterised glyphs on disk so later sessions can reuse them
+    useDiskCache = True
+    # Folder for the glyph cache, if None `prefs.paths['fonts']/cache` is used
+    cacheDir = None
+    # Most fonts kept in the glyph cache, the least recently used are deleted
+    # when there are more
+    maxCacheFiles = 64
+    _cacheVersion = 1
+
     def __init__(self, filename, size, lineSpacing=1, textureSize=2048):
         """
         Initialize font
@@ -371,8 +417,15 @@ class GLFont:
         self.face = ft.Face(str(filename))  # ft.Face doesn't support Pathlib yet
         self.size = size
         self.glyphs = {}
+        # glyph metrics as arrays, indexed by the ids in _glyphIds
+        self._glyphIds = {}
+        self._glyphSizes = np.zeros((0, 2), dtype=np.float64)
+        self._glyphOffsets = np.zeros((0, 2), dtype=np.float64)
+        self._glyphAdvances = np.zeros((0, 2), dtype=np.float64)
+        self._glyphTexcoords = np.zeros((0, 4), dtype=np.float64)
         self.info = FontInfo(filename, self.face)
         self._dirty = False
+        self._cacheDirty = False  # glyphs added since the cache was saved
         # Get metrics
         metrics = self.face.size
         self.ascender = metrics.ascender / self.scale
@@ -461,6 +514,83 @@ class GLFont:
         self._dirty = False
         return self.atlas.textureID
 
+    @property
+    def glyphSizes(self):
+        """Size (w, h) of each glyph in pixels, as an array indexed by the
+        ids from `getGlyphIds()`.
+        """
+        return self._glyphSizes[:len(self._glyphIds)]
+
+    @property
+    def glyphOffsets(self):
+        """Offset (x, y) of each glyph relative to the pen position, as an
+        array indexed by the ids from `getGlyphIds()`.
+        """
+        return self._glyphOffsets[:len(self._glyphIds)]
+
+    @property
+    def glyphAdvances(self):
+        """Advance (x, y) of the pen after each glyph, as an array indexed by
+        the ids from `getGlyphIds()`.
+        """
+        return self._glyphAdvances[:len(self._glyphIds)]
+
+    @property
+    def glyphTexcoords(self):
+        """Texture coordinates (u0, v0, u1, v1) of each glyph, as an array
+        indexed by the ids from `getGlyphIds()`.
+        """
+        return self._glyphTexcoords[:len(self._glyphIds)]
+
+    def getGlyphIds(self, text):
+        """Get the ids of the glyphs for each character in a string, fetching
+        any glyphs which haven't been built yet.
+
+        The ids index the `glyphSizes`, `glyphOffsets`, `glyphAdvances` and
+        `glyphTexcoords` arrays, so the metrics of a whole run of text can be
+        looked up at once. Ids don't change once a glyph is built.
+
+        Parameters
+        ----------
+        text : str
+            Characters to get glyph ids for.
+
+        Returns
+        -------
+        ndarray
+            Glyph id of each character.
+        """
+        ids = self._glyphIds
+        missing = set(text).difference(ids)
+        if missing:
+            # fetch one at a time like `__getitem__`, so that glyphs which
+            # look alike aren't mistaken for blanks
+            face = ft.Face(str(self.filename))  # doesn't support Pathlib yet
+            for charcode in sorted(missing):
+                self.fetch(charcode, face=face)
+        return np.array([ids[c] for c in text], dtype=np.intp)
+
+    def _addGlyph(self, glyph):
+        """Store a glyph and its metrics, giving it an id if it is new."""
+        self.glyphs[glyph.charcode] = glyph
+        glyphId = self._glyphIds.get(glyph.charcode)
+        if glyphId is None:
+            glyphId = len(self._glyphIds)
+            if glyphId >= len(self._glyphSizes):
+                # grow the arrays in steps to keep adding glyphs cheap
+                n = max(128, 2 * len(self._glyphSizes))
+                for attr in ('_glyphSizes', '_glyphOffsets', '_glyphAdvances',
+                             '_glyphTexcoords'):
+                    old = getattr(self, attr)
+                    new = np.zeros((n, old.shape[1]), dtype=old.dtype)
+                    new[:len(old)] = old
+                    setattr(self, attr, new)
+            self._glyphIds[glyph.charcode] = glyphId
+        self._glyphSizes[glyphId] = glyph.size
+        self._glyphOffsets[glyphId] = glyph.offset
+        self._glyphAdvances[glyphId] = glyph.advance
+        self._glyphTexcoords[glyphId] = glyph.texcoords
+
     def preload(self, nMax=None):
         """
         :return:
@@ -553,7 +683,8 @@ class GLFont:
             v1 = (y + h - 0.0) / float(self.atlas.height)
             texcoords = (u0, v0, u1, v1)
             glyph = TextureGlyph(charcode, size, offset, advance, texcoords)
-            self.glyphs[charcode] = glyph
+            self._addGlyph(glyph)
+            self._cacheDirty = True
 
             # Generate kerning
             # for g in self.glyphs.values():
@@ -570,19 +701,100 @@ class GLFont:
         logging.debug("TextBox2 loaded {} chars with {} blanks and {} valid"
                      .format(len(charcodes), nBlanks, len(charcodes) - nBlanks))
 
-    def saveToCache(self):
-        """Store the current font texture as an image file.
+    @property
+    def cacheFilename(self):
+        """Path of the file used to cache the glyphs of this font (`Path`).
 
-        As yet we aren't storing the offset, advance and texcoords as needed to
-        retrieve the necessary chars, but it's a start!
-            (see  TextureGlyph(charcode, size, offset, advance, texcoords) )
+        The name is made from a hash of the font file, so changing the font
+        file invalidates the cache, as well as the size and texture format.
+        """
+        cacheDir = self.cacheDir
+        if cacheDir is None:
+            cacheDir = Path(prefs.paths['fonts']) / 'cache'
+        return Path(cacheDir) / "{}_{}_{}_{}.npz".format(
+            _fontFileHash(self.filename), self.size, self.format,
+            self.atlas.width)
 
+    def saveToCache(self):
+        """Store the font texture and the metrics of all its glyphs on disk,
+        so they can be loaded by `loadFromCache()` instead of rendering the
+        glyphs again in later sessions.
         """
-        from PIL import Image
-        im = Image.fromarray(self.atlas.data)
-        fname = "{}/.psychopy3/{}_{}_texture.png".format(
-            os.path.expanduser("~"), self.name, self.size)
-        im.save(fname)
+        glyphs = list(self.glyphs.values())
+        fname = self.cacheFilename
+        try:
+            fname.parent.mkdir(parents=True, exist_ok=True)
+            tmpName = fname.with_name(fname.name + '.tmp')
+            with open(tmpName, 'wb') as f:
+                np.savez_compressed(
+                    f,
+                    version=self._cacheVersion,
+                    atlas=self.atlas.data,
+                    nodes=np.array(self.atlas.nodes, dtype=np.int64),
+                    used=self.atlas.used,
+                    charcodes=np.array([g.charcode for g in glyphs], dtype=str),
+                    sizes=np.array([g.size for g in glyphs],
+                                   dtype=np.int64).reshape(-1, 2),
+                    offsets=np.array([g.offset for g in glyphs],
+                                     dtype=np.int64).reshape(-1, 2),
+                    advances=np.array([g.advance for g in glyphs],
+                                      dtype=np.float64).reshape(-1, 2),
+                    texcoords=np.array([g.texcoords for g in glyphs],
+                                       dtype=np.float64).reshape(-1, 4))
+            os.replace(tmpName, fname)
+        except OSError as err:
+            logging.warning("Could not save glyph cache for font {}: {}"
+                            .format(self.name, err))
+            return
+        self._cacheDirty = False
+        _pruneGlyphCache(fname.parent, self.maxCacheFiles)
+        logging.debug("Saved {} glyphs for Texture Font {} to {}"
+                      .format(len(glyphs), self.name, fname))
+
+    def loadFromCache(self):
+        """Load the font texture and glyphs stored by `saveToCache()`.
+
+        Returns
+        -------
+        bool
+            `True` if cached glyphs were found and loaded.
+        """
+        fname = self.cacheFilename
+        if not fname.is_file():
+            return False
+        try:
+            with np.load(fname, allow_pickle=False) as cache:
+                if int(cache['version']) != self._cacheVersion or \
+                        cache['atlas'].shape != self.atlas.data.shape:
+                    return False
+                self.atlas.data[...] = cache['atlas']
+                self.atlas.nodes = [tuple(int(v) for v in node)
+                                    for node in cache['nodes']]
+                self.atlas.used = int(cache['used'])
+                glyphs = {}
+                for charcode, size, offset, advance, texcoords in zip(
+                        cache['charcodes'], cache['sizes'].tolist(),
+                        cache['offsets'].tolist(), cache['advances'].tolist(),
+                        cache['texcoords'].tolist()):
+                    charcode = str(charcode)
+                    glyphs[charcode] = TextureGlyph(
+                        charcode, tuple(size), tuple(offset), tuple(advance),
+                        tuple(texcoords))
+        except (OSError, KeyError, ValueError) as err:
+            logging.warning("Could not load glyph cache for font {}: {}"
+                            .format(self.name, err))
+            return False
+        try:
+            os.utime(fname)  # mark as recently used
+        except OSError:
+            pass
+        for glyph in glyphs.values():
+            self._addGlyph(glyph)
+        self._dirty = True
+        self._cacheDirty = False
+        logging.debug("Loaded {} glyphs for Texture Font {} from {}"
+                      .format(len(glyphs), self.name, fname))
+        return True
 
     def upload(self):
         """Upload the font data into graphics card memory.
@@ -951,6 +1163,8 @@ class FontManager():
         glFont = self._glFonts.get(identifier)
         if glFont is None:
             glFont = GLFont(fontInfo.path, size, lineSpacing=lineSpacing)
+            if GLFont.useDiskCache:
+                glFont.loadFromCache()
             self._glFonts[identifier] = glFont
 
         return glFont
@@ -999,6 +1213,17 @@ class FontManager():
         fonts_for_style.append(fi)
         return fi
 
+    @classmethod
+    def saveFontCaches(cls):
+        """Save the glyph cache of each loaded font that has glyphs which
+        are not in its cache yet. Called automatically when Python exits.
+        """
+        if not GLFont.useDiskCache or not cls._glFonts:
+            return
+        for glFont in cls._glFonts.values():
+            if glFont._cacheDirty:
+                glFont.saveToCache()
+
     def __del__(self):
         self.font_store = None
         if self._glFonts:
@@ -1009,6 +1234,9 @@ class FontManager():
             self._fontInfos = None
 
 
+atexit.register(FontManager.saveFontCaches)
+
+
 class FontInfo():
 
     def __init__(self, fp, face):
@@ -350,7 +350,9 @@ class TextBox2(BaseVisualStim, DraggingMixin, ContainerMixin, ColorMixin):
     @foreColor.setter
     def foreColor(self, value):
         ColorMixin.foreColor.fset(self, value)
-        self._layout()
+        # only the colours depend on the foreground colour, so no need to
+        # layout the text again
+        self._updateColors()
         if hasattr(self, "foreColor") and hasattr(self, 'caret'):
             self.caret.color = self._foreColor
 
@@ -817,32 +819,23 @@ class TextBox2(BaseVisualStim, DraggingMixin, ContainerMixin, ColorMixin):
         
     def _layout(self):
         """Layout the text, calculating the vertex locations
+
+        With the default line breaking the text is laid out one paragraph
+        (run of text ending in a newline) at a time and the layout of each
+        paragraph is cached, so after an edit only the paragraphs which have
+        changed are laid out again. Colours are set by `_updateColors()`.
         """
-        
-        rgb = self._foreColor.render('rgba1')
         font = self.glFont
 
         # the vertices are initially pix (natural for freetype)
         # then we convert them to the requested units for self._vertices
         # then they are converted back during rendering using standard BaseStim
         visible_text = self._text
-        vertices = np.zeros((len(visible_text) * 4, 2), dtype=np.float32)
         self._charIndices = np.zeros((len(visible_text)), dtype=int)
-        self._colors = np.zeros((len(visible_text) * 4, 4), dtype=np.double)
-        self._texcoords = np.zeros((len(visible_text) * 4, 2), dtype=np.double)
         self._glIndices = np.zeros((len(visible_text) * 4), dtype=int)
         self._renderChars = []
 
-        # the following are used internally for layout
-        self._lineNs = np.zeros(len(visible_text), dtype=int)
-        _lineBottoms = []
-        self._lineLenChars = []  #
-        _lineWidths = []  # width in stim units of each line
-
         lineMax = self.contentBox._size.pix[0]
-        current = [0, 0 - font.ascender]
-        fakeItalic = 0.0
-        fakeBold = 0.0
         # for some reason glyphs too wide when using alpha channel only
         if font.atlas.format == 'alpha':
             alphaCorrection = 1 / 3.0
@@ -851,138 +844,70 @@ class TextBox2(BaseVisualStim, DraggingMixin, ContainerMixin, ColorMixin):
 
         if self._lineBreaking == 'default':
 
-            wordLen = 0
-            charsThisLine = 0
-            wordsThisLine = 0
-            lineN = 0
-
-            for i, charcode in enumerate(self._text):
-                printable = True  # unless we decide otherwise
-                # handle formatting codes
-                fakeItalic = 0.0
-                fakeBold = 0.0
-                if self._styles.i[i]:
-                    fakeItalic = 0.1 * font.size
-                if self._styles.b[i]:
-                    fakeBold = 0.3 * font.size
-
-                # handle newline
-                if charcode == '\n':
-                    printable = False
-
-                # handle printable characters
-                if printable:
-                    glyph = font[charcode]
-                    if showWhiteSpace and charcode == " ":
-                        glyph = font[u"·"]
-                    elif charcode == " ":
-                        # glyph size of space is smaller than actual size, so use size of dot instead
-                        glyph.size = font[u"·"].size
-                    # Get top and bottom coords
-                    yTop = current[1] + glyph.offset[1]
-                    yBot = yTop - glyph.size[1]
-                    # Get x mid point
-                    xMid = current[0] + glyph.offset[0] + glyph.size[0] * alphaCorrection / 2 + fakeBold / 2
-                    # Get left and right corners from midpoint
-                    xBotL = xMid - glyph.size[0] * alphaCorrection / 2 - fakeItalic - fakeBold / 2
-                    xBotR = xMid + glyph.size[0] * alphaCorrection / 2 - fakeItalic + fakeBold / 2
-                    xTopL = xMid - glyph.size[0] * alphaCorrection / 2 - fakeBold / 2
-                    xTopR = xMid + glyph.size[0] * alphaCorrection / 2 + fakeBold / 2
-
-                    u0 = glyph.texcoords[0]
-                    v0 = glyph.texcoords[1]
-                    u1 = glyph.texcoords[2]
-                    v1 = glyph.texcoords[3]
-                else:
-                    glyph = font[u"·"]
-                    x = current[0] + glyph.offset[0]
-                    yTop = current[1] + glyph.offset[1]
-                    yBot = yTop - glyph.size[1]
-                    xBotL = x
-                    xTopL = x
-                    xBotR = x
-                    xTopR = x
-                    u0 = glyph.texcoords[0]
-                    v0 = glyph.texcoords[1]
-                    u1 = glyph.texcoords[2]
-                    v1 = glyph.texcoords[3]
-
-                theseVertices = [[xTopL, yTop], [xBotL, yBot],
-                                 [xBotR, yBot], [xTopR, yTop]]
-                texcoords = [[u0, v0], [u0, v1],
-                             [u1, v1], [u1, v0]]
-
-                vertices[i * 4:i * 4 + 4] = theseVertices
-                self._texcoords[i * 4:i * 4 + 4] = texcoords
-                # handle character color
-                rgb_ = self._styles.c[i]
-                if len(rgb_) > 0:
-                    self._colors[i*4 : i*4+4, :4] = rgb_ # set custom color
+            # discard cached paragraphs if anything they depend on has changed
+            cacheKey = (font, font.height, lineMax, self.letterSpacing,
+                        alphaCorrection, showWhiteSpace)
+            if getattr(self, '_paragraphCacheKey', None) != cacheKey:
+                self._paragraphCacheKey = cacheKey
+                self._paragraphCache = {}
+            paragraphCache = {}
+
+            paragraphs = visible_text.split('\n')
+            paragraphs = [p + '\n' for p in paragraphs[:-1]] + paragraphs[-1:]
+
+            vertices = []
+            texcoords = []
+            lineNs = []
+            paragraphY = []
+            self._lineLenChars = []  #
+            _lineWidths = []  # width in stim units of each line
+            _lineBottoms = []
+            y = 0 - font.ascender
+            firstChar = 0
+            firstLine = 0
+            for paragraph in paragraphs:
+                key = (paragraph,
+                       tuple(self._styles.i[firstChar:firstChar + len(paragraph)]),
+                       tuple(self._styles.b[firstChar:firstChar + len(paragraph)]))
+                para = self._paragraphCache.get(key)
+                if para is None:
+                    para = self._layoutParagraph(
+                        paragraph, key[1], key[2], font, lineMax,
+                        alphaCorrection)
+                paragraphCache[key] = para
+
+                vertices.append(para.vertices)
+                texcoords.append(para.texcoords)
+                lineNs.append(para.lineNs + firstLine)
+                paragraphY.append(y)
+                self._lineLenChars.extend(para.lineLenChars)
+                _lineWidths.extend(para.lineWidths)
+                # the bottom of each line is stored once its first character
+                # is laid out, leading newlines store them one line late
+                if len(_lineBottoms) < firstLine + 1:
+                    bottoms = para.lineBottoms
                 else:
-                    self._colors[i*4 : i*4+4, :4] = rgb # set default color
-                self._lineNs[i] = lineN
-                current[0] = current[0] + (glyph.advance[0] + fakeBold / 2) * self.letterSpacing
-                current[1] = current[1] + glyph.advance[1]
-
-                # are we wrapping the line?
-                if charcode == "\n":
-                    lineWPix = current[0]
-                    current[0] = 0
-                    current[1] -= font.height
-                    lineN += 1
-                    charsThisLine += 1
-                    self._lineLenChars.append(charsThisLine)
-                    _lineWidths.append(lineWPix)
-                    charsThisLine = 0
-                    wordsThisLine = 0
-                elif charcode in wordBreaks:
-                    wordLen = 0
-                    charsThisLine += 1
-                    wordsThisLine += 1
-                elif printable:
-                    wordLen += 1
-                    charsThisLine += 1
-
-                # end line with auto-wrap on space
-                if current[0] >= lineMax and wordLen > 0:
-                    # move the current word to next line
-                    lineBreakPt = vertices[(i - wordLen + 1) * 4, 0]
-                    if wordsThisLine <= 1:
-                        # if whole line is just 1 word, wrap regardless of presence of wordbreak
-                        wordLen = 0
-                        charsThisLine += 1
-                        wordsThisLine += 1
-                        # add hyphen
-                        self._renderChars.append({
-                            "i": i,
-                            "current": (current[0], current[1]),
-                            "glyph": font["-"]
-                        })
-                        # store linebreak point
-                        lineBreakPt = current[0]
-                    wordWidth = current[0] - lineBreakPt
-                    # shift all chars of the word left by wordStartX
-                    vertices[(i - wordLen + 1) * 4: (i + 1) * 4, 0] -= lineBreakPt
-                    vertices[(i - wordLen + 1) * 4: (i + 1) * 4, 1] -= font.height
-                    # update line values
-                    self._lineNs[i - wordLen + 1: i + 1] += 1
-                    self._lineLenChars.append(charsThisLine - wordLen)
-                    _lineWidths.append(lineBreakPt)
-                    lineN += 1
-                    # and set current to correct location
-                    current[0] = wordWidth
-                    current[1] -= font.height
-                    charsThisLine = wordLen
-                    wordsThisLine = 1
-
-                # have we stored the top/bottom of this line yet
-                if lineN + 1 > len(_lineBottoms):
-                    _lineBottoms.append(current[1])
-
-            # add length of this (unfinished) line
-            _lineWidths.append(current[0])
-            self._lineLenChars.append(charsThisLine)
-
+                    bottoms = para.newLineBottoms
+                _lineBottoms.extend(b + y for b in bottoms)
+                for rend in para.renderChars:
+                    self._renderChars.append({
+                        "i": rend['i'] + firstChar,
+                        "current": (rend['current'][0], rend['current'][1] + y),
+                        "glyph": rend['glyph']
+                    })
+
+                y += para.height
+                firstChar += len(paragraph)
+                firstLine += para.nLines
+            current = [0, y]
+
+            vertices = np.concatenate(vertices)
+            vertices[:, 1] += np.repeat(
+                paragraphY, [len(p) * 4 for p in paragraphs])
+            self._texcoords = np.concatenate(texcoords)
+            self._lineNs = np.concatenate(lineNs)
+            # only keep the paragraphs in use, so the cache doesn't grow
+            self._paragraphCache = paragraphCache
         elif self._lineBreaking == 'uax14':
 
             # get a list of line-breakable points according to UAX#14
@@ -990,6 +915,14 @@ class TextBox2(BaseVisualStim, DraggingMixin, ContainerMixin, ColorMixin):
             text_seg = list(break_units(self._text, breakable_points))
             styles_seg = list(break_units(self._styles, breakable_points))
 
+            vertices = np.zeros((len(visible_text) * 4, 2), dtype=np.float32)
+            self._texcoords = np.zeros((len(visible_text) * 4, 2), dtype=np.double)
+            self._lineNs = np.zeros(len(visible_text), dtype=int)
+            _lineBottoms = []
+            self._lineLenChars = []  #
+            _lineWidths = []  # width in stim units of each line
+            current = [0, 0 - font.ascender]
+
             lineN = 0
             charwidth_list = []
             segwidth_list = []
@@ -1098,12 +1031,6 @@ class TextBox2(BaseVisualStim, DraggingMixin, ContainerMixin, ColorMixin):
 
                         vertices[i * 4:i * 4 + 4] = theseVertices
                         self._texcoords[i * 4:i * 4 + 4] = texcoords
-                        # handle character color
-                        rgb_ = self._styles.c[i]
-                        if len(rgb_) > 0:
-                            self._colors[i*4 : i*4+4, :4] = rgb_ # set custom color
-                        else:
-                            self._colors[i*4 : i*4+4, :4] = rgb # set default color
                         self._lineNs[i] = lineN
 
                         current[0] = current[0] + charwidth_list[i]
@@ -1132,15 +1059,8 @@ class TextBox2(BaseVisualStim, DraggingMixin, ContainerMixin, ColorMixin):
                 "specified.".format(self._lineBreaking))
 
         # Add render-only characters
-        for rend in self._renderChars:
-            vertices = self._addRenderOnlyChar(
-                i=rend['i'],
-                x=rend['current'][0],
-                y=rend['current'][1],
-                vertices=vertices,
-                glyph=rend['glyph'],
-                alphaCorrection=alphaCorrection
-            )
+        vertices = self._addRenderOnlyChars(vertices, alphaCorrection)
+        self._updateColors()
 
         # Apply vertical alignment
         if self.alignment[1] in ("bottom", "center"):
@@ -1190,6 +1110,181 @@ class TextBox2(BaseVisualStim, DraggingMixin, ContainerMixin, ColorMixin):
             self.glFont._dirty = False
         self._needVertexUpdate = True
 
+    def _layoutParagraph(self, text, italic, bold, font, lineMax,
+                         alphaCorrection):
+        """Layout one paragraph of text with the default line breaking,
+        starting from the origin.
+
+        Glyph metrics are looked up for the whole paragraph at once and the
+        glyph quads are computed with array operations, only the line
+        breaking is done character by character.
+
+        Parameters
+        ----------
+        text : str
+            Characters of the paragraph, ending in a newline unless it is the
+            last paragraph of the text.
+        italic, bold : tuple of bool
+            Style of each character.
+        font : GLFont
+            Font to layout the text with.
+        lineMax : float
+            Width (pix) at which lines are wrapped.
+        alphaCorrection : float
+            Correction to the width of glyphs for the texture format.
+
+        Returns
+        -------
+        _ParagraphLayout
+            Vertices, texture coordinates and line metrics of the paragraph,
+            relative to the start of its first line.
+        """
+        nChars = len(text)
+        # newlines aren't printable, they're laid out as a zero width dot
+        glyphText = text.replace("\n", u"·")
+        if showWhiteSpace:
+            glyphText = glyphText.replace(" ", u"·")
+        glyphIds = font.getGlyphIds(glyphText)
+        sizes = font.glyphSizes[glyphIds]
+        offsets = font.glyphOffsets[glyphIds]
+        advances = font.glyphAdvances[glyphIds]
+        texcoords = font.glyphTexcoords[glyphIds]
+        if " " in glyphText:
+            # glyph size of space is smaller than actual size, so use size of dot instead
+            spaceId, dotId = font.getGlyphIds(u" ·")
+            sizes[glyphIds == spaceId] = font.glyphSizes[dotId]
+        # handle formatting codes
+        fakeItalic = 0.1 * font.size * np.asarray(italic, dtype=float)
+        fakeBold = 0.3 * font.size * np.asarray(bold, dtype=float)
+
+        # break lines, working out the pen position of each character
+        advanceX = ((advances[:, 0] + fakeBold / 2) * self.letterSpacing).tolist()
+        advanceY = advances[:, 1].tolist()
+        offsetX = offsets[:, 0].tolist()
+        penX = [0.0] * nChars
+        lineNs = [0] * nChars
+        lineBottoms = []
+        newLineBottoms = []
+        lineLenChars = []
+        lineWidths = []
+        renderChars = []
+
+        current = [0, 0]
+        wordLen = 0
+        charsThisLine = 0
+        wordsThisLine = 0
+        lineN = 0
+
+        for i, charcode in enumerate(text):
+            penX[i] = current[0]
+            lineNs[i] = lineN
+            current[0] = current[0] + advanceX[i]
+            current[1] = current[1] + advanceY[i]
+
+            # are we wrapping the line?
+            if charcode == "\n":
+                lineWPix = current[0]
+                current[0] = 0
+                current[1] -= font.height
+                lineN += 1
+                charsThisLine += 1
+                lineLenChars.append(charsThisLine)
+                lineWidths.append(lineWPix)
+                charsThisLine = 0
+                wordsThisLine = 0
+            elif charcode in wordBreaks:
+                wordLen = 0
+                charsThisLine += 1
+                wordsThisLine += 1
+            else:
+                wordLen += 1
+                charsThisLine += 1
+
+            # end line with auto-wrap on space
+            if current[0] >= lineMax and wordLen > 0:
+                # move the current word to next line
+                lineBreakPt = penX[i - wordLen + 1] + offsetX[i - wordLen + 1]
+                if wordsThisLine <= 1:
+                    # if whole line is just 1 word, wrap regardless of presence of wordbreak
+                    wordLen = 0
+                    charsThisLine += 1
+                    wordsThisLine += 1
+                    # add hyphen
+                    renderChars.append({
+                        "i": i,
+                        "current": (current[0], current[1]),
+                        "glyph": font["-"]
+                    })
+                    # store linebreak point
+                    lineBreakPt = current[0]
+                wordWidth = current[0] - lineBreakPt
+                # shift all chars of the word left by wordStartX
+                for j in range(i - wordLen + 1, i + 1):
+                    penX[j] -= lineBreakPt
+                    lineNs[j] += 1
+                # update line values
+                lineLenChars.append(charsThisLine - wordLen)
+                lineWidths.append(lineBreakPt)
+                lineN += 1
+                # and set current to correct location
+                current[0] = wordWidth
+                current[1] -= font.height
+                charsThisLine = wordLen
+                wordsThisLine = 1
+
+            # have we stored the top/bottom of this line yet
+            if lineN + 1 > len(lineBottoms):
+                lineBottoms.append(current[1])
+            if lineN > len(newLineBottoms):
+                newLineBottoms.append(current[1])
+
+        if not text.endswith('\n'):
+            # add length of this (unfinished) line
+            lineWidths.append(current[0])
+            lineLenChars.append(charsThisLine)
+
+        # place the glyph quads at the pen positions
+        lineNs = np.array(lineNs, dtype=int)
+        penY = np.cumsum(advances[:, 1]) - advances[:, 1] - lineNs * font.height
+        width = sizes[:, 0] * alphaCorrection + fakeBold
+        xTopL = np.array(penX) + offsets[:, 0]
+        xTopR = xTopL + width
+        xBotL = xTopL - fakeItalic
+        xBotR = xTopR - fakeItalic
+        if text.endswith('\n'):
+            xTopR[-1] = xBotL[-1] = xBotR[-1] = xTopL[-1]
+        yTop = penY + offsets[:, 1]
+        yBot = yTop - sizes[:, 1]
+        vertices = np.empty((nChars, 4, 2), dtype=np.float32)
+        vertices[:, :, 0] = np.stack([xTopL, xBotL, xBotR, xTopR], axis=1)
+        vertices[:, :, 1] = np.stack([yTop, yBot, yBot, yTop], axis=1)
+        u0, v0, u1, v1 = texcoords.T
+        texcoords = np.stack([u0, v0, u0, v1, u1, v1, u1, v0], axis=1)
+
+        return _ParagraphLayout(
+            vertices.reshape(-1, 2), texcoords.reshape(-1, 2), lineNs,
+            lineLenChars, lineWidths, lineBottoms, newLineBottoms,
+            renderChars, nLines=lineN, height=current[1])
+
+    def _updateColors(self):
+        """Set the colour of each vertex from the character styles and the
+        foreground colour, without laying out the text again.
+        """
+        rgb = self._foreColor.render('rgba1')
+        colors = np.empty((len(self._text), 4), dtype=np.double)
+        colors[:] = rgb  # set default color
+        # set custom colors
+        custom = [i for i, c in enumerate(self._styles.c[:len(colors)]) if len(c)]
+        if custom:
+            colors[custom] = [self._styles.c[i] for i in custom]
+        colors = np.repeat(colors, 4, axis=0)
+        # make render-only characters same colour as other text
+        if self._renderChars:
+            index = np.array([rend['i'] for rend in self._renderChars])
+            before = np.repeat((index - np.arange(len(index))) * 4, 4)
+            colors = np.insert(colors, before, rgb, axis=0)
+        self._colors = colors
+
     def draw(self):
         """Draw the text to the back buffer"""
         # Border width
@@ -1352,49 +1447,43 @@ class TextBox2(BaseVisualStim, DraggingMixin, ContainerMixin, ColorMixin):
         else:
             return self.box.overlaps(polygon)
 
-    def _addRenderOnlyChar(self, i, x, y, vertices, glyph, alphaCorrection=1):
+    def _addRenderOnlyChars(self, vertices, alphaCorrection=1):
         """
-        Add a character at index i which is drawn but not actually part of the text
+        Add the characters in self._renderChars, which are drawn but not actually part of the text.
+        Each is inserted at its index i in the arrays, after those before it have been inserted.
         """
-        i4 = i * 4
+        if not self._renderChars:
+            return vertices
+        index = [rend['i'] for rend in self._renderChars]
+        # index of the char each is inserted in front of, before any are inserted
+        before = np.repeat((np.array(index) - np.arange(len(index))) * 4, 4)
+        glyphs = [rend['glyph'] for rend in self._renderChars]
         # Get coordinates of glyph texture
-        self._texcoords = np.vstack([
-            self._texcoords[:i4],
-            [glyph.texcoords[0], glyph.texcoords[1]],
-            [glyph.texcoords[0], glyph.texcoords[3]],
-            [glyph.texcoords[2], glyph.texcoords[3]],
-            [glyph.texcoords[2], glyph.texcoords[1]],
-            self._texcoords[i4:]
-        ])
+        u0, v0, u1, v1 = np.array([glyph.texcoords for glyph in glyphs], dtype=float).T
+        self._texcoords = np.insert(
+            self._texcoords, before,
+            np.stack([u0, v0, u0, v1, u1, v1, u1, v0], axis=1).reshape(-1, 2),
+            axis=0)
         # Get coords of box corners
-        top = y + glyph.offset[1]
-        bot = top - glyph.size[1]
-        mid = x + glyph.offset[0] + glyph.size[0] * alphaCorrection / 2
-        left = mid - glyph.size[0] * alphaCorrection / 2
-        right = mid + glyph.size[0] * alphaCorrection / 2
-        vertices = np.vstack([
-            vertices[:i4],
-            [left, top],
-            [left, bot],
-            [right, bot],
-            [right, top],
-            vertices[i4:]
-        ])
-        # Make same colour as other text
-        self._colors = np.vstack([
-            self._colors[:i4],
-            self._foreColor.render('rgba1'),
-            self._foreColor.render('rgba1'),
-            self._foreColor.render('rgba1'),
-            self._foreColor.render('rgba1'),
-            self._colors[i4:]
-        ])
-        # Extend line numbers array
-        self._lineNs = np.hstack([
-            self._lineNs[:i],
-            self._lineNs[i-1],
-            self._lineNs[i:]
-        ])
+        x, y = np.array([rend['current'] for rend in self._renderChars], dtype=float).T
+        offsets = np.array([glyph.offset for glyph in glyphs], dtype=float)
+        sizes = np.array([glyph.size for glyph in glyphs], dtype=float)
+        top = y + offsets[:, 1]
+        bot = top - sizes[:, 1]
+        left = x + offsets[:, 0]
+        right = left + sizes[:, 0] * alphaCorrection
+        vertices = np.insert(
+            vertices, before,
+            np.stack([left, top, left, bot, right, bot, right, top], axis=1).reshape(-1, 2),
+            axis=0)
+        # Extend line numbers array, using the line of the previous char
+        lineNs = []
+        for k, i in enumerate(index):
+            if k and index[k - 1] == i - 1:
+                lineNs.append(lineNs[-1])
+            else:
+                lineNs.append(self._lineNs[i - 1 - k])
+        self._lineNs = np.insert(self._lineNs, before[::4] // 4, lineNs)
 
         return vertices
 
@@ -1780,6 +1869,27 @@ class Style:
         self.len += len(style)
 
 
+class _ParagraphLayout:
+    # Layout of one paragraph of a TextBox2, relative to the start of its
+    # first line, which is cached to avoid laying out unchanged text again
+    __slots__ = ('vertices', 'texcoords', 'lineNs', 'lineLenChars',
+                 'lineWidths', 'lineBottoms', 'newLineBottoms', 'renderChars',
+                 'nLines', 'height')
+
+    def __init__(self, vertices, texcoords, lineNs, lineLenChars, lineWidths,
+                 lineBottoms, newLineBottoms, renderChars, nLines, height):
+        self.vertices = vertices
+        self.texcoords = texcoords
+        self.lineNs = lineNs
+        self.lineLenChars = lineLenChars
+        self.lineWidths = lineWidths
+        self.lineBottoms = lineBottoms
+        self.newLineBottoms = newLineBottoms
+        self.renderChars = renderChars
+        self.nLines = nLines
+        self.height = height
+
+
 class PlaceholderText(TextBox2):
     """
     Subclass of TextBox2 used only for presenting placeholder text, should never be called outside of TextBox2's init
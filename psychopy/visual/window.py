@@ -26,7 +26,6 @@ import math
 # try to find avbin (we'll overload pyglet's load_library tool and then
 # add some paths)
 from ..colors import Color, colorSpaces
-from .textbox2 import TextBox2
 
 
 haveAvbin = False
@@ -568,6 +567,10 @@ class Window():
         self.frameClock = core.Clock()  # from psycho/core
         self.frames = 0  # frames since last fps calc
         self.movieFrames = []  # list of captured frames (Image objects)
+        self._movieWriter = None  # writer for frames streamed to a movie
+        self._moviePBOs = None  # pixel buffers for async movie readback
+        self._moviePBOIndex = 0
+        self._moviePBOPending = False
 
         self.recordFrameIntervals = False
         # Be able to omit the long timegap that follows each time turn it off
@@ -2324,6 +2327,9 @@ class Window():
         command is issued. You can issue :py:attr:`~Window.getMovieFrame()` as
         often as you like and then save them all in one go when finished.
 
+        While recording with :py:attr:`~Window.startMovieRecording()` frames
+        are instead sent straight to the movie file and not kept in memory.
+
         The back buffer will return the frame that hasn't yet been 'flipped'
         to be visible on screen but has the advantage that the mouse and any
         other overlapping windows won't get in the way.
@@ -2339,19 +2345,169 @@ class Window():
 
         Returns
         -------
-        Image
-            Buffer pixel contents as a PIL/Pillow image object.
+        Image or None
+            Buffer pixel contents as a PIL/Pillow image object. `None` while
+            recording with :py:attr:`~Window.startMovieRecording()`.
 
         """
+        if self._movieWriter is not None:
+            self._recordMovieFrame(buffer=buffer)
+            return None
         im = self._getFrame(buffer=buffer)
         self.movieFrames.append(im)
         return im
 
-    def _getFrame(self, rect=None, buffer='front'):
-        """Return the current Window as an image.
+    def startMovieRecording(self, fileName, fps=30, codec='libx264',
+                            encoder=None, maxQueueSize=32,
+                            asyncReadback=False):
+        """Start streaming frames captured by
+        :py:attr:`~Window.getMovieFrame()` to a movie file.
+
+        Unlike :py:attr:`~Window.saveMovieFrames()`, frames are not kept in
+        memory. Each is queued and written by an encoder running in a
+        background thread, so recordings can be as long as needed. If the
+        encoder falls behind, :py:attr:`~Window.getMovieFrame()` waits for
+        space in the queue rather than dropping frames.
+
+        Parameters
+        ----------
+        fileName : str
+            Name of the file, including path. Movie formats (e.g. '.mp4',
+            '.mov', '.gif') are encoded with `ffmpeg` or `imageio`, image
+            formats (e.g. '.png') write a numbered file for each frame.
+        fps : int, optional
+            Frame rate of the movie. Default is `30`.
+        codec : str, optional
+            Video codec, e.g. ``libx264`` or ``mpeg4``. Default is
+            ``libx264``.
+        encoder : str or None, optional
+            'ffmpeg', 'imageio' or 'images', or `None` to choose one from
+            the file name and what is installed. See
+            :class:`~psychopy.tools.movietools.MovieFrameWriter`.
+        maxQueueSize : int, optional
+            Number of frames which can be waiting to be encoded.
+        asyncReadback : bool, optional
+            Read pixels into pixel buffer objects and copy them from the
+            graphics card on the next call to
+            :py:attr:`~Window.getMovieFrame()`, so capturing a frame doesn't
+            wait for rendering to finish. Frames are still written in order.
+
+        Examples
+        --------
+        Record every frame of a trial::
+
+            win.startMovieRecording('trial.mp4', fps=60)
+            for frameN in range(nFrames):
+                stim.draw()
+                win.flip()
+                win.getMovieFrame()
+            win.stopMovieRecording()
+
+        """
+        from psychopy.tools.movietools import MovieFrameWriter
+
+        if self._movieWriter is not None:
+            raise RuntimeError("A movie is already being recorded, call "
+                               "`stopMovieRecording()` first.")
+        w, h = (int(v) for v in self.size)
+        writer = MovieFrameWriter(
+            fileName, (w, h), fps=fps, codec=codec, encoder=encoder,
+            maxQueueSize=maxQueueSize, flipVert=True)
+        writer.open()
+        self._movieWriter = writer
+
+        if asyncReadback:
+            # two buffers, read one while the other is being filled
+            self._moviePBOs = (GL.GLuint * 2)()
+            GL.glGenBuffers(2, self._moviePBOs)
+            for pbo in self._moviePBOs:
+                GL.glBindBuffer(GL.GL_PIXEL_PACK_BUFFER, pbo)
+                GL.glBufferData(GL.GL_PIXEL_PACK_BUFFER, w * h * 4, None,
+                                GL.GL_STREAM_READ)
+            GL.glBindBuffer(GL.GL_PIXEL_PACK_BUFFER, 0)
+            self._moviePBOIndex = 0
+            self._moviePBOPending = False
+
+    def stopMovieRecording(self):
+        """Stop recording started by
+        :py:attr:`~Window.startMovieRecording()`, waiting for the queued
+        frames to be written and closing the file.
+
+        Returns
+        -------
+        int
+            Number of frames written to the movie.
+
+        """
+        writer = self._movieWriter
+        if writer is None:
+            return 0
+        try:
+            if self._moviePBOs is not None:
+                if self._moviePBOPending:
+                    writer.write(self._readMoviePBO(
+                        self._moviePBOs[1 - self._moviePBOIndex]))
+                GL.glDeleteBuffers(2, self._moviePBOs)
+        finally:
+            self._moviePBOs = None
+            self._moviePBOPending = False
+            self._movieWriter = None
+            writer.close()
+        return writer.framesWritten
+
+    @property
+    def isRecordingMovie(self):
+        """`True` while frames are being streamed to a movie file by
+        :py:attr:`~Window.startMovieRecording()` (`bool`).
+        """
+        return self._movieWriter is not None
+
+    def _recordMovieFrame(self, buffer='front'):
+        """Read the pixels of the window and queue them for the movie
+        writer.
+        """
+        w, h = self._movieWriter.size
+        self._setReadBuffer(buffer)
+        if self._moviePBOs is None:
+            pixels = numpy.empty((h, w, 4), dtype=numpy.uint8)
+            GL.glReadPixels(0, 0, w, h, GL.GL_RGBA, GL.GL_UNSIGNED_BYTE,
+                            pixels.ctypes)
+        else:
+            # start reading into one buffer, which returns without waiting
+            pbo = self._moviePBOs[self._moviePBOIndex]
+            GL.glBindBuffer(GL.GL_PIXEL_PACK_BUFFER, pbo)
+            GL.glReadPixels(0, 0, w, h, GL.GL_RGBA, GL.GL_UNSIGNED_BYTE, 0)
+            GL.glBindBuffer(GL.GL_PIXEL_PACK_BUFFER, 0)
+            # then copy the previous frame from the other one
+            self._moviePBOIndex = 1 - self._moviePBOIndex
+            pixels = None
+            if self._moviePBOPending:
+                pixels = self._readMoviePBO(
+                    self._moviePBOs[self._moviePBOIndex])
+            self._moviePBOPending = True
+
+        if self.useFBO and buffer == 'front':
+            GL.glBindFramebufferEXT(GL.GL_FRAMEBUFFER_EXT, self.frameBuffer)
+        if pixels is not None:
+            self._movieWriter.write(pixels)
+
+    def _readMoviePBO(self, pbo):
+        """Copy the pixels in a pixel buffer used for async movie readback.
+        """
+        w, h = self._movieWriter.size
+        GL.glBindBuffer(GL.GL_PIXEL_PACK_BUFFER, pbo)
+        bufferPtr = GL.glMapBuffer(GL.GL_PIXEL_PACK_BUFFER, GL.GL_READ_ONLY)
+        pixels = numpy.ctypeslib.as_array(
+            ctypes.cast(bufferPtr, ctypes.POINTER(GL.GLubyte)),
+            shape=(h, w, 4)).copy()
+        GL.glUnmapBuffer(GL.GL_PIXEL_PACK_BUFFER)
+        GL.glBindBuffer(GL.GL_PIXEL_PACK_BUFFER, 0)
+        return pixels
+
+    def _setReadBuffer(self, buffer='front'):
+        """Select the buffer to read pixels from. If this is the front
+        buffer and an FBO is used, it has to be bound again after reading.
         """
-        # GL.glLoadIdentity()
-        # do the reading of the pixels
         if buffer == 'back' and self.useFBO:
             GL.glReadBuffer(GL.GL_COLOR_ATTACHMENT0_EXT)
         elif buffer == 'back':
@@ -2364,6 +2520,13 @@ class Window():
             raise ValueError("Requested read from buffer '{}' but should be "
                              "'front' or 'back'".format(buffer))
 
+    def _getFrame(self, rect=None, buffer='front'):
+        """Return the current Window as an image.
+        """
+        # GL.glLoadIdentity()
+        # do the reading of the pixels
+        self._setReadBuffer(buffer)
+
         if rect:
             x, y = self.size  # of window, not image
             imType = 'RGBA'  # not tested with anything else
@@ -2514,6 +2677,13 @@ class Window():
         """
         self._closed = True
 
+        # finish writing any movie being recorded
+        if self._movieWriter is not None:
+            try:
+                self.stopMovieRecording()
+            except Exception as err:
+                logging.error("Failed to finish recording movie: {}".format(err))
+
         # If iohub is running, inform it to stop using this win id
         # for mouse events
         try:
@@ -3275,6 +3445,8 @@ class Window():
             self._showSplash = True
         
         if self._splashTextbox is None:  # create the textbox
+            # imported here as it takes a while and is rarely needed
+            from .textbox2 import TextBox2
             self._splashTextbox = TextBox2(
                 self, text=msg,
                 units="norm", size=(2, 2), alignment="center",  # full screen and centred